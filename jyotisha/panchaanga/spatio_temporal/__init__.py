@@ -2,9 +2,12 @@
 #  -*- coding: utf-8 -*-
 
 import logging
+import math
 import os
 import sys
+from bisect import bisect_left, bisect_right
 
+import numpy
 import swisseph as swe
 
 from jyotisha import custom_transliteration
@@ -28,6 +31,87 @@ CODE_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
 CALC_RISE = 512 + 256 + 128 + 1
 CALC_SET = 512 + 256 + 128 + 2
 
+# Successive risings (or settings) of a body are assumed to be atleast this far apart.
+MIN_RISE_SET_GAP = 1/48.0
+# Cached rise/set timelines are extended (rather than replaced) to cover requests within this many days. 
+MAX_RISE_SET_TIMELINE_GAP = 400
+
+# For City.find_lagna_end
+SIDEREAL_DEGREES_PER_DAY = 360.98564736629
+LAGNA_NEWTON_MAX_ITERATIONS = 10
+LAGNA_NEWTON_TOLERANCE_DAYS = 1e-9
+
+
+class RiseSetTimeline(JsonObject):
+  """Successive rising (or setting) times of a body at a place, computed by chaining swe.rise_trans calls from one event to the next - so that each event is computed once. Extensible in either direction.
+  """
+
+  def __init__(self, geopos, body_id, rsmi, jd_start, jd_end):
+    super(RiseSetTimeline, self).__init__()
+    self.geopos = geopos
+    self.body_id = body_id
+    self.rsmi = rsmi
+    self.jd_start = jd_start
+    self.jd_end = jd_start
+    # All events after jd_start, till the first one after jd_end.
+    self.jds = []
+    self.extend(jd_start=jd_start, jd_end=jd_end)
+
+  def _get_events(self, jd_start, jd_end):
+    """Events after jd_start, till the first one after jd_end.
+    
+    :return: (list of events, False if rise_trans failed to find an event midway (eg. circumpolar body)) 
+    """
+    events = []
+    jd = jd_start
+    rise_trans = swe.rise_trans
+    while True:
+      (flag, event_jds) = rise_trans(jd, body=self.body_id, geopos=self.geopos, rsmi=self.rsmi)
+      if flag != 0:
+        return (events, False)
+      events.append(event_jds[0])
+      if event_jds[0] > jd_end:
+        return (events, True)
+      jd = event_jds[0] + MIN_RISE_SET_GAP
+
+  def extend(self, jd_start, jd_end):
+    """Cover [jd_start, jd_end] as well, computing only the events not known already."""
+    if jd_start < self.jd_start:
+      (events, complete) = self._get_events(jd_start=jd_start, jd_end=self.jd_start)
+      if complete:
+        # The last event here is the same as self.jds[0], modulo rise_trans precision.
+        self.jds = [jd for jd in events if jd <= self.jd_start] + self.jds
+        self.jd_start = jd_start
+    if jd_end > self.jd_end:
+      if len(self.jds) > 0 and self.jds[-1] > jd_end:
+        self.jd_end = jd_end
+        return
+      (events, complete) = self._get_events(jd_start=self.jd_start if len(self.jds) == 0 else self.jds[-1] + MIN_RISE_SET_GAP, jd_end=jd_end)
+      self.jds.extend(events)
+      if complete:
+        self.jd_end = jd_end
+      else:
+        self.jd_end = self.jds[-1] if len(self.jds) > 0 else self.jd_start
+
+  def covers(self, jd_start, jd_end):
+    return self.jd_start <= jd_start and jd_end <= self.jd_end
+
+  def get_next_event(self, jd):
+    """The first event after jd (as swe.rise_trans would return), or None if jd is not covered by this timeline."""
+    if not self.covers(jd_start=jd, jd_end=jd):
+      return None
+    index = bisect_right(self.jds, jd)
+    if index == len(self.jds):
+      return None
+    return self.jds[index]
+
+  def get_event_index_range(self, jd_start, jd_end):
+    """Events strictly within (jd_start, jd_end) are self.jds[index_start:index_end]."""
+    return (bisect_right(self.jds, jd_start), bisect_left(self.jds, jd_end))
+
+  def get_events_in_period(self, jd_start, jd_end):
+    return numpy.array(self.jds[bisect_left(self.jds, jd_start): bisect_right(self.jds, jd_end)])
+
 
 class City(JsonObject):
   """This class enables the construction of a city object
@@ -49,6 +133,7 @@ class City(JsonObject):
     if name_hk is not None and name_hk != "":
       self.name_hk = name_hk
     self.timezone = timezone
+    self._rise_set_timelines = {}
 
   def get_timezone_obj(self):
     from jyotisha.panchaanga.temporal.time import Timezone
@@ -87,11 +172,55 @@ class City(JsonObject):
   def __repr__(self):
     return self.name
 
+  def _get_rise_set_timeline(self, body_id, rsmi):
+    # Not serialized (so absent in deserialized objects).
+    if self._rise_set_timelines is None:
+      self._rise_set_timelines = {}
+    return self._rise_set_timelines.get((body_id, rsmi), None)
+
+  def _extend_rise_set_timeline(self, body_id, rsmi, jd_start, jd_end):
+    timeline = self._get_rise_set_timeline(body_id=body_id, rsmi=rsmi)
+    if timeline is None or jd_end < timeline.jd_start - MAX_RISE_SET_TIMELINE_GAP or jd_start > timeline.jd_end + MAX_RISE_SET_TIMELINE_GAP:
+      timeline = RiseSetTimeline(geopos=[self.longitude, self.latitude, 0], body_id=body_id, rsmi=rsmi, jd_start=jd_start, jd_end=jd_end)
+      self._rise_set_timelines[(body_id, rsmi)] = timeline
+    else:
+      timeline.extend(jd_start=jd_start, jd_end=jd_end)
+    return timeline
+
+  def get_rise_set_times(self, jd_start, jd_end, bodies=None):
+    """Rising and setting times of bodies over a period, computed in one pass (each event exactly once) and cached on this city. 
+    
+    get_rising_time and get_setting_time (and hence DailyPanchaanga) use the cache thereafter, within this period.
+
+    :param bodies: Defaults to the sun, the moon and Graha.PLANETS_REVERSE_ORDER.
+    :return: dict from body to (rising jds, setting jds) - sorted numpy arrays of the events within [jd_start, jd_end].
+    """
+    from jyotisha.panchaanga.temporal.body import Graha
+    if bodies is None:
+      bodies = [Graha.SUN, Graha.MOON] + Graha.PLANETS_REVERSE_ORDER
+    body_to_events = {}
+    for body in bodies:
+      (event_body, rise_rsmi, set_rsmi) = (Graha.RAHU, CALC_SET, CALC_RISE) if body == Graha.KETU else (body, CALC_RISE, CALC_SET)
+      body_id = Graha.singleton(event_body)._get_swisseph_id()
+      rise_timeline = self._extend_rise_set_timeline(body_id=body_id, rsmi=rise_rsmi, jd_start=jd_start, jd_end=jd_end)
+      set_timeline = self._extend_rise_set_timeline(body_id=body_id, rsmi=set_rsmi, jd_start=jd_start, jd_end=jd_end)
+      body_to_events[body] = (rise_timeline.get_events_in_period(jd_start=jd_start, jd_end=jd_end), set_timeline.get_events_in_period(jd_start=jd_start, jd_end=jd_end))
+    return body_to_events
+
+  def _get_cached_event(self, julian_day_start, body_id, rsmi):
+    timeline = self._get_rise_set_timeline(body_id=body_id, rsmi=rsmi)
+    if timeline is None:
+      return None
+    return timeline.get_next_event(jd=julian_day_start)
+
   def get_rising_time(self, julian_day_start, body):
     from jyotisha.panchaanga.temporal.body import Graha
     graha = Graha.singleton(body)
     if body == Graha.KETU:
       return self.get_setting_time(julian_day_start=julian_day_start, body=Graha.RAHU)
+    cached_jd = self._get_cached_event(julian_day_start=julian_day_start, body_id=graha._get_swisseph_id(), rsmi=CALC_RISE)
+    if cached_jd is not None:
+      return cached_jd
     # rise_trans expects UT time
     return swe.rise_trans(
       julian_day_start, body=graha._get_swisseph_id(),
@@ -103,6 +232,9 @@ class City(JsonObject):
     graha = Graha.singleton(body)
     if body == Graha.KETU:
       return self.get_rising_time(julian_day_start=julian_day_start, body=Graha.RAHU)
+    cached_jd = self._get_cached_event(julian_day_start=julian_day_start, body_id=graha._get_swisseph_id(), rsmi=CALC_SET)
+    if cached_jd is not None:
+      return cached_jd
     # rise_trans expects UT time
     return swe.rise_trans(
       julian_day_start, body=graha._get_swisseph_id(),
@@ -157,9 +289,75 @@ class City(JsonObject):
       else:
         return (lcalc / 30) + offset
 
+  def get_ramc_for_rising_longitude(self, longitude, obliquity):
+    """Right ascension of the meridian (local sidereal time in degrees) at which the given tropical ecliptic longitude rises - the inverse of the ascendant formula used by swe.houses_ex. None if that point never rises here (possible beyond the polar circles).
+    """
+    (l, e) = (math.radians(longitude), math.radians(obliquity))
+    right_ascension = math.atan2(math.sin(l) * math.cos(e), math.cos(l))
+    declination = math.asin(math.sin(l) * math.sin(e))
+    cos_hour_angle = -math.tan(math.radians(self.latitude)) * math.tan(declination)
+    if abs(cos_hour_angle) > 1:
+      return None
+    # A rising point is east of the meridian - at hour angle -H0.
+    return math.degrees(right_ascension - math.acos(cos_hour_angle)) % 360
+
+  def get_ramc(self, jd):
+    return (swe.sidtime(jd) * 15 + self.longitude) % 360
+
+  def find_lagna_end(self, jd_start, lagna, ayanaamsha_id=Ayanamsha.CHITRA_AT_180):
+    """Find when the given lagna next ends (ie. when its end point in the sidereal zodiac rises) after jd_start.
+
+    Local sidereal time is nearly linear in time, and the sidereal time at which a given longitude rises is had in closed form (see get_ramc_for_rising_longitude). So a few Newton steps suffice - the changes in ayanaamsha and obliquity being slow.
+
+    :param lagna: 1-12.
+    :return: None if the lagna end point does not rise here.
+    """
+    ayanaamsha = Ayanamsha.singleton(ayanaamsha_id=ayanaamsha_id)
+    jd = jd_start
+    for iteration in range(LAGNA_NEWTON_MAX_ITERATIONS):
+      obliquity = swe.calc_ut(jd, swe.ECL_NUT)[0][0]
+      ramc_target = self.get_ramc_for_rising_longitude(longitude=lagna * 30 + ayanaamsha.get_offset(jd=jd), obliquity=obliquity)
+      if ramc_target is None:
+        return None
+      ramc_difference = ramc_target - self.get_ramc(jd=jd)
+      if iteration == 0:
+        # The next occurrence.
+        ramc_difference = ramc_difference % 360
+      else:
+        ramc_difference = (ramc_difference + 180) % 360 - 180
+      step = ramc_difference / SIDEREAL_DEGREES_PER_DAY
+      jd += step
+      if abs(step) < LAGNA_NEWTON_TOLERANCE_DAYS:
+        return jd
+    logging.warning("Lagna %d end after %f did not converge.", lagna, jd_start)
+    return jd
+
+  def _get_sunset_timeline(self, jd_start, jd_end):
+    """The sunset index of this city, lazily extended to cover the given period. None if that is impossible."""
+    from jyotisha.panchaanga.temporal.body import Graha
+    timeline = self._extend_rise_set_timeline(body_id=Graha.singleton(Graha.SUN)._get_swisseph_id(), rsmi=CALC_SET, jd_start=jd_start, jd_end=jd_end)
+    if timeline.covers(jd_start=jd_start, jd_end=jd_end):
+      return timeline
+    else:
+      return None
+
+  def count_sunsets_in_period(self, jd_start, jd_end):
+    """Same as len(self.get_sunsets_in_period(jd_start, jd_end)), but by binary search over the sunset index."""
+    if jd_start > jd_end:
+      raise ValueError((jd_start, jd_end))
+    timeline = self._get_sunset_timeline(jd_start=jd_start, jd_end=jd_end)
+    if timeline is None:
+      return len(self.get_sunsets_in_period(jd_start=jd_start, jd_end=jd_end))
+    (index_start, index_end) = timeline.get_event_index_range(jd_start=jd_start, jd_end=jd_end)
+    return index_end - index_start
+
   def get_sunsets_in_period(self, jd_start, jd_end):
     if jd_start > jd_end:
       raise ValueError((jd_start, jd_end))
+    timeline = self._get_sunset_timeline(jd_start=jd_start, jd_end=jd_end)
+    if timeline is not None:
+      (index_start, index_end) = timeline.get_event_index_range(jd_start=jd_start, jd_end=jd_end)
+      return timeline.jds[index_start:index_end]
     jd = jd_start
     sunset_jds = []
     while jd < jd_end:
@@ -7,7 +7,6 @@ from math import floor, modf
 import methodtools
 from indic_transliteration import sanscript
 from sanskrit_data.schema import common
-from scipy.optimize import brentq
 from timebudget import timebudget
 import swisseph
 
@@ -49,6 +48,8 @@ class DayAngas(common.JsonObject):
     self.solar_nakshatras_with_ends = None
     self.raashis_with_ends = None
     self.graha_raashis_with_ends = {}
+    # Set by DailyPanchaanga when graha raashis are deferred - see DailyPanchaanga.set_graha_raashis.
+    self._compute_graha_raashis = None
 
   def get_angas_with_ends(self, anga_type):
     anga_spans = []
@@ -65,6 +66,8 @@ class DayAngas(common.JsonObject):
     elif anga_type == AngaType.SOLAR_NAKSH:
       anga_spans = self.solar_nakshatras_with_ends
     elif anga_type in AngaType.GRAHA_RASHI.values():
+      if anga_type.get_body_str() not in self.graha_raashis_with_ends and self._compute_graha_raashis is not None:
+        self._compute_graha_raashis()
       anga_spans = self.graha_raashis_with_ends[anga_type.get_body_str()]
     return anga_spans
 
@@ -138,22 +141,42 @@ class DailyPanchaanga(common.JsonObject):
   """This class enables the construction of a panchaanga.
   
   For comments on matching pre-sunrise festivals with days, see periodic panchaanga.
+
+  Sunrise and sunset times are always computed. Other fields (see FIELD_TO_ATTRIBUTES) are computed either upfront or on first access, and are then stored like any other attribute. Pending fields are computed before serialization and deep copying.
   """
 
+  # Field name -> attributes it sets. In order of computation; later fields may use earlier ones.
+  FIELD_TO_ATTRIBUTES = {
+    "graha_rise_set": ["graha_rise_jd", "graha_set_jd"],
+    "sunrise_day_angas": ["sunrise_day_angas"],
+    "solar_sidereal_date_sunset": ["solar_sidereal_date_sunset"],
+    "tropical_date_sunset": ["tropical_date_sunset"],
+    "day_length_based_periods": ["day_length_based_periods"],
+    "lunar_date": ["lunar_date"],
+    "mauDhyas": ["mauDhyas", "amauDhyas"],
+    # Stored within sunrise_day_angas.
+    "graha_raashis": [],
+    "paxi_activities": ["paxi_activities"],
+  }
+  ATTRIBUTE_TO_FIELD = {attribute: field for field, attributes in FIELD_TO_ATTRIBUTES.items() for attribute in attributes}
+
   @classmethod
-  def from_city_and_julian_day(cls, city, julian_day, computation_system: ComputationSystem = None):
+  def from_city_and_julian_day(cls, city, julian_day, computation_system: ComputationSystem = None, fields=None):
     date = Timezone(city.timezone).julian_day_to_local_time(julian_day)
-    return DailyPanchaanga(city=city, date=date, computation_system=computation_system)
+    return DailyPanchaanga(city=city, date=date, computation_system=computation_system, fields=fields)
 
   def __init__(self, city: City, date: Date, computation_system = None,
-               previous_day_panchaanga=None) -> None:
+               previous_day_panchaanga=None, anga_timelines=None, fields=None) -> None:
     """Constructor for the panchaanga.
+    
+    :param anga_timelines: Optional precomputed AngaTimeline-s (see get_anga_timelines), keyed by anga type name. Saves redundant root finding when computing a sequence of days.
+    :param fields: Optional subset of FIELD_TO_ATTRIBUTES keys to compute upfront, eg. ["sunrise_day_angas"] for a caller interested only in tithi and nakshatra. Others are computed on first access. By default, all fields are computed upfront.
     """
     super(DailyPanchaanga, self).__init__()
     self.city = city
     self.date = date
     date.set_time_to_day_start()
-    self.julian_day_start = Timezone(self.city.timezone).local_time_to_julian_day(date=self.date)
+    self.julian_day_start = Timezone.get_cached(timezone_id=self.city.timezone).local_time_to_julian_day(date=self.date)
     self.computation_system = default_if_none(computation_system, ComputationSystem.DEFAULT)
 
     self.jd_sunrise = None
@@ -161,39 +184,90 @@ class DailyPanchaanga(common.JsonObject):
     self.jd_previous_sunset = None
     self.jd_next_sunrise = None
     self._previous_day_panchaanga = previous_day_panchaanga
-    self.graha_rise_jd = {}
-    self.graha_set_jd = {}
+    self._anga_timelines = default_if_none(anga_timelines, {})
 
     self.lagna_data = None
-    self.sunrise_day_angas = None
-    self.paxi_activities = None
-
-    self.solar_sidereal_date_sunset = None
 
-    self.tropical_date_sunset = None
+    self.festival_id_to_instance = {}
 
-    self.lunar_date = None
-    # self.lunar_dates_alternate = {}
+    self.compute_sun_transitions(previous_day_panchaanga=previous_day_panchaanga)
 
-    self.festival_id_to_instance = {}
-    self.mauDhyas = None
-    self.amauDhyas = None
+    if fields is None:
+      fields = DailyPanchaanga.get_default_fields(computation_system=self.computation_system)
+    # Attributes of pending fields are left unset, so that __getattr__ gets to compute them.
+    self._pending_fields = set(DailyPanchaanga.FIELD_TO_ATTRIBUTES.keys())
+    for field in DailyPanchaanga.FIELD_TO_ATTRIBUTES:
+      if field in fields:
+        self.compute_field(field=field)
 
-    self.compute_graha_transitions(previous_day_panchaanga=previous_day_panchaanga)
-    self.compute_solar_day_sunset(previous_day_panchaanga=previous_day_panchaanga)
-    self.set_tropical_date_sunset(previous_day_panchaanga=previous_day_panchaanga)
-    self.day_length_based_periods = DayLengthBasedPeriods(jd_previous_sunset=self.jd_previous_sunset, jd_sunrise=self.jd_sunrise, jd_sunset=self.jd_sunset, jd_next_sunrise=self.jd_next_sunrise, weekday=self.date.get_weekday())
+  def __getattr__(self, name):
+    # Only called for attributes not found otherwise. Note that deserialized objects have no _pending_fields.
+    field = DailyPanchaanga.ATTRIBUTE_TO_FIELD.get(name, None)
+    if field is not None and field in self.__dict__.get("_pending_fields", ()):
+      self.compute_field(field=field)
+      return getattr(self, name)
+    return super(DailyPanchaanga, self).__getattr__(name)
 
-    if self.computation_system.lunar_month_assigner_type is not None:
-      lunar_month_assigner = LunarMonthAssigner.get_assigner(computation_system=self.computation_system)
-      lunar_month_assigner.set_date(daily_panchaanga=self, previous_day_panchaanga=previous_day_panchaanga)
+  @classmethod
+  def get_default_fields(cls, computation_system):
+    """Fields computed upfront by default - those applicable under the computation system."""
+    fields = list(cls.FIELD_TO_ATTRIBUTES.keys())
+    if computation_system.lunar_month_assigner_type is None:
+      fields.remove("lunar_date")
+    if not computation_system.festival_options.set_pancha_paxi_activities:
+      fields.remove("paxi_activities")
+    return fields
+
+  def _get_previous_day_panchaanga(self, field):
+    """The previous day panchaanga, if it has the given field computed already (so as not to set off a chain of computations going back day by day)."""
+    previous_day_panchaanga = self._previous_day_panchaanga
+    if previous_day_panchaanga is None or field in previous_day_panchaanga.__dict__.get("_pending_fields", ()):
+      return None
+    return previous_day_panchaanga
 
-    self.set_mauDhyas()
-    self.set_graha_raashis()
+  def compute_field(self, field, **kwargs):
+    """Compute the given field (a FIELD_TO_ATTRIBUTES key) if not already done.
 
-    if self.computation_system.festival_options.set_pancha_paxi_activities:
+    :param kwargs: Passed on to the method computing the field - eg. sun_separations for mauDhyas (see set_mauDhyas_for_days).
+    """
+    if field not in self.__dict__.get("_pending_fields", ()):
+      return
+    self._pending_fields.remove(field)
+    if field == "graha_rise_set":
+      self.compute_graha_rise_set()
+    elif field == "sunrise_day_angas":
+      self.compute_sunrise_day_angas()
+    elif field == "solar_sidereal_date_sunset":
+      self.compute_solar_day_sunset(previous_day_panchaanga=self._get_previous_day_panchaanga(field=field))
+    elif field == "tropical_date_sunset":
+      self.set_tropical_date_sunset(previous_day_panchaanga=self._get_previous_day_panchaanga(field=field))
+    elif field == "day_length_based_periods":
+      self.day_length_based_periods = DayLengthBasedPeriods(jd_previous_sunset=self.jd_previous_sunset, jd_sunrise=self.jd_sunrise, jd_sunset=self.jd_sunset, jd_next_sunrise=self.jd_next_sunrise, weekday=self.date.get_weekday())
+    elif field == "lunar_date":
+      if self.computation_system.lunar_month_assigner_type is not None:
+        lunar_month_assigner = LunarMonthAssigner.get_assigner(computation_system=self.computation_system)
+        lunar_month_assigner.set_date(daily_panchaanga=self, previous_day_panchaanga=self._get_previous_day_panchaanga(field=field))
+    elif field == "mauDhyas":
+      self.set_mauDhyas(**kwargs)
+    elif field == "graha_raashis":
+      self.set_graha_raashis()
+    elif field == "paxi_activities":
       self.get_pancha_paxi_activities()
 
+  def compute_all_fields(self):
+    """Compute whatever is pending - say before serializing a panchaanga constructed with a subset of fields."""
+    for field in DailyPanchaanga.get_default_fields(computation_system=self.computation_system):
+      self.compute_field(field=field)
+
+  def to_json_map(self, floating_point_precision=None):
+    self.compute_all_fields()
+    return super(DailyPanchaanga, self).to_json_map(floating_point_precision=floating_point_precision)
+
+  def __deepcopy__(self, memo):
+    # The copy is made via to_json_map and make_from_dict - losing _pending_fields. Hence pending fields are computed first.
+    self.compute_all_fields()
+    return super(DailyPanchaanga, self).__deepcopy__(memo)
+
   def __repr__(self):
     return "%s %s" % (repr(self.date), repr(self.city))
 
@@ -210,6 +284,11 @@ class DailyPanchaanga(common.JsonObject):
     :param force_recomputation: Boolean indicating if the transitions should be recomputed. (rise_trans calculations can be time consuming.)
     :return:
     """
+    self.compute_sun_transitions(previous_day_panchaanga=previous_day_panchaanga, force_recomputation=force_recomputation)
+    self.compute_graha_rise_set(force_recomputation=force_recomputation)
+    self.compute_sunrise_day_angas(force_recomputation=force_recomputation)
+
+  def compute_sun_transitions(self, previous_day_panchaanga=None, force_recomputation=False):
     if force_recomputation or self.jd_sunrise is None:
       if previous_day_panchaanga is not None and previous_day_panchaanga.jd_next_sunrise is not None:
         self.jd_sunrise = previous_day_panchaanga.jd_next_sunrise
@@ -230,30 +309,44 @@ class DailyPanchaanga(common.JsonObject):
       raise (ValueError(
         'No sunset was computed. Perhaps the co-ordinates are beyond the polar circle (most likely a LAT-LONG swap! Please check your inputs.'))
 
+  def compute_graha_rise_set(self, force_recomputation=False):
+    if "graha_rise_jd" not in self.__dict__:
+      self.graha_rise_jd = {}
+      self.graha_set_jd = {}
     for body in Graha.PLANETS_REVERSE_ORDER + [Graha.MOON]:
       if force_recomputation or body not in self.graha_rise_jd:
         self.graha_rise_jd[body] = self.city.get_rising_time(julian_day_start=self.jd_sunrise, body=body)
       if force_recomputation or body not in self.graha_set_jd:
         self.graha_set_jd[body] = self.city.get_setting_time(julian_day_start=self.jd_sunrise, body=body)
 
-    if force_recomputation or self.sunrise_day_angas is None:
-      self.sunrise_day_angas = DayAngas()
-      # Deliberately passing ASHVINI_STARTING_0 below since it is cheapest. Tithi is independent of ayanAmsha.
-      self.sunrise_day_angas.tithis_with_ends = AngaSpanFinder.get_cached(ayanaamsha_id=Ayanamsha.ASHVINI_STARTING_0, anga_type=zodiac.AngaType.TITHI).get_all_angas_in_period(jd1=self.jd_sunrise, jd2=self.jd_next_sunrise)
-      self.sunrise_day_angas.tithi_at_sunrise = self.sunrise_day_angas.tithis_with_ends[0].anga
-      self.sunrise_day_angas.tithi_at_noon = self.sunrise_day_angas.get_anga_at_jd(jd=(self.jd_sunrise + self.jd_sunset)/2, anga_type=zodiac.AngaType.TITHI)
+  def compute_sunrise_day_angas(self, force_recomputation=False):
+    if force_recomputation or self.__dict__.get("sunrise_day_angas", None) is None:
+      sunrise_day_angas = DayAngas()
+      sunrise_day_angas.tithis_with_ends = self._get_sunrise_day_anga_spans(anga_type=zodiac.AngaType.TITHI)
+      sunrise_day_angas.tithi_at_sunrise = sunrise_day_angas.tithis_with_ends[0].anga
+      sunrise_day_angas.tithi_at_noon = sunrise_day_angas.get_anga_at_jd(jd=(self.jd_sunrise + self.jd_sunset)/2, anga_type=zodiac.AngaType.TITHI)
+
+      sunrise_day_angas.nakshatras_with_ends = self._get_sunrise_day_anga_spans(anga_type=zodiac.AngaType.NAKSHATRA)
+      sunrise_day_angas.nakshatra_at_sunrise = sunrise_day_angas.nakshatras_with_ends[0].anga
 
-      self.sunrise_day_angas.nakshatras_with_ends = AngaSpanFinder.get_cached(ayanaamsha_id=self.computation_system.ayanaamsha_id, anga_type=zodiac.AngaType.NAKSHATRA).get_all_angas_in_period(jd1=self.jd_sunrise, jd2=self.jd_next_sunrise)
-      self.sunrise_day_angas.nakshatra_at_sunrise = self.sunrise_day_angas.nakshatras_with_ends[0].anga
+      sunrise_day_angas.yogas_with_ends = self._get_sunrise_day_anga_spans(anga_type=zodiac.AngaType.YOGA)
+      sunrise_day_angas.yoga_at_sunrise = sunrise_day_angas.yogas_with_ends[0].anga
 
-      self.sunrise_day_angas.yogas_with_ends = AngaSpanFinder.get_cached(ayanaamsha_id=self.computation_system.ayanaamsha_id, anga_type=zodiac.AngaType.YOGA).get_all_angas_in_period(jd1=self.jd_sunrise, jd2=self.jd_next_sunrise)
-      self.sunrise_day_angas.yoga_at_sunrise = self.sunrise_day_angas.yogas_with_ends[0].anga
+      sunrise_day_angas.karanas_with_ends = self._get_sunrise_day_anga_spans(anga_type=zodiac.AngaType.KARANA)
 
-      self.sunrise_day_angas.karanas_with_ends = AngaSpanFinder.get_cached(ayanaamsha_id=self.computation_system.ayanaamsha_id, anga_type=zodiac.AngaType.KARANA).get_all_angas_in_period(jd1=self.jd_sunrise, jd2=self.jd_next_sunrise)
+      sunrise_day_angas.raashis_with_ends = self._get_sunrise_day_anga_spans(anga_type=zodiac.AngaType.RASHI)
 
-      self.sunrise_day_angas.raashis_with_ends = AngaSpanFinder.get_cached(ayanaamsha_id=self.computation_system.ayanaamsha_id, anga_type=zodiac.AngaType.RASHI).get_all_angas_in_period(jd1=self.jd_sunrise, jd2=self.jd_next_sunrise)
+      sunrise_day_angas.solar_nakshatras_with_ends = self._get_sunrise_day_anga_spans(anga_type=zodiac.AngaType.SOLAR_NAKSH)
+      if "graha_raashis" in self.__dict__.get("_pending_fields", ()):
+        sunrise_day_angas._compute_graha_raashis = lambda: self.compute_field(field="graha_raashis")
+      self.sunrise_day_angas = sunrise_day_angas
 
-      self.sunrise_day_angas.solar_nakshatras_with_ends = AngaSpanFinder.get_cached(ayanaamsha_id=self.computation_system.ayanaamsha_id, anga_type=zodiac.AngaType.SOLAR_NAKSH).get_all_angas_in_period(jd1=self.jd_sunrise, jd2=self.jd_next_sunrise)
+  def _get_sunrise_day_anga_spans(self, anga_type):
+    timeline = self._anga_timelines.get(anga_type.name, None)
+    if timeline is not None:
+      return timeline.get_spans_in_period(jd1=self.jd_sunrise, jd2=self.jd_next_sunrise)
+    ayanaamsha_id = get_sunrise_day_anga_ayanaamsha_id(anga_type=anga_type, computation_system=self.computation_system)
+    return AngaSpanFinder.get_cached(ayanaamsha_id=ayanaamsha_id, anga_type=anga_type).get_all_angas_in_period(jd1=self.jd_sunrise, jd2=self.jd_next_sunrise)
 
   def get_interval(self, interval_id):
     interval_id = names.devanaagarii_to_python.get(interval_id, interval_id)
@@ -291,7 +384,7 @@ class DailyPanchaanga(common.JsonObject):
     """Compute the solar month and day for a given Julian day at sunset.
     """
     # If solar transition happens before the current sunset but after the previous sunset, then that is taken to be solar day 1.
-    self.compute_graha_transitions(previous_day_panchaanga=previous_day_panchaanga)
+    self.compute_sun_transitions(previous_day_panchaanga=previous_day_panchaanga)
     solar_month_sunset = NakshatraDivision(jd=self.jd_sunset, ayanaamsha_id=self.computation_system.ayanaamsha_id).get_anga(
       anga_type=AngaType.GRAHA_RASHI[Graha.SUN])
 
@@ -300,7 +393,7 @@ class DailyPanchaanga(common.JsonObject):
     if previous_day_panchaanga is None or previous_day_panchaanga.solar_sidereal_date_sunset.day >= 28 :
       anga_finder = zodiac.AngaSpanFinder.get_cached(ayanaamsha_id=self.computation_system.ayanaamsha_id, anga_type=AngaType.GRAHA_RASHI[Graha.SUN])
       solar_month_sunset_span = anga_finder.find(jd1=self.jd_sunset - 32, jd2=self.jd_sunset + 5, target_anga_id=solar_month_sunset)
-      solar_sidereal_month_day_sunset = len(self.city.get_sunsets_in_period(jd_start=solar_month_sunset_span.jd_start, jd_end=self.jd_sunset + 1/48.0))
+      solar_sidereal_month_day_sunset = self.city.count_sunsets_in_period(jd_start=solar_month_sunset_span.jd_start, jd_end=self.jd_sunset + 1/48.0)
       if solar_sidereal_month_day_sunset == 1 and solar_month_sunset_span.jd_start > self.jd_sunrise:
         solar_sidereal_month_end_jd = solar_month_sunset_span.jd_start
       elif solar_sidereal_month_day_sunset >= 29 and solar_month_sunset_span.jd_end < self.jd_next_sunrise:
@@ -327,7 +420,7 @@ class DailyPanchaanga(common.JsonObject):
         tropical_date_sunset_month = month_transitions[-1].value_2  % 12 + 1
         month_transition_jd = month_transitions[-1].jd
       else:
-        tropical_date_sunset_day = len(self.city.get_sunsets_in_period(jd_start=month_transitions[0].jd, jd_end=self.jd_sunset + 1/48.0))
+        tropical_date_sunset_day = self.city.count_sunsets_in_period(jd_start=month_transitions[0].jd, jd_end=self.jd_sunset + 1/48.0)
         tropical_date_sunset_month = month_transitions[0].value_2 % 12 + 1
     self.tropical_date_sunset = time.BasicDateWithTransitions(month=tropical_date_sunset_month, day=tropical_date_sunset_day, month_transition=month_transition_jd)
 
@@ -420,7 +513,7 @@ class DailyPanchaanga(common.JsonObject):
 
     self.hora_data = []
     if getattr(self, "jd_sunrise", None) is None or self.jd_sunrise is None:
-      self.compute_graha_transitions()
+      self.compute_sun_transitions()
 
     HORA_SUNRISE = [Graha.SUN, Graha.MOON, Graha.MARS, Graha.MERCURY, Graha.JUPITER, Graha.VENUS, Graha.SATURN]
     # HORA_GRAHAS = [Graha.SUN, Graha.VENUS, Graha.MERCURY, Graha.MOON, Graha.SATURN, Graha.JUPITER, Graha.MARS]
@@ -466,34 +559,27 @@ class DailyPanchaanga(common.JsonObject):
 
     self.lagna_data = []
     if getattr(self, "jd_sunrise", None) is None or self.jd_sunrise is None:
-      self.compute_graha_transitions()
+      self.compute_sun_transitions()
     lagna_sunrise = 1 + floor(self.city.get_lagna_float(self.jd_sunrise, ayanaamsha_id=ayanaamsha_id))
 
     lagna_list = [(x + lagna_sunrise - 1) % 12 + 1 for x in range(13)]
 
-    lbrack = self.jd_sunrise
-    rbrack = self.jd_sunrise + 3 / 24
-
+    jd = self.jd_sunrise
     for lagna in lagna_list:
+      lagna_end_time = self.city.find_lagna_end(jd_start=jd, lagna=lagna, ayanaamsha_id=ayanaamsha_id)
+      if lagna_end_time is None:
+        logging.debug("Lagna %d does not end (rise) on %s" % (lagna, self.date.get_date_str()))
+        continue
       if debug:
-        logging.debug(('lagna sunrise', self.city.get_lagna_float(self.jd_sunrise, ayanaamsha_id=ayanaamsha_id)))
-        logging.debug(('lbrack', self.city.get_lagna_float(lbrack, int(-lagna), ayanaamsha_id=ayanaamsha_id)))
-        logging.debug(('rbrack', self.city.get_lagna_float(rbrack, int(-lagna), ayanaamsha_id=ayanaamsha_id)))
-
-      try:
-        lagna_end_time = brentq(self.city.get_lagna_float, lbrack, rbrack,
-                                args=(-lagna, ayanaamsha_id, debug))
-      except ValueError:
-        logging.debug("Unable to bracket lagna %d on %s" % (lagna, self.date.get_date_str()))
-      lbrack = lagna_end_time + 1 / 24
-      rbrack = lagna_end_time + 3 / 24
+        logging.debug(('lagna end', lagna, lagna_end_time, self.city.get_lagna_float(lagna_end_time, ayanaamsha_id=ayanaamsha_id)))
+      jd = lagna_end_time
       if lagna_end_time < self.jd_next_sunrise:
         self.lagna_data.append((lagna, lagna_end_time))
     return self.lagna_data
 
 
   def get_pancha_paxi_activities(self):
-    if self.paxi_activities is not None:
+    if self.__dict__.get("paxi_activities", None) is not None:
       return self.paxi_activities
     self.paxi_activities = PaxiActivities()
     paxa_id = int((self.sunrise_day_angas.tithi_at_sunrise.index - 1) / 15) + 1
@@ -513,32 +599,44 @@ class DailyPanchaanga(common.JsonObject):
 
     return self.paxi_activities
 
-  def day_has_conjunction(self, body1, body2, gap=None):
+  def day_has_conjunction(self, body1, body2, gap=None, separations=None):
+    """
+
+    :param separations: Optional (longitude difference at sunrise, at next sunrise) - as from a body.SeparationScanner.
+    """
     if gap is None:
       gap = (Graha.BODY_TO_ANGULAR_DIA_DEGREES[body1.body_name] + Graha.BODY_TO_ANGULAR_DIA_DEGREES[body2.body_name])/ 2.0
 
-    def has_collision(jd):
-      return abs(body.longitude_difference(jd=jd, body1=body1, body2=body2)) < gap
+    if separations is None:
+      separations = [body.longitude_difference(jd=self.jd_sunrise, body1=body1, body2=body2), body.longitude_difference(jd=self.jd_next_sunrise, body1=body1, body2=body2)]
+    (separation_sunrise, separation_next_sunrise) = separations
 
     sign = lambda x: -1 if x < 0 else (1 if x > 0 else (0 if x == 0 else None))
 
     # the last condition avoids marking गुरुः (179.04° → -179.80°) as a conjunction
-    crossover_inbetween = sign(body.longitude_difference(jd=self.jd_sunrise, body1=body1, body2=body2)) != sign(body.longitude_difference(jd=self.jd_next_sunrise, body1=body1, body2=body2)) and abs(body.longitude_difference(jd=self.jd_sunrise, body1=body1, body2=body2)) < 90
-    return has_collision(jd=self.jd_sunrise) or has_collision(jd=self.jd_next_sunrise) or crossover_inbetween
+    crossover_inbetween = sign(separation_sunrise) != sign(separation_next_sunrise) and abs(separation_sunrise) < 90
+    return abs(separation_sunrise) < gap or abs(separation_next_sunrise) < gap or crossover_inbetween
+
+  def set_mauDhyas(self, sun_separations=None):
+    """
 
-  def set_mauDhyas(self):
+    :param sun_separations: Optional dict from graha id to its longitude difference from the sun at sunrise and next sunrise (see set_mauDhyas_for_days). Computed here otherwise.
+    """
+    if sun_separations is None:
+      sun_separations = get_sun_separations(jds=[self.jd_sunrise, self.jd_next_sunrise])
     sun = Graha.singleton(body_name=Graha.SUN)
     mauDhyas = {}
     amauDhyas = {}
 
-    for graha_id in [Graha.MERCURY, Graha.VENUS, Graha.MARS, Graha.JUPITER, Graha.SATURN]:
+    for graha_id in MAUDHYA_GRAHAS:
       graha = Graha.singleton(body_name=graha_id)
       gap = self.computation_system.graha_lopa_measures.graha_id_to_lopa_measure.get(graha_id, None)
 
-      if self.day_has_conjunction(body1=sun, body2=graha, gap=gap):
-        mauDhyas[graha_id] = [body.longitude_difference(jd=self.jd_sunrise, body1=sun, body2=graha), body.longitude_difference(jd=self.jd_next_sunrise, body1=sun, body2=graha)]
+      separations = list(sun_separations[graha_id])
+      if self.day_has_conjunction(body1=sun, body2=graha, gap=gap, separations=separations):
+        mauDhyas[graha_id] = separations
       else:
-        amauDhyas[graha_id] = [body.longitude_difference(jd=self.jd_sunrise, body1=sun, body2=graha), body.longitude_difference(jd=self.jd_next_sunrise, body1=sun, body2=graha)]
+        amauDhyas[graha_id] = separations
 
     if len(mauDhyas) > 0:
       self.mauDhyas = mauDhyas
@@ -547,8 +645,65 @@ class DailyPanchaanga(common.JsonObject):
 
 
   def set_graha_raashis(self):
-    for graha_id in [Graha.MERCURY, Graha.VENUS, Graha.MARS, Graha.JUPITER, Graha.SATURN, Graha.RAHU, Graha.KETU, Graha.SUN]:
-      self.sunrise_day_angas.graha_raashis_with_ends[graha_id] = AngaSpanFinder.get_cached(ayanaamsha_id=self.computation_system.ayanaamsha_id, anga_type=zodiac.AngaType.GRAHA_RASHI[graha_id]).get_all_angas_in_period(jd1=self.jd_sunrise, jd2=self.jd_next_sunrise)
+    self.sunrise_day_angas._compute_graha_raashis = None
+    for graha_id in GRAHA_RAASHI_GRAHAS:
+      anga_type = zodiac.AngaType.GRAHA_RASHI[graha_id]
+      transit_index = self._anga_timelines.get(anga_type.name, None)
+      if transit_index is None:
+        transit_index = zodiac.GrahaTransitIndex(graha_id=graha_id, ayanaamsha_id=self.computation_system.ayanaamsha_id, anga_type=anga_type, jd_start=self.jd_sunrise, jd_end=self.jd_next_sunrise)
+      self.sunrise_day_angas.graha_raashis_with_ends[graha_id] = transit_index.get_spans_in_period(jd1=self.jd_sunrise, jd2=self.jd_next_sunrise)
+
+
+GRAHA_RAASHI_GRAHAS = [Graha.MERCURY, Graha.VENUS, Graha.MARS, Graha.JUPITER, Graha.SATURN, Graha.RAHU, Graha.KETU, Graha.SUN]
+MAUDHYA_GRAHAS = [Graha.MERCURY, Graha.VENUS, Graha.MARS, Graha.JUPITER, Graha.SATURN]
+
+
+def get_sun_separations(jds):
+  """Longitude differences of the sun from MAUDHYA_GRAHAS, from a single body.SeparationScanner.
+  
+  :return: dict from graha id to a list of differences, one per jd.
+  """
+  scanner = body.SeparationScanner(body_names=[Graha.SUN] + MAUDHYA_GRAHAS, jds=jds)
+  return {graha_id: scanner.get_differences(body1=Graha.SUN, body2=graha_id).tolist() for graha_id in MAUDHYA_GRAHAS}
+
+
+def set_mauDhyas_for_days(daily_panchaangas):
+  """Compute the mauDhyas field for many days, with all the separations computed in one go.
+  
+  A day's next sunrise is the following day's sunrise - so each distinct sunrise is sampled once.
+  """
+  jds = sorted(set(jd for daily_panchaanga in daily_panchaangas for jd in (daily_panchaanga.jd_sunrise, daily_panchaanga.jd_next_sunrise)))
+  jd_to_index = {jd: index for index, jd in enumerate(jds)}
+  sun_separations = get_sun_separations(jds=jds)
+  for daily_panchaanga in daily_panchaangas:
+    indices = (jd_to_index[daily_panchaanga.jd_sunrise], jd_to_index[daily_panchaanga.jd_next_sunrise])
+    daily_panchaanga.compute_field(field="mauDhyas", sun_separations={graha_id: [separations[index] for index in indices] for graha_id, separations in sun_separations.items()})
+
+
+def get_sunrise_day_anga_ayanaamsha_id(anga_type, computation_system):
+  if anga_type == AngaType.TITHI:
+    # Deliberately using ASHVINI_STARTING_0 since it is cheapest. Tithi is independent of ayanAmsha.
+    return Ayanamsha.ASHVINI_STARTING_0
+  else:
+    return computation_system.ayanaamsha_id
+
+
+def get_anga_timelines(jd_start, jd_end, computation_system):
+  """Compute timelines of the angas in DayAngas for a whole period, to be passed on to DailyPanchaanga-s within it.
+  
+  :param jd_start: Should be before the first sunrise of interest.
+  :param jd_end: Should be after the last (next day) sunrise of interest.  
+  :return: dict from anga type name to zodiac.AngaTimeline (or zodiac.GrahaTransitIndex, for graha raashis)
+  """
+  anga_timelines = {}
+  for anga_type in [AngaType.TITHI, AngaType.NAKSHATRA, AngaType.YOGA, AngaType.KARANA, AngaType.RASHI, AngaType.SOLAR_NAKSH]:
+    ayanaamsha_id = get_sunrise_day_anga_ayanaamsha_id(anga_type=anga_type, computation_system=computation_system)
+    anga_timelines[anga_type.name] = zodiac.AngaTimeline(ayanaamsha_id=ayanaamsha_id, anga_type=anga_type, jd_start=jd_start, jd_end=jd_end)
+  for graha_id in GRAHA_RAASHI_GRAHAS:
+    anga_type = AngaType.GRAHA_RASHI[graha_id]
+    anga_timelines[anga_type.name] = zodiac.GrahaTransitIndex(graha_id=graha_id, ayanaamsha_id=computation_system.ayanaamsha_id, anga_type=anga_type, jd_start=jd_start, jd_end=jd_end)
+  return anga_timelines
+
 
 # Essential for depickling to work.
 common.update_json_class_index(sys.modules[__name__])
@@ -4,18 +4,14 @@ import sys
 from collections import defaultdict
 from typing import Dict
 
-import methodtools
 import regex
 from timebudget import timebudget
 
 from jyotisha.panchaanga.spatio_temporal import daily
 from jyotisha.panchaanga.temporal import time, set_constants, ComputationSystem, AngaType, era
-from jyotisha.panchaanga.temporal.festival import FestivalInstance
-from jyotisha.panchaanga.temporal.festival.applier import tithi_festival, ecliptic, solar, vaara, rule_repo_based, \
-  FestivalAssigner
+from jyotisha.panchaanga.temporal.festival import FestivalInstance, dependencies, pipeline, rules
+from jyotisha.panchaanga.temporal.interval import MonthTaggedAngaSpan
 from jyotisha.panchaanga.temporal.time import Date
-from jyotisha.panchaanga.temporal.tithi import ShraadhaTithiAssigner
-from jyotisha.panchaanga.temporal.zodiac.angas import Tithi
 from jyotisha.util import default_if_none
 from sanskrit_data import collection_helper
 from sanskrit_data.schema import common
@@ -25,16 +21,55 @@ timebudget.set_quiet(True)  # don't show measurements as they happen
 
 set_constants()
 
+# See Panchaanga._compute_daily_panchaangas_in_parallel
+PARALLEL_CHUNK_OVERLAP_DAYS = 1
+
+
+def compute_daily_panchaangas(city, dates, computation_system, compute_lagnas=True, anga_timelines=None, previous_day_panchaanga=None):
+  """Compute daily panchaangas for consecutive dates, each using the previous one. 
+  
+  Module-level, so that it can be run in worker processes.
+  """
+  daily_panchaangas = []
+  # mauDhyas are set for all days together, below.
+  fields = [field for field in daily.DailyPanchaanga.get_default_fields(computation_system=computation_system) if field != "mauDhyas"]
+  for date in dates:
+    daily_panchaanga = daily.DailyPanchaanga(city=city, date=date,
+                                             computation_system=computation_system,
+                                             previous_day_panchaanga=previous_day_panchaanga, anga_timelines=anga_timelines, fields=fields)
+    if compute_lagnas:
+      daily_panchaanga.get_lagna_data()
+    daily_panchaangas.append(daily_panchaanga)
+    previous_day_panchaanga = daily_panchaanga
+  if len(daily_panchaangas) > 0:
+    daily.set_mauDhyas_for_days(daily_panchaangas=daily_panchaangas)
+  return daily_panchaangas
+
+
+# Set (only) while forking worker processes in Panchaanga._compute_daily_panchaangas_in_parallel.
+_parallel_computation_inputs = None
+
+
+def _compute_daily_panchaanga_maps(index_start, index_end):
+  (city, dates, computation_system, compute_lagnas, anga_timelines) = _parallel_computation_inputs
+  daily_panchaangas = compute_daily_panchaangas(city=city, dates=dates[index_start:index_end], computation_system=computation_system, compute_lagnas=compute_lagnas, anga_timelines=anga_timelines)
+  return [daily_panchaanga.to_json_map() for daily_panchaanga in daily_panchaangas]
+
 
 class Panchaanga(common.JsonObject):
   """This class enables the construction of a panchaanga for arbitrary periods, with festival_id_to_instance.
   
     Generally, which days is a given festival associated with (esp pre-sunrise events)? We follow the same conventions as the adyatithi repo.
     """
-  LATEST_VERSION = "0.0.4"
+  LATEST_VERSION = "0.0.5"
 
-  def __init__(self, city, start_date, end_date, year_type = None, computation_system: ComputationSystem = None, recompute_festivals=True):
+  def __init__(self, city, start_date, end_date, year_type = None, computation_system: ComputationSystem = None, recompute_festivals=True, max_workers=None, anga_timelines=None, graha_transits=None, festival_max_workers=None):
     """Constructor for the panchaanga.
+    
+    :param max_workers: If more than 1, daily panchaangas are computed in parallel by these many processes (see compute_angas).
+    :param festival_max_workers: If more than 1, festival assignment stages are run in parallel by these many processes (see update_festival_details).
+    :param anga_timelines: Optional location-independent anga timelines (see daily.get_anga_timelines) shared with other panchaangas over the same period - see get_panchaangas_for_cities.
+    :param graha_transits: Optional dict of GrahaTransitIndex-s for get_graha_transits (for those not in anga_timelines), likewise shared.
         """
     super(Panchaanga, self).__init__()
     self.version = Panchaanga.LATEST_VERSION
@@ -60,49 +95,182 @@ class Panchaanga(common.JsonObject):
     self.weekday_start = time.get_weekday(self.jd_start)
 
     self.festival_id_to_days = defaultdict(set, {})
-    self.compute_angas(compute_lagnas=self.computation_system.festival_options.lagnas)
+    self._graha_transits = default_if_none(graha_transits, {})
+    self.compute_angas(compute_lagnas=self.computation_system.festival_options.lagnas, max_workers=max_workers, anga_timelines=anga_timelines)
     if not self.computation_system.festival_options.no_fests and recompute_festivals:
-      self.update_festival_details()
+      self.update_festival_details(max_workers=festival_max_workers)
 
   @timebudget
-  def compute_angas(self, compute_lagnas=True):
+  def compute_angas(self, compute_lagnas=True, max_workers=None, anga_timelines=None):
     """Compute the entire panchaanga
+    
+    :param max_workers: If more than 1, the days are split into as many chunks, which are computed by a process pool and stitched together. The result is identical to sequential computation.
+    :param anga_timelines: Precomputed anga timelines covering the padded period. Computed here if not provided.
     """
 
     # INITIALISE VARIABLES
     self.date_str_to_panchaanga: Dict[str, daily.DailyPanchaanga] = {}
-
+    # See get_interval_anga_spans.
+    self._interval_anga_span_views = {}
+    # See get_boundary_anga_cache.
+    self._boundary_anga_cache = None
+
+    # Rising and setting times of all grahas, likewise, in one pass.
+    self.city.get_rise_set_times(jd_start=self.jd_start - self.duration_prior_padding - 2, jd_end=self.jd_start + self.duration_posterior_padding + 2)
+    # Anga spans are computed once for the whole padded period (with a day to spare on either side for sunrises), and sliced for each day.
+    if anga_timelines is None:
+      anga_timelines = daily.get_anga_timelines(jd_start=self.jd_start - self.duration_prior_padding - 1, jd_end=self.jd_start + self.duration_posterior_padding + 1, computation_system=self.computation_system)
+    self._anga_timelines = anga_timelines
 
     #############################################################
     # Compute all parameters -- sun/moon latitude/longitude etc #
     #############################################################
 
+    dates = []
     for d in range(-self.duration_prior_padding, self.duration_posterior_padding - 1):
       # The below block is temporary code to make the transition seamless.
       date_d = time.jd_to_utc_gregorian(self.jd_start + d)
       date_d.set_time_to_day_start()
-      previous_daily_panchaanga = self.date_str_to_panchaanga.get(date_d.offset_date(days=-1).get_date_str(), None)
-      daily_panchaanga = daily.DailyPanchaanga(city=self.city, date=date_d,
-                                               computation_system=self.computation_system,
-                                               previous_day_panchaanga=previous_daily_panchaanga)
-      if compute_lagnas:
-        daily_panchaanga.get_lagna_data()
-      self.date_str_to_panchaanga[date_d.get_date_str()] = daily_panchaanga
-
-  @methodtools.lru_cache(maxsize=10)
-  def daily_panchaangas_sorted(self, skip_padding_days=False):
-    if not skip_padding_days:
-      return sorted(self.date_str_to_panchaanga.values())
+      dates.append(date_d)
+
+    if max_workers is not None and max_workers > 1:
+      daily_panchaangas = self._compute_daily_panchaangas_in_parallel(dates=dates, compute_lagnas=compute_lagnas, anga_timelines=anga_timelines, max_workers=max_workers)
     else:
-      full_list = sorted(self.date_str_to_panchaanga.values())
-      return [x for x in full_list if self.start_date <= x.date and x.date <= self.end_date]
+      daily_panchaangas = compute_daily_panchaangas(city=self.city, dates=dates, computation_system=self.computation_system, compute_lagnas=compute_lagnas, anga_timelines=anga_timelines)
+    self._index_daily_panchaangas()
+    for daily_panchaanga in daily_panchaangas:
+      self.set_daily_panchaanga(daily_panchaanga=daily_panchaanga)
+
+  def set_daily_panchaanga(self, daily_panchaanga):
+    """Add or replace the daily panchaanga for its date - keeping the day store (see daily_panchaanga_for_index) in sync. Entries of date_str_to_panchaanga are to be written only via this method.
+    
+    The store is updated in place (and extended as necessary) if in sync; else rebuilt.
+    """
+    date_str = daily_panchaanga.date.get_date_str()
+    is_new = date_str not in self.date_str_to_panchaanga
+    in_sync = self.__dict__.get("_daily_panchaangas") is not None and self.__dict__.get("_indexed_date_str_to_panchaanga") is self.date_str_to_panchaanga and self._num_daily_panchaangas == len(self.date_str_to_panchaanga)
+    self.date_str_to_panchaanga[date_str] = daily_panchaanga
+    if not in_sync:
+      self._index_daily_panchaangas()
+      return
+    day_number = time.ymd_to_day_number(year=daily_panchaanga.date.year, month=daily_panchaanga.date.month, day=daily_panchaanga.date.day)
+    if len(self._daily_panchaangas) == 0:
+      self._first_day_number = day_number
+    index = day_number - self._first_day_number
+    if index < 0:
+      self._daily_panchaangas = [None] * (-index) + self._daily_panchaangas
+      self._first_day_number = day_number
+      index = 0
+    elif index >= len(self._daily_panchaangas):
+      self._daily_panchaangas.extend([None] * (index + 1 - len(self._daily_panchaangas)))
+    self._daily_panchaangas[index] = daily_panchaanga
+    if is_new:
+      self._num_daily_panchaangas += 1
+
+  def _compute_daily_panchaangas_in_parallel(self, dates, compute_lagnas, anga_timelines, max_workers):
+    """The first chunk of days is computed here, the rest in forked worker processes (which inherit the inputs, including the rise/set and anga timelines). Workers return json maps, since JsonObject-s don't survive pickling.
+    
+    Each chunk is computed starting PARALLEL_CHUNK_OVERLAP_DAYS early, without a previous day panchaanga. It is accepted if its last overlapping day is identical to the corresponding (already stitched) day - since each day depends only on its inputs and on the previous day, the rest of the chunk is then identical to sequential output. Otherwise (rare - eg. if a day count carried over from previous days differs from a fresh computation), the chunk is recomputed sequentially here. 
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    if "fork" not in multiprocessing.get_all_start_methods():
+      logging.warning("Parallel computation needs the fork start method - computing sequentially.")
+      return compute_daily_panchaangas(city=self.city, dates=dates, computation_system=self.computation_system, compute_lagnas=compute_lagnas, anga_timelines=anga_timelines)
+    chunk_size = -(-len(dates) // max_workers)
+    chunk_starts = list(range(0, len(dates), chunk_size))
+
+    global _parallel_computation_inputs
+    _parallel_computation_inputs = (self.city, dates, self.computation_system, compute_lagnas, anga_timelines)
+    try:
+      with ProcessPoolExecutor(max_workers=max_workers - 1, mp_context=multiprocessing.get_context("fork")) as executor:
+        futures = [executor.submit(_compute_daily_panchaanga_maps, max(0, start - PARALLEL_CHUNK_OVERLAP_DAYS), start + chunk_size) for start in chunk_starts[1:]]
+        daily_panchaangas = compute_daily_panchaangas(city=self.city, dates=dates[:chunk_size], computation_system=self.computation_system, compute_lagnas=compute_lagnas, anga_timelines=anga_timelines)
+        chunk_maps = [future.result() for future in futures]
+    finally:
+      _parallel_computation_inputs = None
+
+    for start, daily_panchaanga_maps in zip(chunk_starts[1:], chunk_maps):
+      num_overlap_days = start - max(0, start - PARALLEL_CHUNK_OVERLAP_DAYS)
+      previous_daily_panchaanga = daily_panchaangas[-1]
+      if daily_panchaanga_maps[num_overlap_days - 1] == previous_daily_panchaanga.to_json_map():
+        for daily_panchaanga_map in daily_panchaanga_maps[num_overlap_days:]:
+          daily_panchaanga = common.JsonObject.make_from_dict(daily_panchaanga_map)
+          # Restore objects which are shared (or not serialized) in sequential computation.
+          daily_panchaanga.city = self.city
+          daily_panchaanga.computation_system = self.computation_system
+          daily_panchaanga._anga_timelines = anga_timelines
+          daily_panchaanga._previous_day_panchaanga = daily_panchaangas[-1]
+          daily_panchaangas.append(daily_panchaanga)
+      else:
+        logging.info("Chunk starting %s does not match its predecessor - recomputing sequentially.", str(dates[start]))
+        daily_panchaangas.extend(compute_daily_panchaangas(city=self.city, dates=dates[start: start + chunk_size], computation_system=self.computation_system, compute_lagnas=compute_lagnas, anga_timelines=anga_timelines, previous_day_panchaanga=previous_daily_panchaanga))
+    return daily_panchaangas
+
+  def get_graha_transits(self, graha, jd_start, jd_end, ayanaamsha_id):
+    """Raashi transits of a graha (see Graha.get_transits), read from the GrahaTransitIndex shared with daily graha raashis - possibly across panchaangas for different cities (see get_panchaangas_for_cities), since these are location-independent."""
+    from jyotisha.panchaanga.temporal.zodiac import GrahaTransitIndex
+    anga_type = AngaType.GRAHA_RASHI[graha]
+    transit_index = None if self._anga_timelines is None else self._anga_timelines.get(anga_type.name, None)
+    if transit_index is None or transit_index.ayanaamsha_id != ayanaamsha_id:
+      if self._graha_transits is None:
+        # Deserialized panchaanga.
+        self._graha_transits = {}
+      key = (graha, ayanaamsha_id)
+      if key not in self._graha_transits:
+        self._graha_transits[key] = GrahaTransitIndex(graha_id=graha, ayanaamsha_id=ayanaamsha_id, anga_type=anga_type, jd_start=jd_start, jd_end=jd_end)
+      transit_index = self._graha_transits[key]
+    return transit_index.get_transits(jd1=jd_start, jd2=jd_end)
+
+  def _index_daily_panchaangas(self):
+    """(Re)build the day store - a list of daily panchaangas indexed by the offset of their date from that of the first one (with None for any missing dates). 
+    
+    date_str_to_panchaanga remains the serialized form; the store is rebuilt from it when absent (eg. after deserialization), when date_str_to_panchaanga is replaced or resized - and kept in sync by set_daily_panchaanga.
+    """
+    days = sorted((time.ymd_to_day_number(year=dp.date.year, month=dp.date.month, day=dp.date.day), dp) for dp in self.date_str_to_panchaanga.values())
+    self._indexed_date_str_to_panchaanga = self.date_str_to_panchaanga
+    self._num_daily_panchaangas = len(days)
+    if len(days) == 0:
+      (self._first_day_number, self._daily_panchaangas) = (0, [])
+      return
+    self._first_day_number = days[0][0]
+    self._daily_panchaangas = [None] * (days[-1][0] - days[0][0] + 1)
+    for (day_number, dp) in days:
+      self._daily_panchaangas[day_number - self._first_day_number] = dp
+
+  def _get_daily_panchaangas(self):
+    if self._daily_panchaangas is None or self.__dict__.get("_indexed_date_str_to_panchaanga") is not self.date_str_to_panchaanga or self._num_daily_panchaangas != len(self.date_str_to_panchaanga):
+      self._index_daily_panchaangas()
+    return self._daily_panchaangas
+
+  def daily_panchaanga_for_index(self, index):
+    """
+
+    :param index: Offset in days from the first (padding) day.
+    :return: None if not available.
+    """
+    daily_panchaangas = self._get_daily_panchaangas()
+    if 0 <= index < len(daily_panchaangas):
+      return daily_panchaangas[index]
+    return None
+
+  def daily_panchaangas_sorted(self, skip_padding_days=False):
+    daily_panchaangas = self._get_daily_panchaangas()
+    if skip_padding_days:
+      daily_panchaangas = daily_panchaangas[max(0, self.get_day_index(date=self.start_date)): max(0, self.get_day_index(date=self.end_date) + 1)]
+    return [dp for dp in daily_panchaangas if dp is not None]
+
+  def get_day_index(self, date):
+    """Index of the given date in the day store (see daily_panchaanga_for_index) - which may be out of range."""
+    self._get_daily_panchaangas()
+    return time.ymd_to_day_number(year=date.year, month=date.month, day=date.day) - self._first_day_number
 
   def daily_panchaanga_for_jd(self, jd):
-    date = self.city.get_timezone_obj().julian_day_to_local_time(julian_day=jd)
-    return self.daily_panchaanga_for_date(date=date)
+    self._get_daily_panchaangas()
+    return self.daily_panchaanga_for_index(self.city.get_timezone_obj().julian_day_to_local_day_number(jd=jd) - self._first_day_number)
 
   def daily_panchaanga_for_date(self, date):
-    return self.date_str_to_panchaanga.get(date.get_date_str(), None)
+    return self.daily_panchaanga_for_index(self.get_day_index(date=date))
 
   def pre_sunset_daily_panchaanga_for_jd(self, jd):
     panchaanga = self.daily_panchaanga_for_jd(jd=jd)
@@ -123,22 +291,46 @@ class Panchaanga(common.JsonObject):
       return self.daily_panchaanga_for_date(date=panchaanga.date - 1)
 
   def get_interval_anga_spans(self, date, interval_id, anga_type):
+    """Anga spans of the daily panchaanga for the date, with tithis tagged by their lunar months.
+
+    Results are memoized - daily anga spans don't change once computed.
+    :return: Tuple of (read-only) MonthTaggedAngaSpan-s.
+    """
+    span_views_cache = self.__dict__.get("_interval_anga_span_views", None)
+    if span_views_cache is None:
+      span_views_cache = {}
+      self._interval_anga_span_views = span_views_cache
+    key = (date.get_date_str(), interval_id, anga_type.name)
+    if key in span_views_cache:
+      return span_views_cache[key]
+
     dp = self.daily_panchaanga_for_date(date)
     (anga_spans, _) = dp.get_interval_anga_spans(interval_id=interval_id, anga_type=anga_type)
-    anga_spans = copy.deepcopy(anga_spans)
-
     if anga_type == AngaType.TITHI:
+      span_views = []
       for span in anga_spans:
         if span.anga.index in (1, 2):
           # The below is necessary because tithi 1 or 2 may start after sunrise.
           dp_next = self.daily_panchaanga_for_date(date + 1)
           # Lunar month below may be incorrect (adhika mAsa complication) if dp_next is not available (eg when the next day is beyond this panchaanga duration). Downstream code should be aware of that case.
           month = dp_next.lunar_date.month if dp_next is not None else dp.lunar_date.month + 1
-          span.anga = Tithi.from_anga(anga=span.anga, month=month)
+          span_views.append(MonthTaggedAngaSpan(span=span, month=month))
         else:
-          span.anga = Tithi.from_anga(anga=span.anga, month=dp.lunar_date.month)
+          span_views.append(MonthTaggedAngaSpan(span=span, month=dp.lunar_date.month))
+    else:
+      span_views = [MonthTaggedAngaSpan(span=span) for span in anga_spans]
+
+    span_views_cache[key] = tuple(span_views)
+    return span_views_cache[key]
 
-    return anga_spans
+  def get_boundary_anga_cache(self):
+    """Angas at instants within this panchaanga, looked up in its anga timelines where possible (see zodiac.BoundaryAngaCache)."""
+    boundary_anga_cache = self.__dict__.get("_boundary_anga_cache", None)
+    if boundary_anga_cache is None:
+      from jyotisha.panchaanga.temporal.zodiac import BoundaryAngaCache
+      boundary_anga_cache = BoundaryAngaCache(anga_timelines=self.__dict__.get("_anga_timelines", None))
+      self._boundary_anga_cache = boundary_anga_cache
+    return boundary_anga_cache
 
   def clear_padding_day_festivals(self):
     """Festival assignments for padding days are not trustworthy - since one would need to look-ahead or before into further days for accurate festival assignment. They were computed only to ensure accurate computation of the core days in this panchaanga. To avoid misleading, we ought to clear festivals provisionally assigned to the padding days."""
@@ -149,30 +341,56 @@ class Panchaanga(common.JsonObject):
       self.delete_festivals_on_date(date=dp.date)
 
   @timebudget
-  def update_festival_details(self, compute_shraadha_tithis=False):
+  def update_festival_details(self, compute_shraadha_tithis=False, incremental=True, max_workers=None, count_ephemeris_calls=False):
     """
 
     Festival data may be updated more frequently and a precomputed panchaanga may go out of sync. Hence we keep this method separate.
+    :param incremental: If dependencies recorded during the previous call are available (see festival.dependencies), recompute only festivals affected by changes in the rules since.
+    :param max_workers: If more than 1, independent assignment stages are run in parallel by these many processes (see festival.pipeline). Per stage timings are left in _festival_stage_reports.
+    :param count_ephemeris_calls: Include Swiss ephemeris call counts in _festival_stage_reports - for profiling.
     :return:
     """
-    self._reset_festivals()
-    rule_lookup_assigner = rule_repo_based.RuleLookupAssigner(panchaanga=self)
-    rule_lookup_assigner.apply_festival_from_rules_repos()
-    if compute_shraadha_tithis:
-      ShraadhaTithiAssigner(panchaanga=self).assign_shraaddha_tithi()
-    ecliptic.EclipticFestivalAssigner(panchaanga=self).assign_all()
-    tithi_festival.TithiFestivalAssigner(panchaanga=self).assign_all()
-    solar.SolarFestivalAssigner(panchaanga=self).assign_all()
-    vaara.VaraFestivalAssigner(panchaanga=self).assign_all()
-    generic_assigner = FestivalAssigner(panchaanga=self)
-    rule_lookup_assigner.assign_relative_festivals()
-    # self._sync_festivals_dict_and_daily_festivals(here_to_daily=True, daily_to_here=True)
-    generic_assigner.assign_festival_numbers()
-    tithi_festival.TithiFestivalAssigner(panchaanga=self).assign_relative_anadhyayana_days()
-    generic_assigner.cleanup_anadhyayana_festivals()
-    generic_assigner.cleanup_festivals()
-    self.clear_padding_day_festivals()
-
+    festival_options = self.computation_system.festival_options
+    rules_collection = rules.RulesCollection.get_cached(repos_tuple=tuple(festival_options.repos), julian_handling=festival_options.julian_handling)
+    options_hash = dependencies.get_options_hash(computation_system=self.computation_system, compute_shraadha_tithis=compute_shraadha_tithis)
+    fest_ids = None
+    festival_dependencies = self.get_festival_dependencies()
+    if incremental and festival_dependencies is not None:
+      fest_ids = festival_dependencies.get_festivals_to_recompute(rules_collection=rules_collection, options_hash=options_hash)
+      if fest_ids is not None and len(fest_ids) == 0:
+        logging.info("Festival rules unchanged - not recomputing festivals.")
+        return
+
+    recorder = dependencies.DependencyRecorder()
+    if fest_ids is None:
+      self._reset_festivals()
+    else:
+      logging.info("Recomputing %d festivals affected by changed rules.", len(fest_ids))
+      # Code based stages are not rerun - their dependencies stand.
+      recorder.code_festival_ids = set(festival_dependencies.code_festival_ids)
+      recorder.code_id_fragments = set(festival_dependencies.code_id_fragments)
+      recorder.anchors = dict(festival_dependencies.anchors)
+      for fest_id in fest_ids:
+        self.delete_festival(fest_id=rules.clean_id(fest_id))
+    # Lookups from code based assigners are recorded.
+    self.festival_id_to_days = dependencies.make_recording_dict(dict_in=defaultdict(set, self.festival_id_to_days), recorder=recorder)
+    name_to_rule = rules_collection.name_to_rule
+    rules_collection.name_to_rule = dependencies.make_recording_dict(dict_in=name_to_rule, recorder=recorder)
+    for daily_panchaanga in self.date_str_to_panchaanga.values():
+      daily_panchaanga.festival_id_to_instance = dependencies.make_recording_dict(dict_in=daily_panchaanga.festival_id_to_instance, recorder=recorder)
+    try:
+      run = pipeline.FestivalPipelineRun(panchaanga=self, recorder=recorder, fest_ids=fest_ids, compute_shraadha_tithis=compute_shraadha_tithis, count_ephemeris_calls=count_ephemeris_calls)
+      self._festival_stage_reports = pipeline.run_stages(run=run, max_workers=max_workers)
+    finally:
+      rules_collection.name_to_rule = name_to_rule
+      self.festival_id_to_days = defaultdict(set, self.festival_id_to_days)
+      for daily_panchaanga in self.date_str_to_panchaanga.values():
+        daily_panchaanga.festival_id_to_instance = dict(daily_panchaanga.festival_id_to_instance)
+    self._festival_dependencies = dependencies.FestivalDependencies(options_hash=options_hash, rule_hashes=dependencies.get_rule_hashes(rules_collection=rules_collection), recorder=recorder, relative_stage_days=run.relative_stage_days)
+
+  def get_festival_dependencies(self):
+    """Dependencies recorded by the last update_festival_details call (see festival.dependencies) - if available."""
+    return self.__dict__.get("_festival_dependencies", None)
 
   def _sync_festivals_dict_and_daily_festivals(self, here_to_daily=False, daily_to_here=True):
     if here_to_daily:
@@ -252,6 +470,15 @@ class Panchaanga(common.JsonObject):
   def post_load_ops(self):
     self._refill_daily_panchaangas()
     self.festival_id_to_days = collection_helper.lists_to_sets(self.festival_id_to_days)
+    # Formerly serialized with the panchaanga - see dependencies.load.
+    self.__dict__.pop("festival_dependencies", None)
+
+  @classmethod
+  def read_from_file(cls, filename, name_to_json_class_index_extra=None, **kwargs):
+    panchaanga = super(Panchaanga, cls).read_from_file(filename=filename, name_to_json_class_index_extra=name_to_json_class_index_extra, **kwargs)
+    if isinstance(panchaanga, Panchaanga):
+      panchaanga._festival_dependencies = dependencies.load(panchaanga_filename=filename, festival_id_to_days=panchaanga.festival_id_to_days)
+    return panchaanga
 
   @timebudget
   def dump_to_file(self, filename, floating_point_precision=None, sort_keys=True):
@@ -261,6 +488,26 @@ class Panchaanga(common.JsonObject):
                                          sort_keys=sort_keys)
     self.festival_id_to_days = collection_helper.lists_to_sets(self.festival_id_to_days)
     self._refill_daily_panchaangas()
+    festival_dependencies = self.get_festival_dependencies()
+    if festival_dependencies is not None:
+      dependencies.save(festival_dependencies=festival_dependencies, panchaanga_filename=filename, festival_id_to_days=self.festival_id_to_days)
+
+
+def get_panchaangas_for_cities(cities, start_date, end_date, year_type=None, computation_system: ComputationSystem = None, recompute_festivals=True, max_workers=None):
+  """Compute panchaangas for many cities over the same dates.
+  
+  The location-independent (geocentric) computations - anga timelines and graha transits - are done once and shared. Only rising/setting times, lagnas and festival assignment are computed per city. 
+
+  :return: List of Panchaanga-s, in the order of cities.
+  """
+  panchaangas = []
+  anga_timelines = None
+  graha_transits = {}
+  for city in cities:
+    panchaanga = Panchaanga(city=city, start_date=copy.deepcopy(start_date), end_date=copy.deepcopy(end_date), year_type=year_type, computation_system=computation_system, recompute_festivals=recompute_festivals, max_workers=max_workers, anga_timelines=anga_timelines, graha_transits=graha_transits)
+    anga_timelines = panchaanga._anga_timelines
+    panchaangas.append(panchaanga)
+  return panchaangas
 
 
 # Essential for depickling to work.
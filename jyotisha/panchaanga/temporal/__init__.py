@@ -10,6 +10,7 @@ from sanskrit_data.schema.common import JsonObject
 from jyotisha.panchaanga.temporal.body import Graha
 from jyotisha.panchaanga.temporal.festival.rules import RulesCollection, RulesRepo
 from jyotisha.panchaanga.temporal.zodiac.angas import BoundaryAngas, Anga, AngaType
+from jyotisha.util import default_if_none
 
 logging.basicConfig(
   level=logging.DEBUG,
@@ -29,6 +30,21 @@ class PeriodicPanchaangaApplier(JsonObject):
     self.daily_panchaangas = self.panchaanga.daily_panchaangas_sorted()
     self.ayanaamsha_id = panchaanga.computation_system.ayanaamsha_id
 
+  def get_anga(self, jd, anga_type, ayanaamsha_id=None):
+    """Anga at jd - looked up in the panchaanga's anga timelines where possible (see Panchaanga.get_boundary_anga_cache).
+
+    :param ayanaamsha_id: Defaults to that of the computation system.
+    """
+    return self.panchaanga.get_boundary_anga_cache().get_anga(jd=jd, anga_type=anga_type, ayanaamsha_id=default_if_none(ayanaamsha_id, self.ayanaamsha_id))
+
+  def get_tithi(self, jd):
+    """Same as tithi.get_tithi(jd) - looked up like get_anga."""
+    from jyotisha.panchaanga.temporal.zodiac import Ayanamsha
+    return self.get_anga(jd=jd, anga_type=AngaType.TITHI, ayanaamsha_id=Ayanamsha.VERNAL_EQUINOX_AT_0)
+
+  def get_boundary_angas(self, interval, anga_type):
+    return interval.get_boundary_angas(anga_type=anga_type, ayanaamsha_id=self.ayanaamsha_id, boundary_anga_cache=self.panchaanga.get_boundary_anga_cache())
+
   def assign_all(self):
     pass
 
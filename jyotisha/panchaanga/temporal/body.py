@@ -3,6 +3,7 @@ import math
 import sys
 
 import methodtools
+import numpy
 import swisseph as swe
 from scipy.optimize import brentq
 
@@ -33,6 +34,8 @@ class Graha(JsonObject):
   PLANETS_REVERSE_ORDER = [SATURN, JUPITER, MARS, VENUS, MERCURY, RAHU, KETU]
 
   BODY_TO_ANGULAR_DIA_DEGREES = {SUN: .53, JUPITER: 0.0147222, VENUS: 0.0183333, SATURN: 0.005583, MARS: 0.006972, MERCURY: 0.00361111}
+  # Upper bounds on the speed of the (tropical) longitude, rounded up from the maxima in 1800-2200. Rahu and ketu here are the true nodes.
+  MAX_SPEED_DEGREES_PER_DAY = {SUN: 1.02, MOON: 15.4, MERCURY: 2.21, VENUS: 1.26, MARS: 0.8, JUPITER: 0.25, SATURN: 0.14, RAHU: 0.26, KETU: 0.26}
 
   @methodtools.lru_cache(maxsize=None)
   @classmethod
@@ -72,15 +75,61 @@ class Graha(JsonObject):
     Default value of ayanaamsha_id here is deliberately None.
     :return: 
     """
+    from jyotisha.panchaanga.temporal import ephemeris
+    cache = ephemeris.get_active_cache()
     if ayanaamsha_id is not None:
       from jyotisha.panchaanga.temporal.zodiac import Ayanamsha
-      return (self.get_longitude(jd=jd) - Ayanamsha.singleton(ayanaamsha_id).get_offset(jd)) % 360
+      offset = None if cache is None else cache.get_ayanaamsha_offset(ayanaamsha_id=ayanaamsha_id, jd=jd)
+      if offset is None:
+        offset = Ayanamsha.singleton(ayanaamsha_id).get_offset(jd)
+      return (self.get_longitude(jd=jd) - offset) % 360
     else:
-      
+      if cache is not None:
+        longitude = cache.get_longitude(body_name=self.body_name, jd=jd)
+        if longitude is not None:
+          return longitude
       if self.body_name == Graha.KETU:
         return (swe.degnorm(swe.calc_ut(jd, swe.TRUE_NODE)[0][0]) + 180) % 360
       return swe.degnorm(swe.calc_ut(jd, self._get_swisseph_id())[0][0])
 
+  def get_longitude_and_speed(self, jd, ayanaamsha_id=None):
+    """Longitude as in get_longitude, along with the speed (in degrees per day) from the ephemeris (FLG_SPEED).
+    
+    The speed is that of the tropical longitude - the motion of the ayanaamsha point is slow enough to be ignored by the users of this method (root finders).
+    
+    :param jd: 
+    :param ayanaamsha_id: Default value of ayanaamsha_id here is deliberately None (as in get_longitude).
+    :return: (longitude, speed) 
+    """
+    from jyotisha.panchaanga.temporal import ephemeris
+    cache = ephemeris.get_active_cache()
+    longitude = None
+    if cache is not None:
+      longitude = cache.get_longitude(body_name=self.body_name, jd=jd)
+      speed = cache.get_speed(body_name=self.body_name, jd=jd)
+    if longitude is None:
+      if self.body_name == Graha.KETU:
+        (longitude, _, _, speed, _, _) = swe.calc_ut(jd, swe.TRUE_NODE, swe.FLG_SWIEPH | swe.FLG_SPEED)[0]
+        longitude = longitude + 180
+      else:
+        (longitude, _, _, speed, _, _) = swe.calc_ut(jd, self._get_swisseph_id(), swe.FLG_SWIEPH | swe.FLG_SPEED)[0]
+    if ayanaamsha_id is not None:
+      from jyotisha.panchaanga.temporal.zodiac import Ayanamsha
+      offset = None if cache is None else cache.get_ayanaamsha_offset(ayanaamsha_id=ayanaamsha_id, jd=jd)
+      if offset is None:
+        offset = Ayanamsha.singleton(ayanaamsha_id).get_offset(jd)
+      longitude = longitude - offset
+    return (longitude % 360, speed)
+
+  def get_longitudes(self, jds, ayanaamsha_id=None):
+    """Vectorized counterpart of get_longitude.
+
+    :param jds: Array-like of julian days.
+    :param ayanaamsha_id: Default value of ayanaamsha_id here is deliberately None (as in get_longitude).
+    :return: numpy array of longitudes, one per jd.
+    """
+    return get_longitudes(body_names=[self.body_name], jds=jds, ayanaamsha_id=ayanaamsha_id)[0]
+
   def get_transits(self, jd_start: float, jd_end: float, ayanaamsha_id: str, anga_type: object) -> [Transit]:
     """Returns the next transit of the given planet e.g. jupiter
 
@@ -99,39 +148,32 @@ class Graha(JsonObject):
     MIN_JUMP = min(1.0, jd_end - jd_start)
     # TODO: Could be tweaked based on planet using a dict?
 
-    curr_L_bracket = jd_start
-    curr_R_bracket = jd_start + MIN_JUMP
-
-    while curr_R_bracket <= jd_end:
-      L_division = math.floor(self.get_longitude(curr_L_bracket,
-                                                     ayanaamsha_id=ayanaamsha_id) / arc_length) + 1
-      R_division = math.floor(self.get_longitude(curr_R_bracket,
-                                                     ayanaamsha_id=ayanaamsha_id) / arc_length) + 1
+    # Sample the whole period in one go, and only then bracket the transits.
+    num_steps = int(math.floor((jd_end - jd_start) / MIN_JUMP)) if MIN_JUMP > 0 else 0
+    jds = jd_start + numpy.arange(num_steps + 1) * MIN_JUMP
+    divisions = numpy.floor(self.get_longitudes(jds=jds, ayanaamsha_id=ayanaamsha_id) / arc_length).astype(int) + 1
 
-      if L_division == R_division:
-        curr_R_bracket += MIN_JUMP
+    for i in numpy.flatnonzero(divisions[:-1] != divisions[1:]):
+      # We have bracketed a transit!
+      (L_division, R_division) = (int(divisions[i]), int(divisions[i + 1]))
+      if L_division < R_division:
+        target = R_division
       else:
-        # We have bracketed a transit!
-        if L_division < R_division:
-          target = R_division
-        else:
-          # retrograde transit
-          target = L_division
-        try:
-          def get_longitude_offset(jd):
-            return self.get_longitude(jd=jd, ayanaamsha_id=ayanaamsha_id) + (-target + 1) * arc_length
-
-          # noinspection PyTypeChecker
-          jd_transit = \
-            brentq(get_longitude_offset,
-                   curr_L_bracket, curr_R_bracket)
-          transits += [Transit(body=self.body_name, jd=jd_transit, anga_type=anga_type.name, value_1=L_division, value_2=R_division)]
-          curr_R_bracket += MIN_JUMP
-          curr_L_bracket = jd_transit + MIN_JUMP
-        except ValueError:
-          logging.error('Unable to compute transit of planet;\
-                                   possibly could not bracket correctly!\n')
-          return None
+        # retrograde transit
+        target = L_division
+      try:
+        def get_longitude_offset(jd):
+          return self.get_longitude(jd=jd, ayanaamsha_id=ayanaamsha_id) + (-target + 1) * arc_length
+
+        # noinspection PyTypeChecker
+        jd_transit = \
+          brentq(get_longitude_offset,
+                 jds[i], jds[i + 1])
+        transits += [Transit(body=self.body_name, jd=jd_transit, anga_type=anga_type.name, value_1=L_division, value_2=R_division)]
+      except ValueError:
+        logging.error('Unable to compute transit of planet;\
+                                 possibly could not bracket correctly!\n')
+        return None
 
     if len(transits) == 0:
       from jyotisha.panchaanga.temporal.time import ist_timezone
@@ -149,6 +191,38 @@ class Graha(JsonObject):
     return (self.get_longitude(jd + delta) - self.get_longitude(jd - delta)) / (2 * delta)
 
 
+def get_longitudes(body_names, jds, ayanaamsha_id=None):
+  """Sample the longitudes of several bodies at several instants in one call.
+  
+  Meant for scans over long periods, where one would otherwise call Graha.get_longitude point by point. The ayanaamsha offset is computed once per instant and shared by all bodies.
+
+  :param body_names: Eg. [Graha.SUN, Graha.MOON] 
+  :param jds: Array-like of julian days. 
+  :param ayanaamsha_id: Default value of ayanaamsha_id here is deliberately None (as in Graha.get_longitude).
+  :return: numpy array of shape (len(body_names), len(jds)).
+  """
+  from jyotisha.panchaanga.temporal import ephemeris
+  cache = ephemeris.get_active_cache()
+  jds = numpy.atleast_1d(numpy.asarray(jds, dtype=float))
+  longitudes = numpy.empty((len(body_names), len(jds)))
+  calc_ut = swe.calc_ut
+  for index, body_name in enumerate(body_names):
+    if cache is not None:
+      longitudes[index] = cache.get_longitudes(body_name=body_name, jds=jds)
+    elif body_name == Graha.KETU:
+      longitudes[index] = [calc_ut(jd, swe.TRUE_NODE)[0][0] + 180 for jd in jds]
+    else:
+      body_id = Graha.singleton(body_name)._get_swisseph_id()
+      longitudes[index] = [calc_ut(jd, body_id)[0][0] for jd in jds]
+  if ayanaamsha_id is not None:
+    if cache is not None:
+      longitudes -= cache.get_ayanaamsha_offsets(ayanaamsha_id=ayanaamsha_id, jds=jds)
+    else:
+      from jyotisha.panchaanga.temporal.zodiac import Ayanamsha
+      longitudes -= Ayanamsha.singleton(ayanaamsha_id).get_offsets(jds)
+  return longitudes % 360
+
+
 def longitude_difference(jd, body1, body2):
   """
   
@@ -169,6 +243,68 @@ def longitude_difference(jd, body1, body2):
   if diff < -180:
     return 360 + diff
 
+
+def normalize_longitude_differences(differences):
+  """Vectorized counterpart of the normalization in longitude_difference (into [-180, 180])."""
+  return numpy.where(differences > 180, differences - 360, numpy.where(differences < -180, differences + 360, differences))
+
+
+class SeparationScanner(object):
+  """Longitude differences (as in longitude_difference) between pairs of bodies, sampled as arrays at given instants.
+
+  The longitudes of all bodies involved are computed once (see get_longitudes), so that scanning several pairs costs about as much as scanning one. Threshold crossings are bracketed by sign changes between consecutive samples, and then located by brentq.
+  """
+
+  def __init__(self, body_names, jds):
+    """
+
+    :param body_names: Eg. [Graha.SUN, Graha.VENUS]. Differences between any two of these may then be had.
+    :param jds: Sorted array-like of julian days.
+    """
+    self.body_names = list(body_names)
+    self.jds = numpy.atleast_1d(numpy.asarray(jds, dtype=float))
+    self.longitudes = get_longitudes(body_names=self.body_names, jds=self.jds)
+
+  @classmethod
+  def for_period(cls, body_names, jd_start, jd_end, step=0.5):
+    jds = jd_start + numpy.arange(int(numpy.floor((jd_end - jd_start) / step)) + 1) * step
+    return cls(body_names=body_names, jds=jds)
+
+  def get_differences(self, body1, body2):
+    """longitude_difference(jd, body1, body2) for all sampled jds."""
+    return normalize_longitude_differences(self.longitudes[self.body_names.index(body1)] - self.longitudes[self.body_names.index(body2)])
+
+  def find_proximity_intervals(self, body1, body2, delta):
+    """Intervals wherein the two bodies are within delta degrees (in longitude) of each other.
+
+    Intervals which don't start and end within the sampled period, or lack a conjunction, are skipped.
+
+    :return: List of (t_start, t_zero, t_end) tuples - t_zero being the conjunction.
+    """
+    (graha1, graha2) = (Graha.singleton(body1), Graha.singleton(body2))
+    inside = numpy.abs(self.get_differences(body1=body1, body2=body2)) < delta
+    intervals = []
+    t_start = None
+    for i in numpy.flatnonzero(inside[:-1] != inside[1:]):
+      try:
+        t_crossing = brentq(lambda x: abs(longitude_difference(jd=x, body1=graha1, body2=graha2)) - delta, self.jds[i], self.jds[i + 1])
+      except ValueError:
+        # The sampled differences (see get_longitudes) and longitude_difference can disagree at the bracket ends - eg. with a sample right at delta.
+        logging.warning("Could not find %s and %s crossing a separation of %f between %f and %f", body1, body2, delta, self.jds[i], self.jds[i + 1])
+        t_start = None
+        continue
+      if inside[i + 1]:
+        t_start = t_crossing
+      elif t_start is not None:
+        try:
+          t_zero = brentq(lambda x: longitude_difference(jd=x, body1=graha1, body2=graha2), t_start, t_crossing)
+          intervals.append((t_start, t_zero, t_crossing))
+        except ValueError:
+          logging.warning("Could not find the conjunction of %s and %s between %f and %f", body1, body2, t_start, t_crossing)
+        t_start = None
+    return intervals
+
+
 def get_star_longitude(star, jd):
   """ Calculate star longitude based on sefstars.txt.
   
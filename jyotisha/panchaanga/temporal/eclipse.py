@@ -0,0 +1,181 @@
+"""Global catalogue of solar and lunar eclipses, with refinement for a given location.
+
+Finding the next eclipse visible at a location (swe.sol_eclipse_when_loc, swe.lun_eclipse_when_loc) is among the costliest Swiss ephemeris routines - it steps through eclipses globally, checking each for local visibility. An EclipseCatalogue lists the global eclipses (type, maximum and extent) century by century, computed once with the much cheaper geocentric routines and persisted (see dump_to_file and DEFAULT_CATALOGUE_FILE). get_local_eclipses then skips eclipses which could not possibly be seen from a location, by sampling the altitude (and for solar eclipses, the topocentric elongation) over the eclipse, and refines the rest with the *_when_loc routines started just before each.
+"""
+
+import functools
+import logging
+import os
+
+import methodtools
+import numpy
+import swisseph as swe
+
+SOLAR = "solar"
+LUNAR = "lunar"
+
+EPOCH_JD = 2451545.0
+CENTURY_DAYS = 36525
+
+# Shipped with the package - 1800 to 2200. Centuries beyond are computed as needed.
+DEFAULT_CATALOGUE_FILE = os.path.join(os.path.dirname(__file__), "data", "eclipses.npz")
+
+# Bounds the time from the maximum to the start or end of any eclipse (found to be under 0.14 days in 1800-2200).
+MAX_HALF_EXTENT_DAYS = 0.2
+# Local circumstances are sampled every so many days over the global extent of an eclipse.
+SAMPLE_STEP_DAYS = 1 / 48.0
+# Visibility thresholds for the samples - generous enough for contacts between samples: the sun or moon moves at most ~4 degrees in altitude, and the moon at most ~0.2 degree relative to the sun, in half a step.
+MIN_ALTITUDE = -5.0
+MAX_SOLAR_ELONGATION = 0.8
+# The catalogue and the visibility checks need only be approximate - the Moshier ephemeris (which needs no data files) suffices.
+EPHEMERIS_FLAG = swe.FLG_MOSEPH
+
+
+class EclipseCatalogue(object):
+  """Global eclipses, kept as numpy arrays of rows: (eclipse type flags, jd of maximum, jd of start, jd of end) - start and end being the first and last contacts of the penumbra with the earth (for solar eclipses) or of the moon with the penumbra (for lunar eclipses)."""
+
+  def __init__(self):
+    # (kind, century index) -> numpy array of rows, sorted by maximum.
+    self.centuries = {}
+
+  @methodtools.lru_cache(maxsize=None)
+  @classmethod
+  def get_cached(cls):
+    catalogue = cls()
+    if os.path.isfile(DEFAULT_CATALOGUE_FILE):
+      catalogue.load_from_file(filename=DEFAULT_CATALOGUE_FILE)
+    return catalogue
+
+  def _compute_century(self, kind, century_index):
+    jd_start = EPOCH_JD + century_index * CENTURY_DAYS
+    jd_end = jd_start + CENTURY_DAYS
+    rows = []
+    jd = jd_start
+    while True:
+      if kind == SOLAR:
+        (flags, tret) = swe.sol_eclipse_when_glob(jd, flags=EPHEMERIS_FLAG)
+        row = (flags, tret[0], tret[2], tret[3])
+      else:
+        (flags, tret) = swe.lun_eclipse_when(jd, flags=EPHEMERIS_FLAG)
+        row = (flags, tret[0], tret[6], tret[7])
+      if tret[0] >= jd_end:
+        break
+      if row[2] == 0 or row[3] == 0:
+        # Occasionally missing from the ephemeris output.
+        row = (row[0], row[1], row[1] - MAX_HALF_EXTENT_DAYS, row[1] + MAX_HALF_EXTENT_DAYS)
+      if tret[0] >= jd_start:
+        rows.append(row)
+      jd = tret[0] + 1
+    logging.debug("Computed %d %s eclipses in century %d.", len(rows), kind, century_index)
+    return numpy.array(rows, dtype=float).reshape(len(rows), 4)
+
+  def _get_century(self, kind, century_index):
+    key = (kind, century_index)
+    if key not in self.centuries:
+      self.centuries[key] = self._compute_century(kind=kind, century_index=century_index)
+    return self.centuries[key]
+
+  def get_eclipses(self, kind, jd_start, jd_end):
+    """Global eclipses with maxima within [jd_start, jd_end].
+
+    :param kind: SOLAR or LUNAR
+    :return: numpy array of rows (see class docstring).
+    """
+    first_century = int(numpy.floor((jd_start - EPOCH_JD) / CENTURY_DAYS))
+    last_century = int(numpy.floor((jd_end - EPOCH_JD) / CENTURY_DAYS))
+    rows = numpy.concatenate([self._get_century(kind=kind, century_index=century_index) for century_index in range(first_century, last_century + 1)])
+    return rows[(rows[:, 1] >= jd_start) & (rows[:, 1] <= jd_end)]
+
+  def dump_to_file(self, filename):
+    """Save all centuries computed so far (numpy npz format)."""
+    numpy.savez(filename, **{"%s_%d" % key: rows for key, rows in self.centuries.items()})
+
+  def load_from_file(self, filename):
+    with numpy.load(filename) as data:
+      for name in data.files:
+        (kind, century_index) = name.rsplit("_", 1)
+        self.centuries[(kind, int(century_index))] = data[name]
+
+
+def may_be_visible(kind, eclipse_row, geopos):
+  """Cheap check for possible visibility of a (global) eclipse at a location. False only if the eclipse is surely not visible there."""
+  (_, _, jd_start, jd_end) = eclipse_row
+  for jd in numpy.append(numpy.arange(jd_start, jd_end, SAMPLE_STEP_DAYS), jd_end):
+    if kind == SOLAR:
+      (_, attributes) = swe.sol_eclipse_how(jd, geopos, flags=EPHEMERIS_FLAG)
+      # attributes[5] is the altitude of the sun and attributes[7] the elongation of the moon.
+      if attributes[5] > MIN_ALTITUDE and attributes[7] < MAX_SOLAR_ELONGATION:
+        return True
+    else:
+      (_, attributes) = swe.lun_eclipse_how(jd, geopos, flags=EPHEMERIS_FLAG)
+      # attributes[5] is the altitude of the moon.
+      if attributes[5] > MIN_ALTITUDE:
+        return True
+  return False
+
+
+# Bounds the cache of get_local_eclipse - locations may be arbitrary (eg. via the REST API). Each location and year takes about 10 entries.
+LOCAL_ECLIPSE_CACHE_SIZE = 4096
+
+
+class _Location(object):
+  """Cache key for a city - equal for cities at the same location."""
+
+  def __init__(self, city):
+    self.city = city
+    self.geopos = (city.longitude, city.latitude, 0)
+
+  def __hash__(self):
+    return hash(self.geopos)
+
+  def __eq__(self, other):
+    return isinstance(other, _Location) and self.geopos == other.geopos
+
+
+# Cached, so as to save refining the same eclipse for overlapping periods.
+@functools.lru_cache(maxsize=LOCAL_ECLIPSE_CACHE_SIZE)
+def _get_local_eclipse(kind, location, eclipse_row):
+  local_eclipse = None
+  if may_be_visible(kind=kind, eclipse_row=eclipse_row, geopos=location.geopos):
+    jd_search_start = eclipse_row[2] - 1
+    if kind == SOLAR:
+      local_eclipse = location.city.get_solar_eclipse_time(jd_start=jd_search_start)
+    else:
+      local_eclipse = location.city.get_lunar_eclipse_time(jd_start=jd_search_start)
+    if abs(local_eclipse[1][0] - eclipse_row[1]) > 1:
+      # Not visible after all - the search went on to a later eclipse.
+      local_eclipse = None
+  return local_eclipse
+
+
+def get_local_eclipse(kind, city, eclipse_row):
+  """Refine a (global) eclipse for the city.
+
+  :return: Result of City.get_solar_eclipse_time or City.get_lunar_eclipse_time (ie. of swe.sol_eclipse_when_loc or swe.lun_eclipse_when_loc) for this eclipse, or None if not visible from the city.
+  """
+  return _get_local_eclipse(kind=kind, location=_Location(city=city), eclipse_row=tuple(float(x) for x in eclipse_row))
+
+
+def get_local_eclipses(kind, city, jd_start, jd_end):
+  """Eclipses visible from the city, with (local) maxima within [jd_start, jd_end] - as would be found by repeatedly calling City.get_solar_eclipse_time or City.get_lunar_eclipse_time.
+
+  :param kind: SOLAR or LUNAR
+  :return: List of results of get_local_eclipse.
+  """
+  local_eclipses = []
+  # Local maxima are within hours of the global ones.
+  for eclipse_row in EclipseCatalogue.get_cached().get_eclipses(kind=kind, jd_start=jd_start - 1, jd_end=jd_end + 1):
+    local_eclipse = get_local_eclipse(kind=kind, city=city, eclipse_row=eclipse_row)
+    if local_eclipse is not None and jd_start <= local_eclipse[1][0] <= jd_end:
+      local_eclipses.append(local_eclipse)
+  return local_eclipses
+
+
+def build_default_catalogue(filename=DEFAULT_CATALOGUE_FILE, first_century=-2, last_century=1):
+  """(Re)compute the shipped catalogue - by default, 1800 to 2200."""
+  catalogue = EclipseCatalogue()
+  for kind in [SOLAR, LUNAR]:
+    for century_index in range(first_century, last_century + 1):
+      catalogue._get_century(kind=kind, century_index=century_index)
+  catalogue.dump_to_file(filename=filename)
+  return catalogue
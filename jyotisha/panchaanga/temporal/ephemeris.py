@@ -0,0 +1,270 @@
+"""Piecewise Chebyshev approximation of graha longitudes (and ayanaamsha offsets).
+
+Swiss ephemeris calls (and particularly the fixed star lookup behind the CHITRA_AT_180 ayanaamsha) dominate long computations. A ChebyshevEphemeris fits each body's tropical longitude over fixed-length segments (short for fast movers like the moon, long for slow ones), lazily, the first time a segment is needed. Every fit is checked against swe.calc_ut at points other than the fitting nodes; segments which can't be fitted within the tolerance fall back to the ephemeris.
+
+Usage: call enable_chebyshev_cache() once before computing panchaangas. Graha.get_longitude (and hence NakshatraDivision.get_anga_float and everything built on it) and body.get_longitudes then consult the active cache.
+
+EphemerisCallCounter counts the (costly) Swiss ephemeris calls made within a block - for profiling.
+"""
+
+import logging
+import math
+import threading
+
+import numpy
+import swisseph as swe
+from numpy.polynomial import chebyshev
+
+# Reference epoch for segment boundaries - J2000.0.
+EPOCH_JD = 2451545.0
+
+# In degrees. Note that the ephemeris itself is only smooth to about 1e-8 degrees.
+DEFAULT_TOLERANCE = 1e-6
+
+DEGREES_TO_TRY = [12, 16, 20, 24]
+
+# Bodies absent here (rahu and ketu - the true node wobbles at the 1e-6 degree level) are not cached.
+DEFAULT_SEGMENT_DAYS = {
+  "moon": 4, "sun": 32, "mercury": 8, "venus": 16, "mars": 16, "jupiter": 32, "saturn": 32,
+}
+AYANAAMSHA_SEGMENT_DAYS = 16
+# Same as Ayanamsha.VERNAL_EQUINOX_AT_0 and Ayanamsha.ASHVINI_STARTING_0 - nothing to fit.
+ZERO_OFFSET_AYANAAMSHAS = ("VERNAL_EQUINOX_AT_0", "ASHVINI_STARTING_0")
+
+
+class ChebyshevEphemeris(object):
+  """Lazily built piecewise Chebyshev series for tropical graha longitudes and ayanaamsha offsets.
+
+  Series are unwrapped in longitude within a segment, so evaluation returns an unnormalized angle which callers reduce modulo 360.
+  """
+
+  def __init__(self, tolerance=DEFAULT_TOLERANCE, segment_days=None):
+    """
+
+    :param tolerance: Maximum acceptable deviation (in degrees) from the ephemeris, checked when fitting each segment.
+    :param segment_days: Optional overrides of DEFAULT_SEGMENT_DAYS, keyed by body name. A value of None disables caching for that body.
+    """
+    self.tolerance = tolerance
+    self.segment_days = dict(DEFAULT_SEGMENT_DAYS)
+    if segment_days is not None:
+      self.segment_days.update(segment_days)
+      self.segment_days = {name: days for name, days in self.segment_days.items() if days is not None}
+    # (series name) -> {segment index -> coefficient list or None (if the fit failed)}
+    self.segments = {}
+    # Same as above, for the time derivatives.
+    self.derivative_segments = {}
+
+  def _get_exact_function(self, series):
+    (kind, name) = series
+    if kind == "ayanaamsha":
+      from jyotisha.panchaanga.temporal.zodiac import Ayanamsha
+      return Ayanamsha.singleton(name).get_exact_offset
+    from jyotisha.panchaanga.temporal.body import Graha
+    if name == Graha.KETU:
+      return lambda jd: swe.calc_ut(jd, swe.TRUE_NODE)[0][0] + 180
+    body_id = Graha.singleton(name)._get_swisseph_id()
+    return lambda jd: swe.calc_ut(jd, body_id)[0][0]
+
+  def _get_segment_days(self, series):
+    (kind, name) = series
+    if kind == "ayanaamsha":
+      return AYANAAMSHA_SEGMENT_DAYS
+    return self.segment_days.get(name, None)
+
+  def _fit_segment(self, series, segment_index):
+    segment_days = self._get_segment_days(series)
+    jd_start = EPOCH_JD + segment_index * segment_days
+    exact_function = self._get_exact_function(series)
+    # Check points distinct from the fitting nodes, including the segment ends.
+    x_check = numpy.linspace(-1, 1, 33)
+    values_check = numpy.array([exact_function(jd_start + (x + 1) * segment_days / 2) for x in x_check])
+    error = None
+    for degree in DEGREES_TO_TRY:
+      x_nodes = numpy.cos(numpy.pi * (numpy.arange(degree + 1) + 0.5) / (degree + 1))
+      values = numpy.unwrap([exact_function(jd_start + (x + 1) * segment_days / 2) for x in x_nodes], period=360)
+      coefficients = chebyshev.chebfit(x_nodes, values, degree)
+      error = numpy.abs((chebyshev.chebval(x_check, coefficients) - values_check + 180) % 360 - 180).max()
+      if error <= self.tolerance:
+        return coefficients.tolist()
+    logging.debug("Could not fit %s over segment %d within %g degrees (error %g) - will use the ephemeris.", str(series), segment_index, self.tolerance, error)
+    return None
+
+  def _get_segment(self, series, segment_index):
+    series_segments = self.segments.setdefault(series, {})
+    if segment_index not in series_segments:
+      series_segments[segment_index] = self._fit_segment(series=series, segment_index=segment_index)
+    return series_segments[segment_index]
+
+  def _get_derivative_segment(self, series, segment_index):
+    series_segments = self.derivative_segments.setdefault(series, {})
+    if segment_index not in series_segments:
+      coefficients = self._get_segment(series=series, segment_index=segment_index)
+      if coefficients is not None:
+        # Per day, rather than per unit of the [-1, 1] segment variable.
+        coefficients = (chebyshev.chebder(coefficients) * 2 / self._get_segment_days(series)).tolist()
+      series_segments[segment_index] = coefficients
+    return series_segments[segment_index]
+
+  def _evaluate(self, series, jd, derivative=False):
+    segment_days = self._get_segment_days(series)
+    if segment_days is None:
+      return None
+    position = (jd - EPOCH_JD) / segment_days
+    segment_index = math.floor(position)
+    if derivative:
+      coefficients = self._get_derivative_segment(series=series, segment_index=segment_index)
+    else:
+      coefficients = self._get_segment(series=series, segment_index=segment_index)
+    if coefficients is None:
+      return None
+    # Clenshaw recurrence - cheaper than numpy for a scalar.
+    x = 2 * (position - segment_index) - 1
+    x2 = 2 * x
+    (b1, b2) = (0.0, 0.0)
+    for coefficient in coefficients[:0:-1]:
+      (b1, b2) = (coefficient + x2 * b1 - b2, b1)
+    return coefficients[0] + x * b1 - b2
+
+  def _evaluate_array(self, series, jds):
+    segment_days = self._get_segment_days(series)
+    if segment_days is None:
+      exact_function = self._get_exact_function(series)
+      return numpy.array([exact_function(jd) for jd in jds])
+    positions = (jds - EPOCH_JD) / segment_days
+    segment_indices = numpy.floor(positions).astype(int)
+    values = numpy.empty(jds.shape)
+    for segment_index in numpy.unique(segment_indices):
+      mask = segment_indices == segment_index
+      coefficients = self._get_segment(series=series, segment_index=int(segment_index))
+      if coefficients is None:
+        exact_function = self._get_exact_function(series)
+        values[mask] = [exact_function(jd) for jd in jds[mask]]
+      else:
+        values[mask] = chebyshev.chebval(2 * (positions[mask] - segment_index) - 1, coefficients)
+    return values
+
+  def get_longitude(self, body_name, jd):
+    """Tropical longitude, or None if this segment could not be fitted.
+
+    :param body_name: Eg. Graha.MOON
+    :param jd:
+    :return:
+    """
+    longitude = self._evaluate(series=("graha", body_name), jd=jd)
+    if longitude is None:
+      return None
+    return longitude % 360
+
+  def get_speed(self, body_name, jd):
+    """Rate of change of the tropical longitude in degrees per day, or None if this segment could not be fitted."""
+    return self._evaluate(series=("graha", body_name), jd=jd, derivative=True)
+
+  def get_longitudes(self, body_name, jds):
+    """Vectorized get_longitude. Segments which could not be fitted are computed with the ephemeris.
+
+    :param body_name:
+    :param jds: numpy array of julian days.
+    :return: numpy array of tropical longitudes.
+    """
+    return self._evaluate_array(series=("graha", body_name), jds=jds) % 360
+
+  def get_ayanaamsha_offset(self, ayanaamsha_id, jd):
+    """Ayanaamsha offset (see Ayanamsha.get_offset), or None if this segment could not be fitted."""
+    if ayanaamsha_id in ZERO_OFFSET_AYANAAMSHAS:
+      return 0
+    return self._evaluate(series=("ayanaamsha", ayanaamsha_id), jd=jd)
+
+  def get_ayanaamsha_offsets(self, ayanaamsha_id, jds):
+    if ayanaamsha_id in ZERO_OFFSET_AYANAAMSHAS:
+      return numpy.zeros(jds.shape)
+    return self._evaluate_array(series=("ayanaamsha", ayanaamsha_id), jds=jds)
+
+  def get_max_error(self, body_name, jd_start, jd_end, num_samples=1000):
+    """Compare with swe.calc_ut at uniformly spaced instants.
+
+    :return: Maximum absolute deviation in degrees.
+    """
+    jds = numpy.linspace(jd_start, jd_end, num_samples)
+    exact_function = self._get_exact_function(("graha", body_name))
+    exact_values = numpy.array([exact_function(jd) for jd in jds])
+    return numpy.abs((self.get_longitudes(body_name=body_name, jds=jds) - exact_values + 180) % 360 - 180).max()
+
+
+_active_cache = None
+
+
+def enable_chebyshev_cache(tolerance=DEFAULT_TOLERANCE, segment_days=None):
+  """Make Graha.get_longitude and body.get_longitudes use a (fresh) ChebyshevEphemeris.
+
+  :return: The active cache.
+  """
+  global _active_cache
+  _active_cache = ChebyshevEphemeris(tolerance=tolerance, segment_days=segment_days)
+  return _active_cache
+
+
+def disable_chebyshev_cache():
+  global _active_cache
+  _active_cache = None
+
+
+def get_active_cache():
+  return _active_cache
+
+
+# Swiss ephemeris routines counted by EphemerisCallCounter - those which compute positions or events (as against conversions and settings).
+COUNTED_FUNCTION_NAMES = (
+  "calc_ut", "fixstar_ut", "get_ayanamsa_ut", "houses_ex", "rise_trans", "sidtime",
+  "sol_eclipse_when_glob", "sol_eclipse_when_loc", "sol_eclipse_how",
+  "lun_eclipse_when", "lun_eclipse_when_loc", "lun_eclipse_how",
+)
+
+
+# Counters active in each thread - see EphemerisCallCounter.
+_active_counters = threading.local()
+_counting_lock = threading.Lock()
+_counting_installed = False
+
+
+def _make_counting_function(function):
+  def counting_function(*args, **kwargs):
+    counter = getattr(_active_counters, "counter", None)
+    if counter is not None:
+      counter.num_calls += 1
+    return function(*args, **kwargs)
+  return counting_function
+
+
+def _install_call_counting():
+  """Wrap COUNTED_FUNCTION_NAMES in the swisseph module with counting functions - once per process, never undone. (Swapping functions in and out per block would race with other threads.)"""
+  global _counting_installed
+  with _counting_lock:
+    if _counting_installed:
+      return
+    for name in COUNTED_FUNCTION_NAMES:
+      function = getattr(swe, name, None)
+      if function is not None:
+        setattr(swe, name, _make_counting_function(function))
+    _counting_installed = True
+
+
+class EphemerisCallCounter(object):
+  """Context manager counting calls to COUNTED_FUNCTION_NAMES (made via the swisseph module) by the current thread within its block.
+
+  Counters don't nest - the innermost one alone counts. The first use installs (thread safe) counting wrappers for good - so counters are best used only when profiling.
+  """
+
+  def __init__(self):
+    self.num_calls = 0
+    self._previous_counter = None
+
+  def __enter__(self):
+    _install_call_counting()
+    self._previous_counter = getattr(_active_counters, "counter", None)
+    _active_counters.counter = self
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    _active_counters.counter = self._previous_counter
+    self._previous_counter = None
+    return False
@@ -22,7 +22,11 @@ class FestivalAssigner(PeriodicPanchaangaApplier):
       repos_tuple=tuple(panchaanga.computation_system.festival_options.repos), julian_handling=self.festival_options.julian_handling)
 
   @timebudget
-  def assign_festival_numbers(self):
+  def assign_festival_numbers(self, fest_ids=None):
+    """
+
+    :param fest_ids: If not None, number only festivals for these rule ids.
+    """
     # Update festival numbers if they exist
     solar_y_start_d = []
     lunar_y_start_d = []
@@ -36,6 +40,8 @@ class FestivalAssigner(PeriodicPanchaangaApplier):
 
     period_start_year = self.panchaanga.start_date.year
     for festival_name in copy.copy(self.panchaanga.festival_id_to_days):
+      if fest_ids is not None and festival_name not in fest_ids:
+        continue
       festival_rule = self.rules_collection.name_to_rule.get(festival_name, None)
       if festival_rule is None:
         continue
@@ -82,8 +88,8 @@ class FestivalAssigner(PeriodicPanchaangaApplier):
           if self.panchaanga.daily_panchaanga_for_date(d + 1) is None:
             # We are past the end of the year
             continue
-          today_festivals = self.panchaanga.daily_panchaanga_for_date(d).festival_id_to_instance.keys()
-          next_day_festivals = self.panchaanga.daily_panchaanga_for_date(d + 1).festival_id_to_instance.keys()
+          today_festivals = self.panchaanga.daily_panchaanga_for_date(d).festival_id_to_instance
+          next_day_festivals = self.panchaanga.daily_panchaanga_for_date(d + 1).festival_id_to_instance
           if next_f not in today_festivals and next_f not in next_day_festivals and nnext_f not in next_day_festivals:
               # This occurs because there is no anadhyayana today, possibly because the anadhyayana was assigned
               # in paraviddha fashion to the day after
@@ -117,9 +123,15 @@ class FestivalAssigner(PeriodicPanchaangaApplier):
         # Adding to next day instead
         self.panchaanga.add_festival(fest_id='mahAlaya-pakSa-tarpaNa-pUrtiH', date=mahalaya_end_date + 1)
 
-    # Remove paraviddha assigned on consecutive days
+  def remove_festivals_on_consecutive_days(self, fest_ids=None):
+    """Remove paraviddha assigned on consecutive days.
+
+    :param fest_ids: If not None, consider only festivals with these ids.
+    """
     for d in range(self.panchaanga.duration_prior_padding, self.panchaanga.duration + self.panchaanga.duration_prior_padding):
       for f in [fest.name for fest in self.daily_panchaangas[d].festival_id_to_instance.values()]:
+        if fest_ids is not None and f not in fest_ids:
+          continue
         if f in [fest.name for fest in self.daily_panchaangas[d + 1].festival_id_to_instance.values()]:
           if 'sAyana' not in f and 'anadhyAyaH' not in f:
             self.panchaanga.delete_festival_date(fest_id=f, date=self.daily_panchaangas[d].date)
@@ -6,13 +6,12 @@ import logging
 import swisseph as swe
 
 from jyotisha.panchaanga.temporal import names
-from jyotisha.panchaanga.temporal import interval
+from jyotisha.panchaanga.temporal import interval, body, eclipse
 from jyotisha.panchaanga.temporal.body import Graha
 from jyotisha.panchaanga.temporal.festival import FestivalInstance, TransitionFestivalInstance
 from jyotisha.panchaanga.temporal.festival.applier import FestivalAssigner
 from jyotisha.panchaanga.temporal.interval import Interval
 from jyotisha.panchaanga.temporal.zodiac import AngaType
-from scipy.optimize import brentq
 from sanskrit_data.schema import common
 from indic_transliteration import sanscript
 
@@ -258,6 +257,15 @@ class EclipticFestivalAssigner(FestivalAssigner):
         except ValueError:
           logging.warning("Could not assign festival day for maudhya end event.")
 
+  def get_separation_scanner(self, jd_start: float, jd_end: float, step: float = 0.5) -> body.SeparationScanner:
+    """A scanner sampling the sun and the taaraa grahas over the period, shared by all maudhya and graha yuddha computations."""
+    if self._separation_scanners is None:
+      self._separation_scanners = {}
+    key = (jd_start, jd_end, step)
+    if key not in self._separation_scanners:
+      self._separation_scanners[key] = body.SeparationScanner.for_period(body_names=[Graha.SUN] + list(TARA_GRAHAS), jd_start=jd_start, jd_end=jd_end, step=step)
+    return self._separation_scanners[key]
+
   def compute_conjunction_intervals(
     self,
     graha1: int,
@@ -274,47 +282,10 @@ class EclipticFestivalAssigner(FestivalAssigner):
     """
     g1 = Graha.singleton(graha1)
     g2 = Graha.singleton(graha2)
-    intervals = []
-
-    inside = False
-    t_start = None
-    jd = jd_start
-
-    while jd <= jd_end:
-        lon_diff = abs(g1.get_longitude(jd, ayanaamsha_id=self.ayanaamsha_id) - g2.get_longitude(jd, ayanaamsha_id=self.ayanaamsha_id))
-        lon_diff = min(lon_diff, 360 - lon_diff)  # shortest arc
-
-        if not inside and lon_diff < delta:
-            try:
-                t_start = brentq(
-                    lambda x: abs(g1.get_longitude(x, ayanaamsha_id=self.ayanaamsha_id) - g2.get_longitude(x, ayanaamsha_id=self.ayanaamsha_id)) - delta,
-                    jd - step,
-                    jd
-                )
-                inside = True
-            except ValueError:
-                logging.warning(f"Could not bracket start of proximity at {jd}")
-        elif inside and lon_diff > delta:
-            try:
-                t_end = brentq(
-                    lambda x: abs(g1.get_longitude(x, ayanaamsha_id=self.ayanaamsha_id) - g2.get_longitude(x, ayanaamsha_id=self.ayanaamsha_id)) - delta,
-                    jd - step,
-                    jd
-                )
-                # Now compute t_zero (exact conjunction)
-                try:
-                    t_zero = brentq(
-                        lambda x: g1.get_longitude(x, ayanaamsha_id=self.ayanaamsha_id) - g2.get_longitude(x, ayanaamsha_id=self.ayanaamsha_id),
-                        t_start,
-                        t_end
-                    )
-                    intervals.append((t_start, t_zero, t_end))
-                except ValueError:
-                    logging.warning(f"Could not find t_zero between {t_start} and {t_end}")
-                inside = False
-            except ValueError:
-                logging.warning(f"Could not bracket end of proximity at {jd}")
-        jd += step
+    scanner = self.get_separation_scanner(jd_start=jd_start, jd_end=jd_end, step=step)
+    if graha1 not in scanner.body_names or graha2 not in scanner.body_names:
+      scanner = body.SeparationScanner.for_period(body_names=[graha1, graha2], jd_start=jd_start, jd_end=jd_end, step=step)
+    intervals = scanner.find_proximity_intervals(body1=graha1, body2=graha2, delta=delta)
 
     if debug:
       # Show the longitudes of each graha at the start and end of the interval
@@ -328,7 +299,6 @@ class EclipticFestivalAssigner(FestivalAssigner):
     return intervals
   
   def add_graha_yuddhas(self):
-    TARA_GRAHAS = (Graha.MERCURY, Graha.VENUS, Graha.MARS, Graha.JUPITER, Graha.SATURN)
     GRAHA_NAMES = {Graha.VENUS: 'zukraH', Graha.MERCURY: 'budhaH', Graha.MARS: 'aGgArakaH', 
         Graha.SATURN: 'zaniH', Graha.JUPITER: 'guruH'}
 
@@ -351,11 +321,8 @@ class EclipticFestivalAssigner(FestivalAssigner):
   def compute_solar_eclipses(self):
     if 'sUrya-grahaNam' not in self.rules_collection.name_to_rule:
       return 
-    jd = self.panchaanga.jd_start
-    while 1:
-      next_eclipse_sol = self.panchaanga.city.get_solar_eclipse_time(jd_start=jd)
-      # compute offset from UTC
-      jd = next_eclipse_sol[1][0]
+    # Candidates are listed from the eclipse catalogue - the last few only to check the condition below.
+    for next_eclipse_sol in eclipse.get_local_eclipses(kind=eclipse.SOLAR, city=self.panchaanga.city, jd_start=self.panchaanga.jd_start, jd_end=self.panchaanga.jd_end + 2):
       jd_eclipse_solar_start = next_eclipse_sol[1][1]
       jd_eclipse_solar_end = next_eclipse_sol[1][4]
       # -1 is to not miss an eclipse that occurs after sunset on 31-Dec!
@@ -373,9 +340,7 @@ class EclipticFestivalAssigner(FestivalAssigner):
           suff = 'Astamana'
           jd_eclipse_solar_end = self.daily_panchaangas[fday].jd_sunset
         if jd_eclipse_solar_start == 0.0 or jd_eclipse_solar_end == 0.0:
-          # Move towards the next eclipse... at least the next new
-          # moon (>=25 days away)
-          jd += MIN_DAYS_NEXT_ECLIPSE
+          # Move towards the next eclipse.
           continue
         if abs (Graha.singleton(Graha.SUN).get_longitude(jd_eclipse_solar_end) - Graha.singleton(Graha.RAHU).get_longitude(
             jd_eclipse_solar_end)) < 5:
@@ -387,29 +352,19 @@ class EclipticFestivalAssigner(FestivalAssigner):
           solar_eclipse_str = '★cUDAmaNi-' + solar_eclipse_str
         fest = FestivalInstance(name=solar_eclipse_str, interval=Interval(jd_start=jd_eclipse_solar_start, jd_end=jd_eclipse_solar_end))
       self.panchaanga.add_festival_instance(festival_instance=fest, date=self.daily_panchaangas[fday].date)
-      jd = jd + MIN_DAYS_NEXT_ECLIPSE
 
   def compute_lunar_eclipses(self):
     if '★cUDAmaNi-candra-grahaNam' not in self.rules_collection.name_to_rule:
       return
       # Set location
-    jd = self.panchaanga.jd_start
-    
-    while 1:
-      next_eclipse_lun = self.panchaanga.city.get_lunar_eclipse_time(jd)
+    for next_eclipse_lun in eclipse.get_local_eclipses(kind=eclipse.LUNAR, city=self.panchaanga.city, jd_start=self.panchaanga.jd_start, jd_end=self.panchaanga.jd_end):
       # logging.debug(next_eclipse_lun)
-      jd = next_eclipse_lun[1][0]
       jd_eclipse_lunar_start = next_eclipse_lun[1][2]
       jd_eclipse_lunar_end = next_eclipse_lun[1][3]
 
-      if jd > self.panchaanga.jd_end:
-        break
-
       if jd_eclipse_lunar_start == 0.0 and jd_eclipse_lunar_end == 0.0:
         # 0.0 is returned in case of eclipses when the moon is below the horizon.
-        # Move towards the next eclipse... at least the next full
-        # moon (>=25 days away)
-        jd += MIN_DAYS_NEXT_ECLIPSE
+        # Move towards the next eclipse.
         continue
 
       suff = 'a'
@@ -450,7 +405,6 @@ class EclipticFestivalAssigner(FestivalAssigner):
       fest = FestivalInstance(name=lunar_eclipse_str, interval=Interval(jd_start=jd_eclipse_lunar_start, jd_end=jd_eclipse_lunar_end))
       logging.warning(f'Lunar eclipse: {jd_eclipse_lunar_start} → {jd_eclipse_lunar_end}')
       self.panchaanga.add_festival_instance(festival_instance=fest, date=self.daily_panchaangas[fday].date)
-      jd += MIN_DAYS_NEXT_ECLIPSE
 
   def set_jupiter_transits(self):
     if 'guru-saGkrAntiH' not in self.rules_collection.name_to_rule:
@@ -459,8 +413,7 @@ class EclipticFestivalAssigner(FestivalAssigner):
     check_window = 400  # Max t between two Jupiter transits is ~396 (checked across 180y)
     # Let's check for transitions in a relatively large window
     # to finalise what is the FINAL transition post retrograde movements
-    transits = Graha.singleton(Graha.JUPITER).get_transits(self.panchaanga.jd_start - 13, jd_end + check_window, anga_type=AngaType.RASHI,
-                                                           ayanaamsha_id=self.ayanaamsha_id)
+    transits = self.panchaanga.get_graha_transits(Graha.JUPITER, self.panchaanga.jd_start - 13, jd_end + check_window, ayanaamsha_id=self.ayanaamsha_id)
     if len(transits) > 0:
       for i, transit in enumerate(transits):
         (jd_transit, rashi1, rashi2) = (transit.jd, transit.value_1, transit.value_2)
@@ -499,8 +452,7 @@ class EclipticFestivalAssigner(FestivalAssigner):
         Graha.SATURN: 'zaniH', Graha.RAHU: 'rAhuH', Graha.KETU: 'kEtuH'}
     
     for graha in Graha.MERCURY, Graha.VENUS, Graha.MARS, Graha.SATURN, Graha.RAHU, Graha.KETU:
-      transits = Graha.singleton(graha).get_transits(self.panchaanga.jd_start, jd_end, anga_type=AngaType.RASHI,
-                                                           ayanaamsha_id=self.ayanaamsha_id)
+      transits = self.panchaanga.get_graha_transits(graha, self.panchaanga.jd_start, jd_end, ayanaamsha_id=self.ayanaamsha_id)
       if len(transits) > 0:
         for i, transit in enumerate(transits):
           (jd_transit, rashi1, rashi2) = (transit.jd, transit.value_1, transit.value_2)
@@ -516,7 +468,7 @@ class EclipticFestivalAssigner(FestivalAssigner):
 
 
 
-MIN_DAYS_NEXT_ECLIPSE = 25
+TARA_GRAHAS = (Graha.MERCURY, Graha.VENUS, Graha.MARS, Graha.JUPITER, Graha.SATURN)
 
 # Essential for depickling to work.
 common.update_json_class_index(sys.modules[__name__])
@@ -16,74 +16,87 @@ class RuleLookupAssigner(FestivalAssigner):
       for d in self.panchaanga.festival_id_to_days['yajurvEda-upAkarma']:
         self.panchaanga.add_festival(fest_id='varalakSmI-vratam', date=d - ((d.get_weekday() - 5) % 7))
 
-  def assign_relative_festivals(self):
+  def assign_relative_festivals(self, fest_ids=None, anchors=None):
     """ Add "RELATIVE" festival_id_to_instance --- festival_id_to_instance that happen before or after another festival with an exact timedelta! Example: 1 day after makara sankrAnti.
     
+    Note that varalakSmI-vratam (see assign_varalakshmi_vratam) is to be assigned before calling this.
+    :param fest_ids: If not None, assign only these relative festivals.
+    :param anchors: If not None, filled with relative festival id -> ids of the anchor festivals used.
     :return: 
     """
-
-    if 'varalakSmI-vratam' in self.rules_collection.name_to_rule:
-      self.assign_varalakshmi_vratam()    
-    
+    from jyotisha.panchaanga.temporal.festival import rules
     name_to_rule = self.rules_collection.name_to_rule
-
-    # Iterate over all other relative events.
-    for festival_name in name_to_rule:
-      # Skip over non-relative events.
-      if name_to_rule[festival_name].timing is None or name_to_rule[festival_name].timing.offset is None:
+    festival_id_to_days = self.panchaanga.festival_id_to_days
+    # Festival ids not from rules (eg. those assigned in code) - for approximate anchor matches. Found once, as relative festivals only add ids of rules.
+    other_fest_ids = None
+
+    # Anchors come before festivals anchored to them.
+    for relative_rule in self.rules_collection.get_relative_festival_rules():
+      festival_name = relative_rule.id
+      if fest_ids is not None and festival_name not in fest_ids:
         continue
 
-      offset = int(name_to_rule[festival_name].timing.offset)
-      anchor_festival_id = name_to_rule[festival_name].timing.anchor_festival_id
+      offset = relative_rule.offset
+      anchor_festival_id = relative_rule.anchor_festival_id
       
-      if anchor_festival_id not in self.panchaanga.festival_id_to_days:
-        # Sometimes, the recorded anchor_festival_id is not exact (Eg. navama-aparapakSa-samApanam 0 days from sarva-kArttika-amAvAsyA). So, we find an approx. match (Eg. kArttika\-amAvAsyA).
-        matched_festivals = []
-        if 'amAvAsyA' in anchor_festival_id:
-          anchor_festival_id = anchor_festival_id.strip('sarva-')
-        
-        # Generally, we find a matching event by looking for superstring ids.
-        for fest_key in self.panchaanga.festival_id_to_days:
-          if anchor_festival_id in fest_key:
-            # Match bOdhAyana festivals with bOdhAyana anchor ids only.
-            if 'amAvAsyA' in anchor_festival_id:
-              if 'bOdhAyana' not in anchor_festival_id and 'bOdhAyana' in fest_key:
-                continue
-            matched_festivals += [fest_key]
+      if anchor_festival_id not in festival_id_to_days:
+        if other_fest_ids is None:
+          other_fest_ids = [fest_key for fest_key in festival_id_to_days if fest_key not in name_to_rule]
+        matched_festivals = [fest_key for fest_key in relative_rule.anchor_candidate_ids if fest_key in festival_id_to_days]
+        matched_festivals += [fest_key for fest_key in other_fest_ids if rules.is_approximate_anchor_match(anchor_festival_id=anchor_festival_id, fest_id=fest_key)]
 
         if matched_festivals == []:
-          logging.error('Relative festival %s not in festival_id_to_days!' % anchor_festival_id)
+          logging.error('Relative festival %s not in festival_id_to_days!' % relative_rule.anchor_id_fragment)
         elif len(matched_festivals) > 1:
           logging.error('Relative festival %s not in festival_id_to_days! Found more than one approximate match: %s' % (
-            anchor_festival_id, str(matched_festivals)))
+            relative_rule.anchor_id_fragment, str(matched_festivals)))
         else:
-          for x in self.panchaanga.festival_id_to_days[matched_festivals[0]]:
+          for x in festival_id_to_days[matched_festivals[0]]:
             self.panchaanga.add_festival(fest_id=festival_name, date=x + offset)
+        if anchors is not None:
+          anchors[festival_name] = matched_festivals
       else:
-        for x in self.panchaanga.festival_id_to_days[anchor_festival_id]:
+        for x in festival_id_to_days[anchor_festival_id]:
           self.panchaanga.add_festival(fest_id=festival_name, date=x + offset)
+        if anchors is not None:
+          anchors[festival_name] = [anchor_festival_id]
+
+  # Month type and anga type (None for days of the month) combinations, in the order applied by apply_festival_from_rules_repos.
+  MONTH_ANGA_TYPES = [
+    (RulesRepo.SIDEREAL_SOLAR_MONTH_DIR, None), (RulesRepo.TROPICAL_MONTH_DIR, None), (RulesRepo.GREGORIAN_MONTH_DIR, None),
+    (RulesRepo.SIDEREAL_SOLAR_MONTH_DIR, AngaType.TITHI), (RulesRepo.SIDEREAL_SOLAR_MONTH_DIR, AngaType.NAKSHATRA), (RulesRepo.SIDEREAL_SOLAR_MONTH_DIR, AngaType.YOGA),
+    (RulesRepo.LUNAR_MONTH_DIR, AngaType.TITHI), (RulesRepo.LUNAR_MONTH_DIR, AngaType.NAKSHATRA), (RulesRepo.LUNAR_MONTH_DIR, AngaType.YOGA),
+  ]
+
+  def apply_festival_from_rules_repos(self, fest_ids=None):
+    """
 
-  def apply_festival_from_rules_repos(self):
+    :param fest_ids: If not None, apply only rules with these ids. 
+    """
+    month_anga_types = self.MONTH_ANGA_TYPES
+    if fest_ids is not None:
+      # Skip month and anga types without any rule of interest.
+      rules = [self.rules_collection.name_to_rule.get(fest_id, None) for fest_id in fest_ids]
+      rule_types = set((rule.timing.month_type, rule.timing.anga_type) for rule in rules if rule is not None and rule.timing is not None)
+      month_anga_types = [(month_type, anga_type) for (month_type, anga_type) in month_anga_types if (month_type, RulesRepo.DAY_DIR if anga_type is None else anga_type.name.lower()) in rule_types]
     for index, dp in enumerate(self.daily_panchaangas):
-      self.apply_month_day_events(day_panchaanga=dp, month_type=RulesRepo.SIDEREAL_SOLAR_MONTH_DIR)
-      self.apply_month_day_events(day_panchaanga=dp, month_type=RulesRepo.TROPICAL_MONTH_DIR)
-      self.apply_month_day_events(day_panchaanga=dp, month_type=RulesRepo.GREGORIAN_MONTH_DIR)
-      self.apply_month_anga_events(day_panchaanga=dp, month_type=RulesRepo.SIDEREAL_SOLAR_MONTH_DIR, anga_type=AngaType.TITHI)
-      self.apply_month_anga_events(day_panchaanga=dp, month_type=RulesRepo.SIDEREAL_SOLAR_MONTH_DIR, anga_type=AngaType.NAKSHATRA)
-      self.apply_month_anga_events(day_panchaanga=dp, month_type=RulesRepo.SIDEREAL_SOLAR_MONTH_DIR, anga_type=AngaType.YOGA)
-      self.apply_month_anga_events(day_panchaanga=dp, month_type=RulesRepo.LUNAR_MONTH_DIR, anga_type=AngaType.TITHI)
-      self.apply_month_anga_events(day_panchaanga=dp, month_type=RulesRepo.LUNAR_MONTH_DIR, anga_type=AngaType.NAKSHATRA)
-      self.apply_month_anga_events(day_panchaanga=dp, month_type=RulesRepo.LUNAR_MONTH_DIR, anga_type=AngaType.YOGA)
-
-  def apply_month_day_events(self, day_panchaanga, month_type):
+      for (month_type, anga_type) in month_anga_types:
+        if anga_type is None:
+          self.apply_month_day_events(day_panchaanga=dp, month_type=month_type, fest_ids=fest_ids)
+        else:
+          self.apply_month_anga_events(day_panchaanga=dp, month_type=month_type, anga_type=anga_type, fest_ids=fest_ids)
+
+  def apply_month_day_events(self, day_panchaanga, month_type, fest_ids=None):
     """Apply events set to take place on a given (ordinal) day of a given month. Eg. Jan 1 as per Julian calendar, Aug 15 as per Gregorian calendar, 1st day of sidereal solar month 6. See calls from apply_festival_from_rules_repos().
     
     :param day_panchaanga: 
     :param month_type: 
+    :param fest_ids: If not None, apply only rules with these ids. 
     :return: 
     """
     from jyotisha.panchaanga.temporal.festival import rules
-    rule_set = rules.RulesCollection.get_cached(repos_tuple=tuple(self.computation_system.festival_options.repos), julian_handling=self.computation_system.festival_options.julian_handling)
+    # Same as RulesCollection.get_cached(...) - but that would hash the repos on every call.
+    rule_set = self.rules_collection
 
     date = day_panchaanga.get_date(month_type=month_type)
     days = [date.day]
@@ -97,6 +110,8 @@ class RuleLookupAssigner(FestivalAssigner):
           days = [30, 31]
     fest_dict = rule_set.get_possibly_relevant_fests(month=date.month, angas=days, month_type=month_type, anga_type_id=rules.RulesRepo.DAY_DIR)
     for fest_id, fest in fest_dict.items():
+      if fest_ids is not None and fest_id not in fest_ids:
+        continue
       if month_type in [RulesRepo.GREGORIAN_MONTH_DIR, RulesRepo.JULIAN_MONTH_DIR]:
         self.panchaanga.add_festival(date=day_panchaanga.date, fest_id=fest_id, interval_id="julian_day")
       else:
@@ -113,8 +128,8 @@ class RuleLookupAssigner(FestivalAssigner):
     :param panchaangas: Array of panchaangas for 2 successive days 
     :return: 
     """
-    from jyotisha.panchaanga.temporal.festival import rules
-    rule_set = rules.RulesCollection.get_cached(repos_tuple=tuple(self.computation_system.festival_options.repos), julian_handling=self.computation_system.festival_options.julian_handling)
+    # Same as RulesCollection.get_cached(...) - but that would hash the repos on every call.
+    rule_set = self.rules_collection
     anga_type_id = anga_type.name.lower()
     
 
@@ -175,19 +190,21 @@ class RuleLookupAssigner(FestivalAssigner):
 
 
   @timebudget
-  def apply_month_anga_events(self, day_panchaanga, anga_type, month_type):
+  def apply_month_anga_events(self, day_panchaanga, anga_type, month_type, fest_ids=None):
     """ Apply events set to take place on when an anga (tithi, naxatra, yoga ..) occurs within a given month. Eg. Chaitra shukla 1, rohiNI of taiShya. See calls from apply_festival_from_rules_repos().
     
     :param day_panchaanga: 
     :param anga_type: 
     :param month_type: 
+    :param fest_ids: If not None, apply only rules with these ids. 
     :return: 
     """
     from jyotisha.panchaanga.temporal.festival import priority_decision
     date = day_panchaanga.date
     month = day_panchaanga.get_date(month_type=month_type).month
     
-    panchaangas = [self.panchaanga.date_str_to_panchaanga.get((date-2).get_date_str(), None), self.panchaanga.date_str_to_panchaanga.get((date-1).get_date_str(), None), day_panchaanga]
+    day_index = self.panchaanga.get_day_index(date=date)
+    panchaangas = [self.panchaanga.daily_panchaanga_for_index(day_index - 2), self.panchaanga.daily_panchaanga_for_index(day_index - 1), day_panchaanga]
     if panchaangas[1] is None:
       # We require atleast 1 day history.
       return
@@ -197,6 +214,8 @@ class RuleLookupAssigner(FestivalAssigner):
     ###########################
     # Iterate over relevant festivals
     for fest_id, fest_rule in fest_dict.items():
+      if fest_ids is not None and fest_id not in fest_ids:
+        continue
       kaala = fest_rule.timing.get_kaala()
       priority = fest_rule.timing.get_priority()
       adhika_maasa_handling = fest_rule.timing.get_adhika_maasa_handling()
@@ -210,7 +229,7 @@ class RuleLookupAssigner(FestivalAssigner):
         if assign_festival:
           if len(self.festival_id_to_days[fest_id]) > 0:
             previous_fest_day = sorted(self.festival_id_to_days[fest_id])[-1]
-            p_previous_fday = self.panchaanga.date_str_to_panchaanga[previous_fest_day.get_date_str()]
+            p_previous_fday = self.panchaanga.daily_panchaanga_for_date(date=previous_fest_day)
             # Regarding the fest_rule.timing.month_number != 0 below:
             # This is required so as to avoid omissions as in the following case: sthAlIpAka_1 (which occurs every lunar month on tithi 1 at pUrvaviddha pUrvAhNa) occurs within the same "sunrise lunar month" but on different "pUrvAhNa lunar months" on 2019-07-03 and 2019-08-01.
             # Plus, a gap of not much more than 1 month is desirable for monthly festivals even otherwise - https://github.com/jyotisham/jyotisha/issues/54#issuecomment-735355325 . 
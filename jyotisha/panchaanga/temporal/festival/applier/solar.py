@@ -6,7 +6,7 @@ from datetime import datetime
 from math import floor
 
 from jyotisha.panchaanga.temporal import names
-from jyotisha.panchaanga.temporal import zodiac, tithi
+from jyotisha.panchaanga.temporal import zodiac
 from jyotisha.panchaanga.temporal.festival.applier import FestivalAssigner
 from jyotisha.panchaanga.temporal.festival import FestivalInstance
 from jyotisha.panchaanga.temporal.interval import Interval, get_interval
@@ -486,24 +486,22 @@ class SolarFestivalAssigner(FestivalAssigner):
       # यदा विष्टिर्व्यतीपातो भानुवारस्तथैव च॥
       # पद्मको नाम योगोयमयनादेश्चतुर्गुणः॥ (धर्मसिन्धौ पृ ३००)
       VISHTI = list(range(8, 60, 7))
-      sunrise_zodiac = NakshatraDivision(daily_panchaanga.jd_sunrise, ayanaamsha_id=self.computation_system.ayanaamsha_id)
-      sunset_zodiac = NakshatraDivision(daily_panchaanga.jd_sunset, ayanaamsha_id=self.computation_system.ayanaamsha_id)
       if daily_panchaanga.date.get_weekday() == 0 and \
-        (sunrise_zodiac.get_anga(zodiac.AngaType.YOGA).index == 17 or 
-         sunset_zodiac.get_anga(zodiac.AngaType.YOGA).index == 17) and \
-        (sunrise_zodiac.get_anga(zodiac.AngaType.KARANA).index in VISHTI or \
-         sunset_zodiac.get_anga(zodiac.AngaType.KARANA).index in VISHTI):
-        if sunrise_zodiac.get_anga(zodiac.AngaType.KARANA).index in VISHTI:
-          karana_ID = sunrise_zodiac.get_anga(zodiac.AngaType.KARANA).index
-        elif sunset_zodiac.get_anga(zodiac.AngaType.KARANA).index in VISHTI:
-          karana_ID = sunset_zodiac.get_anga(zodiac.AngaType.KARANA).index
+        (self.get_anga(jd=daily_panchaanga.jd_sunrise, anga_type=zodiac.AngaType.YOGA).index == 17 or 
+         self.get_anga(jd=daily_panchaanga.jd_sunset, anga_type=zodiac.AngaType.YOGA).index == 17) and \
+        (self.get_anga(jd=daily_panchaanga.jd_sunrise, anga_type=zodiac.AngaType.KARANA).index in VISHTI or \
+         self.get_anga(jd=daily_panchaanga.jd_sunset, anga_type=zodiac.AngaType.KARANA).index in VISHTI):
+        if self.get_anga(jd=daily_panchaanga.jd_sunrise, anga_type=zodiac.AngaType.KARANA).index in VISHTI:
+          karana_ID = self.get_anga(jd=daily_panchaanga.jd_sunrise, anga_type=zodiac.AngaType.KARANA).index
+        elif self.get_anga(jd=daily_panchaanga.jd_sunset, anga_type=zodiac.AngaType.KARANA).index in VISHTI:
+          karana_ID = self.get_anga(jd=daily_panchaanga.jd_sunset, anga_type=zodiac.AngaType.KARANA).index
         self._assign_yoga('padmaka-yOga-puNyakAlaH', [(zodiac.AngaType.KARANA, karana_ID), (zodiac.AngaType.YOGA, 17)],
                           jd_start=daily_panchaanga.jd_sunrise, jd_end=daily_panchaanga.jd_sunset)
         # self.panchaanga.add_festival_instance(festival_instance=FestivalInstance(name='padmaka-yOga-puNyakAlaH', interval=Interval(jd_start=None, jd_end=None)), date=daily_panchaanga.date)
 
       if daily_panchaanga.date.get_weekday() == 0 and \
-        (sunrise_zodiac.get_anga(zodiac.AngaType.TITHI).index % 30 == 6 and
-            sunset_zodiac.get_anga(zodiac.AngaType.TITHI).index % 30 == 7):
+        (self.get_anga(jd=daily_panchaanga.jd_sunrise, anga_type=zodiac.AngaType.TITHI).index % 30 == 6 and
+            self.get_anga(jd=daily_panchaanga.jd_sunset, anga_type=zodiac.AngaType.TITHI).index % 30 == 7):
         self.panchaanga.add_festival_instance(festival_instance=FestivalInstance(name='padmaka-yOgaH-2', interval=Interval(jd_start=None, jd_end=None)), date=daily_panchaanga.date)
 
     self._assign_yoga('padmaka-yOgaH-3', [(zodiac.AngaType.SOLAR_NAKSH, 16), (zodiac.AngaType.NAKSHATRA, 3)],
@@ -516,11 +514,9 @@ class SolarFestivalAssigner(FestivalAssigner):
       # Can also refer youtube video https://youtu.be/0DBIwb7iaLE?list=PL_H2LUtMCKPjh63PRk5FA3zdoEhtBjhzj&t=6747
       # 4th pada of vyatipatam, 1st pada of Amavasya, 2nd pada of Shravana, Suryodaya, Bhanuvasara = Ardhodayam
       # 4th pada of vyatipatam, 1st pada of Amavasya, 2nd pada of Shravana, Suryodaya, Somavasara = Mahodayam
-      sunrise_zodiac = NakshatraDivision(daily_panchaanga.jd_sunrise, ayanaamsha_id=self.computation_system.ayanaamsha_id)
-      sunset_zodiac = NakshatraDivision(daily_panchaanga.jd_sunset, ayanaamsha_id=self.computation_system.ayanaamsha_id)
-      if daily_panchaanga.lunar_date.month.index in [10, 11] and (daily_panchaanga.sunrise_day_angas.tithi_at_sunrise.index == 30 or tithi.get_tithi(daily_panchaanga.jd_sunrise).index == 30):
-        if (sunrise_zodiac.get_anga(zodiac.AngaType.YOGA).index == 17 or sunset_zodiac.get_anga(zodiac.AngaType.YOGA).index == 17) and \
-            (sunrise_zodiac.get_anga(zodiac.AngaType.NAKSHATRA).index == 22 or  sunset_zodiac.get_anga(zodiac.AngaType.NAKSHATRA).index == 22):
+      if daily_panchaanga.lunar_date.month.index in [10, 11] and (daily_panchaanga.sunrise_day_angas.tithi_at_sunrise.index == 30 or self.get_tithi(daily_panchaanga.jd_sunrise).index == 30):
+        if (self.get_anga(jd=daily_panchaanga.jd_sunrise, anga_type=zodiac.AngaType.YOGA).index == 17 or self.get_anga(jd=daily_panchaanga.jd_sunset, anga_type=zodiac.AngaType.YOGA).index == 17) and \
+            (self.get_anga(jd=daily_panchaanga.jd_sunrise, anga_type=zodiac.AngaType.NAKSHATRA).index == 22 or  self.get_anga(jd=daily_panchaanga.jd_sunset, anga_type=zodiac.AngaType.NAKSHATRA).index == 22):
           if daily_panchaanga.date.get_weekday() == 1:
             festival_name = 'mahOdaya-puNyakAlaH'
             self.panchaanga.add_festival(fest_id=festival_name, date=self.daily_panchaangas[d].date)
@@ -5,11 +5,11 @@ from datetime import datetime
 from math import floor
 
 from jyotisha.panchaanga.temporal import names
-from jyotisha.panchaanga import temporal
 from jyotisha.panchaanga.temporal import time, get_2_day_interval_boundary_angas
-from jyotisha.panchaanga.temporal import zodiac, tithi
+from jyotisha.panchaanga.temporal import zodiac
 from jyotisha.panchaanga.temporal.body import Graha
 from jyotisha.panchaanga.temporal.festival import FestivalInstance
+from jyotisha.panchaanga.temporal.festival import dependencies
 from jyotisha.panchaanga.temporal.festival.applier import FestivalAssigner
 from jyotisha.panchaanga.temporal.interval import Interval
 from jyotisha.panchaanga.temporal.zodiac import NakshatraDivision, AngaType, Ayanamsha
@@ -92,8 +92,8 @@ class TithiFestivalAssigner(FestivalAssigner):
     for d in range(self.panchaanga.duration + self.panchaanga.duration_prior_padding):
       day_panchaanga = self.daily_panchaangas[d]
       prev_day_panchaanga = self.daily_panchaangas[d - 1]
-      day_anadhyayana_festivals = [f for f in day_panchaanga.festival_id_to_instance.values() if 'anadhyAyaH' in f.name]
-      prev_day_anadhyayana_festivals = [f for f in prev_day_panchaanga.festival_id_to_instance.values()  if 'anadhyAyaH' in f.name]
+      day_anadhyayana_festivals = list(dependencies.find_festival_instances(festival_id_to_instance=day_panchaanga.festival_id_to_instance, id_fragment='anadhyAyaH').values())
+      prev_day_anadhyayana_festivals = list(dependencies.find_festival_instances(festival_id_to_instance=prev_day_panchaanga.festival_id_to_instance, id_fragment='anadhyAyaH').values())
       for f in list(day_anadhyayana_festivals):
         if 'anadhyAyaH' in f.name and 'pUrvarAtrau' not in f.name:
           if any('anadhyAyaH' in prev_day_f.name for prev_day_f in prev_day_anadhyayana_festivals):
@@ -204,8 +204,7 @@ class TithiFestivalAssigner(FestivalAssigner):
     if 'bhadrA~saptamI' in self.rules_collection.name_to_rule:
       for d in range(self.panchaanga.duration_prior_padding, self.panchaanga.duration + self.panchaanga.duration_prior_padding):
         day_panchaanga = self.daily_panchaangas[d]
-        if NakshatraDivision(day_panchaanga.jd_sunrise, ayanaamsha_id=self.ayanaamsha_id).get_anga(
-            zodiac.AngaType.NAKSHATRA_PADA).index == 49 and \
+        if self.get_anga(jd=day_panchaanga.jd_sunrise, anga_type=zodiac.AngaType.NAKSHATRA_PADA).index == 49 and \
             day_panchaanga.sunrise_day_angas.tithi_at_sunrise.index == 7:
           self.panchaanga.add_festival(fest_id='bhadrA~saptamI', date=day_panchaanga.date)
 
@@ -222,8 +221,7 @@ class TithiFestivalAssigner(FestivalAssigner):
       for d in range(self.panchaanga.duration_prior_padding, self.panchaanga.duration + self.panchaanga.duration_prior_padding):
         day_panchaanga = self.daily_panchaangas[d]
         # SPECIAL ASHTAMIs
-        if day_panchaanga.lunar_date.month.index == 10 and NakshatraDivision(day_panchaanga.jd_sunrise, ayanaamsha_id=self.ayanaamsha_id).get_anga(
-            zodiac.AngaType.NAKSHATRA).index == 2 and \
+        if day_panchaanga.lunar_date.month.index == 10 and self.get_anga(jd=day_panchaanga.jd_sunrise, anga_type=zodiac.AngaType.NAKSHATRA).index == 2 and \
             day_panchaanga.sunrise_day_angas.tithi_at_sunrise.index == 8:
           self.panchaanga.add_festival(fest_id='jayantI~aSTamI', date=day_panchaanga.date)
 
@@ -244,14 +242,14 @@ class TithiFestivalAssigner(FestivalAssigner):
           ekaadashii_paksha = 'shukla'
         if ekaadashii_tithi_days in [[11, 11, 12], [10, 12, 12]]:
           smaarta_ekaadashii_fday = d + 1
-          tithi_arunodayam = tithi.get_tithi(self.daily_panchaangas[d + 1].jd_sunrise - (1 / 15.0) * (self.daily_panchaangas[d + 1].jd_sunrise - day_panchaanga.jd_sunrise)).index
+          tithi_arunodayam = self.get_tithi(self.daily_panchaangas[d + 1].jd_sunrise - (1 / 15.0) * (self.daily_panchaangas[d + 1].jd_sunrise - day_panchaanga.jd_sunrise)).index
           if tithi_arunodayam % 15 == 10:
             vaishnava_ekaadashii_fday = d + 2
           else:
             vaishnava_ekaadashii_fday = d + 1
         elif ekaadashii_tithi_days in [[10, 12, 13], [11, 12, 13], [11, 12, 12], [11, 12, 14]]:
           smaarta_ekaadashii_fday = d
-          tithi_arunodayam = temporal.tithi.get_tithi(day_panchaanga.jd_sunrise - (1 / 15.0) * (day_panchaanga.jd_sunrise - self.daily_panchaangas[d - 1].jd_sunrise)).index
+          tithi_arunodayam = self.get_tithi(day_panchaanga.jd_sunrise - (1 / 15.0) * (day_panchaanga.jd_sunrise - self.daily_panchaangas[d - 1].jd_sunrise)).index
           if tithi_arunodayam % 15 == 11 and ekaadashii_tithi_days in [[11, 12, 13], [11, 12, 14]]:
             vaishnava_ekaadashii_fday = d
           else:
@@ -378,7 +376,7 @@ class TithiFestivalAssigner(FestivalAssigner):
             if t12_end is None:
               continue
             if (t12 % 15) == 11:
-              if NakshatraDivision(t12_end, ayanaamsha_id=self.ayanaamsha_id).get_anga(zodiac.AngaType.NAKSHATRA).index == 22:
+              if self.get_anga(jd=t12_end, anga_type=zodiac.AngaType.NAKSHATRA).index == 22:
                 if (day_panchaanga.sunrise_day_angas.tithi_at_sunrise.index % 15) == 12 and (self.daily_panchaangas[d + 1].sunrise_day_angas.tithi_at_sunrise.index % 15) == 12:
                   _add_shravana_dvaadashi(t12, date=day_panchaanga.date)
                 elif (day_panchaanga.sunrise_day_angas.tithi_at_sunrise.index % 15) == 12:
@@ -386,7 +384,7 @@ class TithiFestivalAssigner(FestivalAssigner):
                 elif (self.daily_panchaangas[d + 1].sunrise_day_angas.tithi_at_sunrise.index % 15) == 12:
                   _add_shravana_dvaadashi(t12, date=day_panchaanga.date + 1)
             if (t12 % 15) == 12:
-              if NakshatraDivision(t12_end, ayanaamsha_id=self.ayanaamsha_id).get_anga(zodiac.AngaType.NAKSHATRA).index == 22:
+              if self.get_anga(jd=t12_end, anga_type=zodiac.AngaType.NAKSHATRA).index == 22:
                 if (day_panchaanga.sunrise_day_angas.tithi_at_sunrise.index % 15) == 12 and (self.daily_panchaangas[d + 1].sunrise_day_angas.tithi_at_sunrise.index % 15) == 12:
                   _add_shravana_dvaadashi(t12, date=day_panchaanga.date)
                 elif (day_panchaanga.sunrise_day_angas.tithi_at_sunrise.index % 15) == 12:
@@ -503,7 +501,7 @@ class TithiFestivalAssigner(FestivalAssigner):
                                       visarga=False) + '-'
 
       apraahna_interval = day_panchaanga.get_interval("अपराह्णः")
-      ama_nakshatra_today = [y for y in apraahna_interval.get_boundary_angas(anga_type=AngaType.NAKSHATRA, ayanaamsha_id=self.ayanaamsha_id).to_tuple()]
+      ama_nakshatra_today = [y for y in self.get_boundary_angas(interval=apraahna_interval, anga_type=AngaType.NAKSHATRA).to_tuple()]
       suff = ''
       # Assign
       if 23 in ama_nakshatra_today and day_panchaanga.lunar_date.month.index == 11:
@@ -557,14 +555,12 @@ class TithiFestivalAssigner(FestivalAssigner):
       # “In Mahabharata, if on a Sunday, Amavasya and one of the stars –
       # Sravanam, Asvini, Avittam, Tiruvadirai or Ayilyam, occurs, then it is called ‘Vyatipatam’.
       # This Vyatipata yoga is equal to a hundred Surya grahanas in merit.”
-      tithi_sunset = NakshatraDivision(day_panchaanga.jd_sunset, ayanaamsha_id=self.ayanaamsha_id).get_anga(
-        zodiac.AngaType.TITHI).index
+      tithi_sunset = self.get_anga(jd=day_panchaanga.jd_sunset, anga_type=zodiac.AngaType.TITHI).index
       if day_panchaanga.date.get_weekday() == 0 and (day_panchaanga.sunrise_day_angas.tithi_at_sunrise.index == 30 or tithi_sunset == 30):
         # AMAVASYA on a Sunday
         if (day_panchaanga.sunrise_day_angas.nakshatra_at_sunrise.index in [1, 6, 9, 22, 23] and day_panchaanga.sunrise_day_angas.tithi_at_sunrise.index == 30) or \
             (tithi_sunset == 30 and 
-             NakshatraDivision(day_panchaanga.jd_sunset,
-             ayanaamsha_id=self.ayanaamsha_id).get_anga(zodiac.AngaType.NAKSHATRA).index in [1, 6, 9, 22, 23]):
+             self.get_anga(jd=day_panchaanga.jd_sunset, anga_type=zodiac.AngaType.NAKSHATRA).index in [1, 6, 9, 22, 23]):
           festival_name = 'vyatIpAta-yOgaH (alabhyam)'
           self.panchaanga.add_festival(fest_id=festival_name, date=day_panchaanga.date)
 
@@ -575,8 +571,7 @@ class TithiFestivalAssigner(FestivalAssigner):
     for d in range(self.panchaanga.duration_prior_padding, self.panchaanga.duration + self.panchaanga.duration_prior_padding):
       day_panchaanga = self.daily_panchaangas[d]
 
-      tithi_sunset = NakshatraDivision(day_panchaanga.jd_sunset, ayanaamsha_id=self.ayanaamsha_id).get_anga(
-        zodiac.AngaType.TITHI).index
+      tithi_sunset = self.get_anga(jd=day_panchaanga.jd_sunset, anga_type=zodiac.AngaType.TITHI).index
 
       if day_panchaanga.date.get_weekday() == 4 and (day_panchaanga.sunrise_day_angas.tithi_at_sunrise.index == 15 or tithi_sunset == 15):
         # PURNIMA on a Thursday
@@ -584,7 +579,7 @@ class TithiFestivalAssigner(FestivalAssigner):
         lunar_month_nakshatra = [None, 14, 16, 18, 20, 22, 25, 1, 3, 5, 8, 10, 11]
         fest_yoga_names = [None,  "caitrI", "vaizAkhI", "jyaiSThI", "ASADhI", "zrAvaNI", "bhAdrapadI", "AzvayujI", "kArtikI", "mArgazIrSI", "pauSI", "mAghI", "phAlgunI"]
         if (day_panchaanga.sunrise_day_angas.nakshatra_at_sunrise.index == lunar_month_nakshatra[lunar_month] and day_panchaanga.sunrise_day_angas.tithi_at_sunrise.index == 15) or \
-            (tithi_sunset == 15 and NakshatraDivision(day_panchaanga.jd_sunset, ayanaamsha_id=self.ayanaamsha_id).get_anga(zodiac.AngaType.NAKSHATRA).index == lunar_month_nakshatra[lunar_month]):
+            (tithi_sunset == 15 and self.get_anga(jd=day_panchaanga.jd_sunset, anga_type=zodiac.AngaType.NAKSHATRA).index == lunar_month_nakshatra[lunar_month]):
           festival_name = 'mahA-%s-yOgaH' % fest_yoga_names[lunar_month]
           self.panchaanga.add_festival(fest_id=festival_name, date=day_panchaanga.date)
 
@@ -595,10 +590,8 @@ class TithiFestivalAssigner(FestivalAssigner):
       day_panchaanga = self.daily_panchaangas[d]
       # चतुर्थी भरणीयोगः शनैश्चरदिने यदि ।
       # तदाभ्यर्च्य यमं देवं मुच्यते सर्वकिल्विषैः ॥
-      tithi_sunset = NakshatraDivision(day_panchaanga.jd_sunset, ayanaamsha_id=self.ayanaamsha_id).get_anga(
-        zodiac.AngaType.TITHI).index
-      nakshatra_sunset = NakshatraDivision(day_panchaanga.jd_sunset, ayanaamsha_id=self.ayanaamsha_id).get_anga(
-        zodiac.AngaType.NAKSHATRA).index
+      tithi_sunset = self.get_anga(jd=day_panchaanga.jd_sunset, anga_type=zodiac.AngaType.TITHI).index
+      nakshatra_sunset = self.get_anga(jd=day_panchaanga.jd_sunset, anga_type=zodiac.AngaType.NAKSHATRA).index
       if day_panchaanga.date.get_weekday() == 6 and (day_panchaanga.sunrise_day_angas.tithi_at_sunrise.index in [4, 19] or tithi_sunset in [4, 19]):
         if day_panchaanga.sunrise_day_angas.nakshatra_at_sunrise.index == 2 or  nakshatra_sunset == 2:
           festival_name = 'bharaNI-yamArcanA'
@@ -626,8 +619,8 @@ class TithiFestivalAssigner(FestivalAssigner):
         # Compute the tithi at the correct instant, for checking chandra-darshanam
         # Multiple schools of thought: sunset (30), moonset, 31, 29
         # 
-        tithi_check = temporal.tithi.get_tithi(day_panchaanga.graha_set_jd[Graha.MOON]).index
-        tithi_check_tmrw = temporal.tithi.get_tithi(self.daily_panchaangas[d + 1].graha_set_jd[Graha.MOON]).index
+        tithi_check = self.get_tithi(day_panchaanga.graha_set_jd[Graha.MOON]).index
+        tithi_check_tmrw = self.get_tithi(self.daily_panchaangas[d + 1].graha_set_jd[Graha.MOON]).index
         fest_name = 'candra-darzanam'
         if day_panchaanga.lunar_date.month.index == 6:
           fest_name = 'bhAdrapada-' + fest_name
@@ -651,10 +644,10 @@ class TithiFestivalAssigner(FestivalAssigner):
   def assign_bodhaayana_amaavaasyaa(self):
     chandra_darshanam_days = list(self.panchaanga.festival_id_to_days['candra-darzanam']) + list(self.panchaanga.festival_id_to_days['bhAdrapada-candra-darzanam'])
     for cdd in chandra_darshanam_days:
-      if 'darsheShTiH' in self.panchaanga.daily_panchaanga_for_date(cdd).festival_id_to_instance.keys():
+      if 'darsheShTiH' in self.panchaanga.daily_panchaanga_for_date(cdd).festival_id_to_instance:
         self.panchaanga.add_festival(fest_id='bOdhAyana-kAtyAyana-iSTiH', date=self.panchaanga.daily_panchaanga_for_date(cdd - 1).date)
 
-      ama_fest = [val for key, val in self.panchaanga.daily_panchaanga_for_date(cdd - 1).festival_id_to_instance.items() if 'amAvAsyA' in key]
+      ama_fest = list(dependencies.find_festival_instances(festival_id_to_instance=self.panchaanga.daily_panchaanga_for_date(cdd - 1).festival_id_to_instance, id_fragment='amAvAsyA').values())
       if ama_fest:
         # We have amAvAsyA preceding chandra darshanam. Therefore, the previous day must be assigned as bOdhAayana
         bodhaayana_fest = re.sub('amAvAsyA.*', 'amAvAsyA', 'bOdhAyana-kAtyAyana-' + ama_fest[0].name)
@@ -664,11 +657,9 @@ class TithiFestivalAssigner(FestivalAssigner):
         else:
           logging.warning('Not adding separate bOdhAyana-kAtyAyana-iSTiH on %s as it coincides with darsheShTiH!' % (self.panchaanga.daily_panchaanga_for_date(cdd-1).date.get_date_str()))
       else:
-        for key, val in dict(self.panchaanga.daily_panchaanga_for_date(cdd - 2).festival_id_to_instance).items():
-          if 'amAvAsyA' in key:
-            fest_id = key
-            self.panchaanga.delete_festival_date(fest_id=fest_id, date=self.panchaanga.daily_panchaanga_for_date(cdd - 2).date)
-            self.panchaanga.add_festival(fest_id='sarva-' + fest_id, date=self.panchaanga.daily_panchaanga_for_date(cdd - 2).date)
+        for fest_id in dependencies.find_festival_instances(festival_id_to_instance=self.panchaanga.daily_panchaanga_for_date(cdd - 2).festival_id_to_instance, id_fragment='amAvAsyA'):
+          self.panchaanga.delete_festival_date(fest_id=fest_id, date=self.panchaanga.daily_panchaanga_for_date(cdd - 2).date)
+          self.panchaanga.add_festival(fest_id='sarva-' + fest_id, date=self.panchaanga.daily_panchaanga_for_date(cdd - 2).date)
 
     # We forcefully assigned candra-darzanam to facilitate bodhAyana-kAtyAyana calc - now remove if not needed!
     if 'candra-darzanam' not in self.rules_collection.name_to_rule:
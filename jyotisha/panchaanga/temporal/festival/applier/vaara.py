@@ -5,7 +5,7 @@ from jyotisha.panchaanga.temporal.festival.applier import FestivalAssigner
 from jyotisha.panchaanga.temporal.festival.applier import solar
 from jyotisha.panchaanga.temporal.festival import FestivalInstance
 from jyotisha.panchaanga.temporal.interval import Interval
-from jyotisha.panchaanga.temporal.zodiac import NakshatraDivision, AngaType
+from jyotisha.panchaanga.temporal.zodiac import AngaType
 from math import ceil
 import logging
 from sanskrit_data.schema import common
@@ -127,7 +127,7 @@ class VaraFestivalAssigner(FestivalAssigner):
         if self.daily_panchaangas[d].date.get_weekday() == festival_weekday:
           nakshatram_praatah = self.daily_panchaangas[d].sunrise_day_angas.nakshatra_at_sunrise.index
           raatri_end = self.daily_panchaangas[d].day_length_based_periods.eight_fold_division.raatri_yaama[0].jd_end
-          nakshatram_raatri = NakshatraDivision(jd=raatri_end, ayanaamsha_id=self.panchaanga.computation_system.ayanaamsha_id).get_anga(anga_type=AngaType.NAKSHATRA).index
+          nakshatram_raatri = self.get_anga(jd=raatri_end, anga_type=AngaType.NAKSHATRA).index
           if festival_nakshatra in [nakshatram_praatah, nakshatram_raatri]:
             if festival_nakshatra == nakshatram_praatah == nakshatram_raatri:
               self.panchaanga.add_festival_instance(festival_instance=FestivalInstance(name=f'{festival_name}-yOgaH'), date=self.daily_panchaangas[d].date)
@@ -152,9 +152,9 @@ class VaraFestivalAssigner(FestivalAssigner):
     for d in range(self.panchaanga.duration_prior_padding, self.panchaanga.duration + self.panchaanga.duration_prior_padding):
       for (festival_nakshatra, festival_weekday, festival_name) in VARA_VRATA_YOGAS:
         if self.daily_panchaangas[d].date.get_weekday() == festival_weekday:
-          nakshatram_saayam = NakshatraDivision(jd=self.daily_panchaangas[d].jd_sunset, ayanaamsha_id=self.panchaanga.computation_system.ayanaamsha_id).get_anga(anga_type=AngaType.NAKSHATRA).index
+          nakshatram_saayam = self.get_anga(jd=self.daily_panchaangas[d].jd_sunset, anga_type=AngaType.NAKSHATRA).index
           raatri_end = self.daily_panchaangas[d].day_length_based_periods.eight_fold_division.raatri_yaama[0].jd_end
-          nakshatram_raatri = NakshatraDivision(jd=raatri_end, ayanaamsha_id=self.panchaanga.computation_system.ayanaamsha_id).get_anga(anga_type=AngaType.NAKSHATRA).index
+          nakshatram_raatri = self.get_anga(jd=raatri_end, anga_type=AngaType.NAKSHATRA).index
           if festival_nakshatra in [nakshatram_saayam, nakshatram_raatri]:
             self.panchaanga.add_festival_instance(festival_instance=FestivalInstance(name=f'{festival_name}-naktavrata-yOgaH'),
                                                   date=self.daily_panchaangas[d].date)
@@ -166,7 +166,7 @@ class VaraFestivalAssigner(FestivalAssigner):
     PAATA_YOGA = 17 # vyatipAta
     for d in range(self.panchaanga.duration_prior_padding, self.panchaanga.duration + self.panchaanga.duration_prior_padding):
       if self.daily_panchaangas[d].date.get_weekday() == 0:
-        d_yogas = self.daily_panchaangas[d].day_length_based_periods.dinamaana.get_boundary_angas(anga_type=AngaType.YOGA, ayanaamsha_id=self.ayanaamsha_id)
+        d_yogas = self.get_boundary_angas(interval=self.daily_panchaangas[d].day_length_based_periods.dinamaana, anga_type=AngaType.YOGA)
         if PAATA_YOGA in [d_yogas.start.index, d_yogas.end.index]:
           self.panchaanga.add_festival_instance(festival_instance=FestivalInstance(name='pAtArka-yOgaH'), date=self.daily_panchaangas[d].date)
 
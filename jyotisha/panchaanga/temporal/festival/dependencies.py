@@ -0,0 +1,273 @@
+"""Dependencies of festival assignments - for incremental recomputation when festival rules change.
+
+Festivals assigned purely from rules (see RuleLookupAssigner.apply_festival_from_rules_repos and assign_relative_festivals) depend only on their own rule, and (for relative festivals) on the days of their anchor festivals. They can be recomputed individually. Festivals assigned, modified or consulted by the other (code based) assigners can't - a change to any of their rules calls for full recomputation.
+
+A DependencyRecorder tracks, while Panchaanga.update_festival_details runs, which festival ids code based assigners touch - by recording additions and deletions (see Panchaanga.add_festival_instance and such) as well as lookups into festival_id_to_days, RulesCollection.name_to_rule and the festival_id_to_instance of daily panchaangas. Code based assigners which pick festivals of a day by id (say all amAvAsyA-s) do so via find_festival_instances, which records the id fragment; any other iteration over festivals (or rules) by a code based assigner leads to full recomputation on any change. The result is kept with the panchaanga as a FestivalDependencies object, and consulted by get_festivals_to_recompute the next time.
+
+FestivalDependencies are bulky, and of no interest to readers of a panchaanga - so they are not serialized with it, but saved to a file of their own under DEPENDENCIES_DIR when the panchaanga is dumped to a file (see save and load).
+"""
+
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import sys
+from collections import defaultdict
+
+from sanskrit_data.schema import common
+
+# Bump whenever the saved representation changes. (Changes to assignment code are caught by get_code_fingerprint.)
+FORMAT_VERSION = 3
+
+DEPENDENCIES_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "jyotisha", "festival_dependencies")
+
+# Stages which assign festivals from rules alone - and can hence be rerun for a subset of festivals. All other stages are taken to be code based.
+RULE_LOOKUP_STAGE = "rule_lookup"
+RELATIVE_STAGE = "relative"
+NUMBERS_STAGE = "numbers"
+DUPLICATES_STAGE = "duplicates"
+PADDING_STAGE = "padding"
+RULE_STAGES = (RULE_LOOKUP_STAGE, RELATIVE_STAGE, NUMBERS_STAGE, DUPLICATES_STAGE, PADDING_STAGE)
+
+
+
+class DependencyRecorder(object):
+  def __init__(self):
+    self.stage = None
+    # Festival ids added, deleted or looked up by code based stages.
+    self.code_festival_ids = set()
+    # Set if a code based stage iterated over all festivals (or rules).
+    self.code_reads_all = False
+    # Fragments of festival ids by which code based stages picked festivals - see find_festival_instances.
+    self.code_id_fragments = set()
+    # relative festival id -> ids of anchor festivals used.
+    self.anchors = {}
+
+  def is_recording(self):
+    return self.stage is not None and self.stage not in RULE_STAGES
+
+  @contextlib.contextmanager
+  def in_stage(self, stage):
+    previous_stage = self.stage
+    self.stage = stage
+    try:
+      yield self
+    finally:
+      self.stage = previous_stage
+
+  def record_festival(self, fest_id):
+    if self.is_recording():
+      self.code_festival_ids.add(fest_id)
+
+  def record_all_festivals(self):
+    if self.is_recording():
+      self.code_reads_all = True
+
+  def record_id_fragment(self, id_fragment):
+    if self.is_recording():
+      self.code_id_fragments.add(id_fragment)
+
+
+class _RecordingDictMixin(object):
+  """Reports lookups to the recorder attribute (if set)."""
+
+  def _record(self, key):
+    recorder = self.__dict__.get("recorder", None)
+    if recorder is not None:
+      recorder.record_festival(key)
+
+  def _record_all(self):
+    recorder = self.__dict__.get("recorder", None)
+    if recorder is not None:
+      recorder.record_all_festivals()
+
+  def __contains__(self, key):
+    self._record(key)
+    return super().__contains__(key)
+
+  def __getitem__(self, key):
+    self._record(key)
+    return super().__getitem__(key)
+
+  def get(self, key, default=None):
+    self._record(key)
+    return super().get(key, default)
+
+  def pop(self, key, *args):
+    self._record(key)
+    return super().pop(key, *args)
+
+  def __iter__(self):
+    self._record_all()
+    return super().__iter__()
+
+  def keys(self):
+    self._record_all()
+    return super().keys()
+
+  def values(self):
+    self._record_all()
+    return super().values()
+
+  def items(self):
+    self._record_all()
+    return super().items()
+
+
+class RecordingDict(_RecordingDictMixin, dict):
+  pass
+
+
+class RecordingDefaultDict(_RecordingDictMixin, defaultdict):
+  pass
+
+
+def make_recording_dict(dict_in, recorder):
+  if isinstance(dict_in, defaultdict):
+    recording_dict = RecordingDefaultDict(dict_in.default_factory, dict_in)
+  else:
+    recording_dict = RecordingDict(dict_in)
+  recording_dict.recorder = recorder
+  return recording_dict
+
+
+def get_code_fingerprint():
+  """Fingerprint of the festival assignment code - the festival package (assigners, rules, priority_decision and such) and modules it relies on for assignment."""
+  from jyotisha import util
+  from jyotisha.panchaanga.spatio_temporal import periodical
+  from jyotisha.panchaanga.temporal import festival, interval, tithi
+  return util.get_code_fingerprint(modules=(festival, interval, tithi, periodical))
+
+
+def get_options_hash(computation_system, compute_shraadha_tithis):
+  """Hash of everything (other than the rules themselves) which festival assignment depends on - including the code."""
+  computation_system_map = computation_system.to_json_map()
+  # Rules in the repos are tracked individually.
+  computation_system_map.get("festival_options", {}).pop("repos", None)
+  return hashlib.sha256(json.dumps([FORMAT_VERSION, get_code_fingerprint(), computation_system_map, compute_shraadha_tithis], sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def get_rule_hashes(rules_collection):
+  """rule id -> hash of the rule's repo and timing (other fields such as descriptions don't affect assignment)."""
+  rule_hashes = rules_collection.__dict__.get("_rule_hashes", None)
+  if rule_hashes is None:
+    rule_hashes = {}
+    for rule_id, rule in rules_collection.name_to_rule.items():
+      timing = rule.timing.to_json_map() if rule.timing is not None else None
+      repo_name = rule.repo.name if rule.repo is not None else None
+      rule_hashes[rule_id] = hashlib.sha256(json.dumps([repo_name, timing], sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+    rules_collection._rule_hashes = rule_hashes
+  return rule_hashes
+
+
+class FestivalDependencies(common.JsonObject):
+  """What the festival assignments of a panchaanga depend on. See module docstring."""
+
+  def __init__(self, options_hash, rule_hashes, recorder, relative_stage_days):
+    """
+
+    :param relative_stage_days: festival id -> sorted days, as at the end of the relative festival assignment stage (ie before festival numbering and cleanup) - for use as anchors later.
+    """
+    super(FestivalDependencies, self).__init__()
+    self.format_version = FORMAT_VERSION
+    self.options_hash = options_hash
+    self.rule_hashes = dict(rule_hashes)
+    self.code_festival_ids = sorted(recorder.code_festival_ids)
+    self.code_reads_all = recorder.code_reads_all
+    self.code_id_fragments = sorted(recorder.code_id_fragments)
+    self.anchors = dict(recorder.anchors)
+    self.relative_stage_days = relative_stage_days
+    # Set by save.
+    self.festivals_digest = None
+
+  def get_festivals_to_recompute(self, rules_collection, options_hash):
+    """
+
+    :return: None if all festivals need recomputation. Else the (possibly empty) set of rule ids whose festivals need recomputation.
+    """
+    if self.format_version != FORMAT_VERSION or self.options_hash != options_hash:
+      return None
+    rule_hashes = get_rule_hashes(rules_collection=rules_collection)
+    changed_ids = set(rule_id for rule_id in set(rule_hashes).union(self.rule_hashes) if rule_hashes.get(rule_id, None) != self.rule_hashes.get(rule_id, None))
+    if len(changed_ids) == 0:
+      return changed_ids
+    if self.code_reads_all:
+      return None
+
+    # Add relative festival dependents - recorded ones, and those whose anchors may now (approximately) resolve differently.
+    from jyotisha.panchaanga.temporal.festival import rules
+    relative_rules = rules_collection.get_relative_festival_rules()
+    affected_ids = set()
+    pending_ids = set(changed_ids)
+    while len(pending_ids) > 0:
+      affected_ids.update(pending_ids)
+      new_ids = set()
+      for relative_rule in relative_rules:
+        if relative_rule.id in affected_ids:
+          continue
+        recorded_anchors = self.anchors.get(relative_rule.id, [])
+        if any(relative_rule.anchor_id_fragment in fest_id or fest_id in recorded_anchors for fest_id in pending_ids):
+          new_ids.add(relative_rule.id)
+      pending_ids = new_ids
+
+    code_festival_ids = set(self.code_festival_ids)
+    for rule_id in affected_ids:
+      clean_rule_id = rules.clean_id(rule_id)
+      if rule_id in code_festival_ids or clean_rule_id in code_festival_ids or any(id_fragment in rule_id or id_fragment in clean_rule_id for id_fragment in self.code_id_fragments):
+        return None
+    return affected_ids
+
+
+def find_festival_instances(festival_id_to_instance, id_fragment):
+  """Festivals (of a daily panchaanga) whose ids contain id_fragment. Unlike plain iteration over festival_id_to_instance, this is recorded precisely - as a dependency on festivals with such ids.
+
+  :return: A new dict from festival id to FestivalInstance.
+  """
+  recorder = festival_id_to_instance.__dict__.get("recorder", None) if isinstance(festival_id_to_instance, _RecordingDictMixin) else None
+  if recorder is not None:
+    recorder.record_id_fragment(id_fragment)
+  return {fest_id: festival_instance for fest_id, festival_instance in dict.items(festival_id_to_instance) if id_fragment in fest_id}
+
+
+def get_festivals_digest(festival_id_to_days):
+  """Digest of festival assignments - identifying the panchaanga state which saved dependencies belong to."""
+  festival_days = sorted((fest_id, sorted(day.get_date_str() for day in days)) for fest_id, days in festival_id_to_days.items())
+  return hashlib.sha256(json.dumps(festival_days).encode("utf-8")).hexdigest()
+
+
+def get_dependencies_path(panchaanga_filename, dependencies_dir=DEPENDENCIES_DIR):
+  path_hash = hashlib.sha256(os.path.abspath(os.path.expanduser(panchaanga_filename)).encode("utf-8")).hexdigest()[:16]
+  return os.path.join(dependencies_dir, path_hash + ".json")
+
+
+def save(festival_dependencies, panchaanga_filename, festival_id_to_days, dependencies_dir=DEPENDENCIES_DIR):
+  """Save the dependencies of the panchaanga being dumped to panchaanga_filename. Failure only results in a warning."""
+  festival_dependencies.festivals_digest = get_festivals_digest(festival_id_to_days=festival_id_to_days)
+  filename = get_dependencies_path(panchaanga_filename=panchaanga_filename, dependencies_dir=dependencies_dir)
+  try:
+    festival_dependencies.dump_to_file(filename=filename)
+  except Exception:
+    logging.warning("Could not save festival dependencies to %s.", filename, exc_info=True)
+
+
+def load(panchaanga_filename, festival_id_to_days, dependencies_dir=DEPENDENCIES_DIR):
+  """Dependencies saved with the panchaanga read from panchaanga_filename.
+
+  :return: None if not available - or if saved for different festival assignments (eg. if the panchaanga file was since rewritten otherwise).
+  """
+  filename = get_dependencies_path(panchaanga_filename=panchaanga_filename, dependencies_dir=dependencies_dir)
+  if not os.path.isfile(filename):
+    return None
+  try:
+    festival_dependencies = FestivalDependencies.read_from_file(filename=filename)
+  except Exception:
+    logging.warning("Could not load festival dependencies from %s.", filename, exc_info=True)
+    return None
+  if festival_dependencies.festivals_digest != get_festivals_digest(festival_id_to_days=festival_id_to_days):
+    return None
+  return festival_dependencies
+
+
+# Essential for depickling to work.
+common.update_json_class_index(sys.modules[__name__])
@@ -0,0 +1,318 @@
+"""Festival assignment as a pipeline of stages, each declaring what it reads and writes.
+
+Stages read and write groups of festivals (RULE_FESTIVALS and such below - ALL_FESTIVALS standing for every festival). Two stages conflict if one writes a group which the other reads or writes. Stages run in the order of FESTIVAL_STAGES; with parallel execution (see run_stages), non-conflicting stages are grouped into waves, and all but the first stage of a wave run in forked worker processes - which send back the changes they made to festivals (and the panchaanga attributes a stage declares), to be merged in stage order.
+
+Declared reads and writes were arrived at by recording the festivals each stage touched (see festival.dependencies). Festivals which code based stages pick by id fragment (see dependencies.find_festival_instances) come from the rule lookup and tithi stages.
+
+Every stage reports its wall time - and optionally the number of Swiss ephemeris calls it made (see StageReport).
+"""
+
+import contextlib
+import logging
+import timeit
+from collections import defaultdict
+
+from jyotisha import util
+from jyotisha.panchaanga.temporal import ephemeris
+from jyotisha.panchaanga.temporal.festival import dependencies, rules
+from jyotisha.panchaanga.temporal.festival.applier import tithi_festival, ecliptic, solar, vaara, rule_repo_based, \
+  FestivalAssigner
+from jyotisha.panchaanga.temporal.tithi import ShraadhaTithiAssigner
+from timebudget import timebudget
+
+RULE_FESTIVALS = "rule_festivals"
+SHRAADDHA_FESTIVALS = "shraaddha_festivals"
+ECLIPTIC_FESTIVALS = "ecliptic_festivals"
+TITHI_FESTIVALS = "tithi_festivals"
+SOLAR_FESTIVALS = "solar_festivals"
+VAARA_FESTIVALS = "vaara_festivals"
+RELATIVE_FESTIVALS = "relative_festivals"
+ALL_FESTIVALS = "all_festivals"
+
+
+class FestivalPipelineRun(object):
+  """State shared by the stages of one festival assignment run."""
+
+  def __init__(self, panchaanga, recorder, fest_ids, compute_shraadha_tithis, count_ephemeris_calls=False):
+    """
+
+    :param fest_ids: If not None, only festivals for these rule ids are recomputed - rule based stages (see dependencies.RULE_STAGES) alone are run.
+    :param count_ephemeris_calls: Count Swiss ephemeris calls made by each stage (see ephemeris.EphemerisCallCounter) - for profiling.
+    """
+    self.panchaanga = panchaanga
+    self.recorder = recorder
+    self.fest_ids = fest_ids
+    self.compute_shraadha_tithis = compute_shraadha_tithis
+    self.count_ephemeris_calls = count_ephemeris_calls
+    self.rule_lookup_assigner = rule_repo_based.RuleLookupAssigner(panchaanga=panchaanga)
+    self.generic_assigner = FestivalAssigner(panchaanga=panchaanga)
+    # festival id -> days at the end of the relative festival stage (see FestivalDependencies).
+    self.relative_stage_days = None
+    self.stage_reports = []
+
+
+class StageReport(object):
+  def __init__(self, stage_name, wall_time, num_ephemeris_calls=None, in_worker=False):
+    """
+
+    :param num_ephemeris_calls: None if not counted.
+    """
+    self.stage_name = stage_name
+    self.wall_time = wall_time
+    self.num_ephemeris_calls = num_ephemeris_calls
+    self.in_worker = in_worker
+
+  def __repr__(self):
+    calls_str = "" if self.num_ephemeris_calls is None else ", %d ephemeris calls" % self.num_ephemeris_calls
+    return "%s: %.3fs%s%s" % (self.stage_name, self.wall_time, calls_str, " (worker)" if self.in_worker else "")
+
+
+class FestivalStage(object):
+  def __init__(self, name, assign_fn, reads=(), writes=(), daily_attributes=(), panchaanga_attributes=()):
+    """
+
+    :param assign_fn: Function taking a FestivalPipelineRun.
+    :param reads: Festival groups read.
+    :param writes: Festival groups written.
+    :param daily_attributes: Attributes (other than festivals) of daily panchaangas which the stage sets.
+    :param panchaanga_attributes: Attributes (other than festivals) of the panchaanga which the stage sets.
+    """
+    self.name = name
+    self.assign_fn = assign_fn
+    self.reads = frozenset(reads)
+    self.writes = frozenset(writes)
+    self.daily_attributes = tuple(daily_attributes)
+    self.panchaanga_attributes = tuple(panchaanga_attributes)
+
+  def is_rule_based(self):
+    return self.name in dependencies.RULE_STAGES
+
+  def conflicts_with(self, other_stage):
+    def overlap(groups_1, groups_2):
+      return len(groups_1) > 0 and len(groups_2) > 0 and (ALL_FESTIVALS in groups_1 or ALL_FESTIVALS in groups_2 or len(groups_1.intersection(groups_2)) > 0)
+    return overlap(self.reads, other_stage.writes) or overlap(self.writes, other_stage.reads) or overlap(self.writes, other_stage.writes) or len(set(self.daily_attributes + self.panchaanga_attributes).intersection(other_stage.daily_attributes + other_stage.panchaanga_attributes)) > 0
+
+  def run(self, run, in_worker=False):
+    start_time = timeit.default_timer()
+    call_counter = ephemeris.EphemerisCallCounter() if run.count_ephemeris_calls else None
+    with timebudget("festival stage %s" % self.name), call_counter or contextlib.nullcontext(), run.recorder.in_stage(self.name):
+      self.assign_fn(run)
+    report = StageReport(stage_name=self.name, wall_time=timeit.default_timer() - start_time, num_ephemeris_calls=None if call_counter is None else call_counter.num_calls, in_worker=in_worker)
+    logging.debug(str(report))
+    return report
+
+
+def _assign_rule_lookup_festivals(run):
+  run.rule_lookup_assigner.apply_festival_from_rules_repos(fest_ids=run.fest_ids)
+
+
+def _assign_shraaddha_tithis(run):
+  if run.compute_shraadha_tithis:
+    ShraadhaTithiAssigner(panchaanga=run.panchaanga).assign_shraaddha_tithi()
+
+
+def _assign_ecliptic_festivals(run):
+  ecliptic.EclipticFestivalAssigner(panchaanga=run.panchaanga).assign_all()
+
+
+def _assign_tithi_festivals(run):
+  tithi_festival.TithiFestivalAssigner(panchaanga=run.panchaanga).assign_all()
+
+
+def _assign_solar_festivals(run):
+  solar.SolarFestivalAssigner(panchaanga=run.panchaanga).assign_all()
+
+
+def _assign_vaara_festivals(run):
+  vaara.VaraFestivalAssigner(panchaanga=run.panchaanga).assign_all()
+
+
+def _assign_varalakshmi_vratam(run):
+  if 'varalakSmI-vratam' in run.rule_lookup_assigner.rules_collection.name_to_rule:
+    run.rule_lookup_assigner.assign_varalakshmi_vratam()
+
+
+def _assign_relative_festivals(run):
+  panchaanga = run.panchaanga
+  if run.fest_ids is None:
+    run.rule_lookup_assigner.assign_relative_festivals(anchors=run.recorder.anchors)
+    run.relative_stage_days = {fest_id: sorted(days) for fest_id, days in panchaanga.festival_id_to_days.items()}
+    return
+
+  # Relative festivals are assigned with (unaffected) anchor festival days as they were at this stage before - ie. before numbering and cleanup.
+  previous_relative_stage_days = panchaanga.get_festival_dependencies().relative_stage_days
+  festival_id_to_days = panchaanga.festival_id_to_days
+  panchaanga.festival_id_to_days = dependencies.make_recording_dict(dict_in=defaultdict(set), recorder=run.recorder)
+  clean_fest_ids = set(rules.clean_id(fest_id) for fest_id in run.fest_ids)
+  for fest_id, days in previous_relative_stage_days.items():
+    if fest_id not in clean_fest_ids:
+      panchaanga.festival_id_to_days[fest_id] = set(days)
+  for fest_id in clean_fest_ids.intersection(festival_id_to_days):
+    panchaanga.festival_id_to_days[fest_id] = set(festival_id_to_days[fest_id])
+  run.rule_lookup_assigner.assign_relative_festivals(fest_ids=run.fest_ids, anchors=run.recorder.anchors)
+  run.relative_stage_days = {fest_id: sorted(days) for fest_id, days in panchaanga.festival_id_to_days.items()}
+  for fest_id in clean_fest_ids.intersection(panchaanga.festival_id_to_days):
+    festival_id_to_days[fest_id] = set(panchaanga.festival_id_to_days[fest_id])
+  panchaanga.festival_id_to_days = festival_id_to_days
+
+
+def _assign_festival_numbers(run):
+  run.generic_assigner.assign_festival_numbers(fest_ids=run.fest_ids)
+
+
+def _assign_anadhyayana_days(run):
+  tithi_festival.TithiFestivalAssigner(panchaanga=run.panchaanga).assign_relative_anadhyayana_days()
+  run.generic_assigner.cleanup_anadhyayana_festivals()
+
+
+def _cleanup_festivals(run):
+  run.generic_assigner.cleanup_festivals()
+
+
+def _remove_festivals_on_consecutive_days(run):
+  run.generic_assigner.remove_festivals_on_consecutive_days(fest_ids=run.fest_ids)
+
+
+def _clear_padding_day_festivals(run):
+  run.panchaanga.clear_padding_day_festivals()
+
+
+FESTIVAL_STAGES = [
+  FestivalStage(name=dependencies.RULE_LOOKUP_STAGE, assign_fn=_assign_rule_lookup_festivals, writes=[RULE_FESTIVALS]),
+  FestivalStage(name="shraaddha", assign_fn=_assign_shraaddha_tithis, writes=[SHRAADDHA_FESTIVALS], daily_attributes=["solar_shraaddha_tithi", "lunar_shraaddha_tithi"]),
+  FestivalStage(name="ecliptic", assign_fn=_assign_ecliptic_festivals, writes=[ECLIPTIC_FESTIVALS]),
+  # Eg. darsheShTiH is placed relative to amAvAsyA-s from the rules.
+  FestivalStage(name="tithi", assign_fn=_assign_tithi_festivals, reads=[RULE_FESTIVALS], writes=[TITHI_FESTIVALS, RULE_FESTIVALS]),
+  # Eg. viSu-puNyakAlaH, from the ecliptic stage, is consulted; and saGkramaNa puNyakAla-s are shared with the shraaddha stage.
+  FestivalStage(name="solar", assign_fn=_assign_solar_festivals, reads=[RULE_FESTIVALS, ECLIPTIC_FESTIVALS], writes=[SOLAR_FESTIVALS, SHRAADDHA_FESTIVALS, RULE_FESTIVALS], panchaanga_attributes=["nava_nayakas"]),
+  FestivalStage(name="vaara", assign_fn=_assign_vaara_festivals, writes=[VAARA_FESTIVALS]),
+  FestivalStage(name="varalakSmI-vratam", assign_fn=_assign_varalakshmi_vratam, reads=[RULE_FESTIVALS], writes=[RULE_FESTIVALS]),
+  FestivalStage(name=dependencies.RELATIVE_STAGE, assign_fn=_assign_relative_festivals, reads=[ALL_FESTIVALS], writes=[RELATIVE_FESTIVALS]),
+  FestivalStage(name=dependencies.NUMBERS_STAGE, assign_fn=_assign_festival_numbers, reads=[ALL_FESTIVALS], writes=[ALL_FESTIVALS]),
+  FestivalStage(name="anadhyayana", assign_fn=_assign_anadhyayana_days, reads=[ALL_FESTIVALS], writes=[ALL_FESTIVALS]),
+  FestivalStage(name="cleanup", assign_fn=_cleanup_festivals, reads=[ALL_FESTIVALS], writes=[ALL_FESTIVALS]),
+  FestivalStage(name=dependencies.DUPLICATES_STAGE, assign_fn=_remove_festivals_on_consecutive_days, reads=[ALL_FESTIVALS], writes=[ALL_FESTIVALS]),
+  FestivalStage(name=dependencies.PADDING_STAGE, assign_fn=_clear_padding_day_festivals, reads=[ALL_FESTIVALS], writes=[ALL_FESTIVALS]),
+]
+
+
+def get_stage_waves(stages):
+  """Group stages into waves of mutually non-conflicting stages. A stage is placed in the wave following the last one with a stage it conflicts with - so that running the waves in order (and the stages within a wave in any order) respects all declared dependencies.
+
+  :return: List of lists of stages - in the given order within each wave.
+  """
+  waves = []
+  stage_to_wave_index = {}
+  for stage_index, stage in enumerate(stages):
+    wave_index = 1 + max([stage_to_wave_index[earlier_index] for earlier_index in range(stage_index) if stage.conflicts_with(stages[earlier_index])], default=-1)
+    stage_to_wave_index[stage_index] = wave_index
+    if wave_index == len(waves):
+      waves.append([])
+    waves[wave_index].append(stage)
+  return waves
+
+
+def _get_festival_state(panchaanga):
+  """Shallow copies of festival_id_to_days and the festival instances of daily panchaangas. Should be called outside stages (so that the reads aren't recorded)."""
+  festival_id_to_days = {fest_id: set(days) for fest_id, days in panchaanga.festival_id_to_days.items()}
+  date_str_to_instances = {date_str: dict(daily_panchaanga.festival_id_to_instance) for date_str, daily_panchaanga in panchaanga.date_str_to_panchaanga.items()}
+  return (festival_id_to_days, date_str_to_instances)
+
+
+class FestivalChanges(object):
+  """Changes made by a stage (in a worker process) - to be applied to the panchaanga in the parent process.
+
+  Stages are taken to replace (rather than modify) festival instances from other stages - which holds for the stages which may run in workers.
+  """
+
+  def __init__(self, panchaanga, state_before, stage):
+    (festival_id_to_days_before, date_str_to_instances_before) = state_before
+    (festival_id_to_days, date_str_to_instances) = _get_festival_state(panchaanga=panchaanga)
+    self.removed_days = [(fest_id, day) for fest_id, days in festival_id_to_days_before.items() for day in days.difference(festival_id_to_days.get(fest_id, set()))]
+    self.added_days = [(fest_id, day) for fest_id, days in festival_id_to_days.items() for day in days.difference(festival_id_to_days_before.get(fest_id, set()))]
+    self.removed_instances = []
+    self.set_instances = []
+    for date_str, instances in date_str_to_instances.items():
+      instances_before = date_str_to_instances_before.get(date_str, {})
+      self.removed_instances.extend((date_str, fest_id) for fest_id in instances_before if fest_id not in instances)
+      self.set_instances.extend((date_str, fest_id, instance) for fest_id, instance in instances.items() if instances_before.get(fest_id, None) is not instance)
+    self.daily_attribute_values = [(date_str, attribute, daily_panchaanga.__dict__.get(attribute, None)) for date_str, daily_panchaanga in panchaanga.date_str_to_panchaanga.items() for attribute in stage.daily_attributes]
+    self.panchaanga_attribute_values = [(attribute, panchaanga.__dict__.get(attribute, None)) for attribute in stage.panchaanga_attributes]
+
+  def apply(self, panchaanga):
+    festival_id_to_days = panchaanga.festival_id_to_days
+    for (fest_id, day) in self.removed_days:
+      if fest_id in festival_id_to_days:
+        festival_id_to_days[fest_id].discard(day)
+        if len(festival_id_to_days[fest_id]) == 0:
+          festival_id_to_days.pop(fest_id)
+    for (fest_id, day) in self.added_days:
+      festival_id_to_days[fest_id].add(day)
+    for (date_str, fest_id) in self.removed_instances:
+      panchaanga.date_str_to_panchaanga[date_str].festival_id_to_instance.pop(fest_id, None)
+    for (date_str, fest_id, instance) in self.set_instances:
+      panchaanga.date_str_to_panchaanga[date_str].festival_id_to_instance[fest_id] = instance
+    for (date_str, attribute, value) in self.daily_attribute_values:
+      setattr(panchaanga.date_str_to_panchaanga[date_str], attribute, value)
+    for (attribute, value) in self.panchaanga_attribute_values:
+      setattr(panchaanga, attribute, value)
+
+
+# Set (only) while forking worker processes in _run_wave_in_parallel.
+_parallel_run = None
+
+
+def _run_stage_in_worker(stage_index):
+  stage = FESTIVAL_STAGES[stage_index]
+  state_before = _get_festival_state(panchaanga=_parallel_run.panchaanga)
+  report = stage.run(run=_parallel_run, in_worker=True)
+  changes = FestivalChanges(panchaanga=_parallel_run.panchaanga, state_before=state_before, stage=stage)
+  recorder = _parallel_run.recorder
+  # JsonObject-s (festival instances, dates) don't survive default pickling.
+  return util.pickle_dumps((changes, report, recorder.code_festival_ids, recorder.code_reads_all, recorder.code_id_fragments))
+
+
+def _run_wave_in_parallel(run, wave, max_workers):
+  """The first stage runs here, the rest in forked worker processes (which inherit the panchaanga and run)."""
+  import multiprocessing
+  import pickle
+  from concurrent.futures import ProcessPoolExecutor
+  global _parallel_run
+  _parallel_run = run
+  try:
+    with ProcessPoolExecutor(max_workers=min(max_workers - 1, len(wave) - 1), mp_context=multiprocessing.get_context("fork")) as executor:
+      futures = [executor.submit(_run_stage_in_worker, FESTIVAL_STAGES.index(stage)) for stage in wave[1:]]
+      run.stage_reports.append(wave[0].run(run=run))
+      worker_results = [pickle.loads(future.result()) for future in futures]
+  finally:
+    _parallel_run = None
+  for (changes, report, code_festival_ids, code_reads_all, code_id_fragments) in worker_results:
+    changes.apply(panchaanga=run.panchaanga)
+    run.recorder.code_festival_ids.update(code_festival_ids)
+    run.recorder.code_reads_all = run.recorder.code_reads_all or code_reads_all
+    run.recorder.code_id_fragments.update(code_id_fragments)
+    run.stage_reports.append(report)
+
+
+def run_stages(run, max_workers=None):
+  """Run the applicable stages of FESTIVAL_STAGES.
+
+  :param max_workers: If more than 1, waves of non-conflicting stages (see get_stage_waves) are run by as many processes. The result is identical to sequential execution.
+  :return: List of StageReport-s.
+  """
+  stages = [stage for stage in FESTIVAL_STAGES if run.fest_ids is None or stage.is_rule_based()]
+  if max_workers is None or max_workers <= 1:
+    waves = [[stage] for stage in stages]
+  else:
+    import multiprocessing
+    if "fork" not in multiprocessing.get_all_start_methods():
+      logging.warning("Parallel festival assignment needs the fork start method - running stages sequentially.")
+      waves = [[stage] for stage in stages]
+    else:
+      waves = get_stage_waves(stages=stages)
+  for wave in waves:
+    if len(wave) == 1:
+      run.stage_reports.append(wave[0].run(run=run))
+    else:
+      _run_wave_in_parallel(run=run, wave=wave, max_workers=max_workers)
+  return run.stage_reports
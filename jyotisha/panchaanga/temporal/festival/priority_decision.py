@@ -6,6 +6,7 @@ Main function in this module is the :func:`decide` function.
 import logging
 
 from jyotisha.panchaanga.temporal import zodiac, get_2_day_interval_boundary_angas
+from jyotisha.panchaanga.temporal.interval import Interval
 
 
 class FestivalDecision(object):
@@ -105,6 +106,15 @@ def decide_puurvaviddha(p0, p1, target_anga, kaala):
   return FestivalDecision.from_details(boundary_angas_list=[d0_angas, d1_angas], fday=fday, panchaangas=[p0, p1])
 
 
+def _get_anga_span_across_days(p0, p1, target_anga):
+  """Span of target_anga starting in p0's sunrise day and ending in p1's - from the anga spans already computed for the days (rather than a fresh search), or None if not found there."""
+  span0 = p0.sunrise_day_angas.find_anga_span(target_anga)
+  span1 = p1.sunrise_day_angas.find_anga_span(target_anga)
+  if span0 is None or span1 is None or span0.jd_start is None or span1.jd_end is None:
+    return None
+  return Interval(jd_start=span0.jd_start, jd_end=span1.jd_end)
+
+
 def decide_vyaapti(p0, p1, target_anga, ayanaamsha_id, kaala):
   (d0_angas, d1_angas) = get_2_day_interval_boundary_angas(kaala=kaala, anga_type=target_anga.get_type(), p0=p0, p1=p1)
   # if kaala not in ['अपराह्णः']:
@@ -147,7 +157,9 @@ def decide_vyaapti(p0, p1, target_anga, ayanaamsha_id, kaala):
 
   elif d0_angas.end == q and d1_angas.start == q:
     # The <e> p q q r: vyApti case
-    anga_span = zodiac.AngaSpanFinder(ayanaamsha_id=ayanaamsha_id, anga_type=target_anga.get_type()).find(jd1=d0_angas.interval.jd_start, jd2=d1_angas.interval.jd_end, target_anga_id=target_anga)
+    anga_span = _get_anga_span_across_days(p0=p0, p1=p1, target_anga=target_anga)
+    if anga_span is None:
+      anga_span = zodiac.AngaSpanFinder(ayanaamsha_id=ayanaamsha_id, anga_type=target_anga.get_type()).find(jd1=d0_angas.interval.jd_start, jd2=d1_angas.interval.jd_end, target_anga_id=target_anga)
     vyapti_0 = max(d0_angas.interval.jd_end - anga_span.jd_start, 0)
     vyapti_1 = max(anga_span.jd_end - d1_angas.interval.jd_start, 0)
     if vyapti_1 > vyapti_0:
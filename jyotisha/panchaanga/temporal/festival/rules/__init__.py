@@ -305,6 +305,24 @@ def get_festival_rules_map(dir_path, julian_handling, repo=None):
   return festival_rules
 
 
+def get_festival_rules_maps(repos, julian_handling, use_snapshot=True):
+  """get_festival_rules_map for each of the given repos.
+  
+  :param use_snapshot: Load the parsed rules of all repos from a single binary snapshot (see the snapshot module) if one matches the current rule files - else parse and save one. 
+  :return: List of festival rules maps, one per repo. 
+  """
+  dir_paths = [os.path.join(DATA_ROOT, repo.get_path()) for repo in repos]
+  parse_fn = lambda: [get_festival_rules_map(dir_path=dir_path, julian_handling=julian_handling, repo=repo) for dir_path, repo in zip(dir_paths, repos)]
+  if not use_snapshot:
+    return parse_fn()
+  from jyotisha.panchaanga.temporal.festival.rules import snapshot
+  festival_rules_maps = snapshot.get_festival_rules_maps(dir_paths=dir_paths, julian_handling=julian_handling, parse_fn=parse_fn)
+  for repo, festival_rules in zip(repos, festival_rules_maps):
+    for event in festival_rules.values():
+      event.repo = repo
+  return festival_rules_maps
+
+
 DATA_ROOT = os.path.join(os.path.dirname(__file__), "../data")
 _ADYATITHI_REPOS_PATH = os.path.join(DATA_ROOT, "repos.toml")
 
@@ -333,6 +351,43 @@ class RulesRepo(common.JsonObject):
     return self.path if self.path is not None else os.path.join(DATA_ROOT, self.name)
 
 
+def get_anchor_id_fragment(anchor_festival_id):
+  """The part of an anchor festival id to look for in festival ids, when there is no exact match. Sometimes, the recorded anchor_festival_id is not exact (Eg. navama-aparapakSa-samApanam 0 days from sarva-kArttika-amAvAsyA). So, we find an approx. match (Eg. kArttika\-amAvAsyA)."""
+  if 'amAvAsyA' in anchor_festival_id:
+    return anchor_festival_id.strip('sarva-')
+  return anchor_festival_id
+
+
+def is_approximate_anchor_match(anchor_festival_id, fest_id):
+  anchor_id_fragment = get_anchor_id_fragment(anchor_festival_id)
+  # Generally, we find a matching event by looking for superstring ids.
+  if anchor_id_fragment not in fest_id:
+    return False
+  # Match bOdhAyana festivals with bOdhAyana anchor ids only.
+  if 'amAvAsyA' in anchor_id_fragment and 'bOdhAyana' not in anchor_id_fragment and 'bOdhAyana' in fest_id:
+    return False
+  return True
+
+
+class RelativeFestivalRule(object):
+  """A relative festival rule, with its anchor resolved against the rule ids - see RulesCollection.get_relative_festival_rules."""
+
+  def __init__(self, rule, name_to_rule):
+    self.rule = rule
+    self.id = rule.id
+    self.offset = int(rule.timing.offset)
+    self.anchor_festival_id = rule.timing.anchor_festival_id
+    self.anchor_id_fragment = get_anchor_id_fragment(self.anchor_festival_id)
+    # Rule ids which approximately match the anchor - to be used if the anchor festival itself is not assigned.
+    self.anchor_candidate_ids = [fest_id for fest_id in name_to_rule if is_approximate_anchor_match(anchor_festival_id=self.anchor_festival_id, fest_id=fest_id)]
+
+  def get_anchor_rule_ids(self, name_to_rule):
+    """Ids of rules this festival may be anchored to."""
+    if self.anchor_festival_id in name_to_rule:
+      return [self.anchor_festival_id]
+    return self.anchor_candidate_ids
+
+
 class RulesCollection(common.JsonObject):
   JULIAN_AS_GREGORIAN = "treated as Gregorian"
   JULIAN_TO_GREGORIAN = "converted to Gregorian"
@@ -387,9 +442,8 @@ class RulesCollection(common.JsonObject):
 
   @timebudget
   def set_rule_dicts(self, julian_handling):
-    for repo in self.repos:
-      self.name_to_rule.update(get_festival_rules_map(
-        os.path.join(DATA_ROOT, repo.get_path()), repo=repo, julian_handling=julian_handling))
+    for festival_rules in get_festival_rules_maps(repos=self.repos, julian_handling=julian_handling):
+      self.name_to_rule.update(festival_rules)
 
     from sanskrit_data import collection_helper
     self.tree = collection_helper.tree_maker(leaves=self.name_to_rule.values(), path_fn=lambda x: x.get_storage_file_name(base_dir="", undo_conversions=False).replace(".toml", ""))
@@ -413,16 +467,87 @@ class RulesCollection(common.JsonObject):
     except KeyError:
       return {}
 
+  def _compile_lookup_index(self):
+    """Index the rules in self.tree by (month type, anga type, month, anga index) - with the adhika maasa relevance filter (see _filter_by_adhikamaasa_relevance) pre-applied for lunar months. Each entry is a pair of festival dicts: for nija and adhika maasas respectively.
+    
+    Equivalent to get_month_anga_fests for every month and anga, but computed once.
+    """
+    def _get_subtrees(tree):
+      return [(x, y) for x, y in tree.items() if x != collection_helper.LEAVES_KEY]
+
+    lookup_index = {}
+    for month_type, month_type_tree in _get_subtrees(self.tree):
+      for anga_type_id, anga_type_tree in _get_subtrees(month_type_tree):
+        for month_str, month_tree in _get_subtrees(anga_type_tree):
+          for anga_str, subtree in _get_subtrees(month_tree):
+            try:
+              key = (month_type, anga_type_id, float(month_str), int(anga_str))
+              fest_dict = {x: y[collection_helper.LEAVES_KEY][0] for x, y in subtree.items() if x != collection_helper.LEAVES_KEY}
+            except (ValueError, KeyError, AttributeError):
+              # Not a month-anga path (eg. relative events).
+              continue
+            if month_type == RulesRepo.LUNAR_MONTH_DIR:
+              fest_dicts = (dict(fest_dict), dict(fest_dict))
+              _filter_by_adhikamaasa_relevance(month=1, fest_dict=fest_dicts[0])
+              _filter_by_adhikamaasa_relevance(month=1.5, fest_dict=fest_dicts[1])
+            else:
+              fest_dicts = (fest_dict, fest_dict)
+            lookup_index[key] = fest_dicts
+    return lookup_index
+
+  def get_lookup_index(self):
+    if self.__dict__.get("_lookup_index", None) is None:
+      self._lookup_index = self._compile_lookup_index()
+    return self._lookup_index
+
+  def _order_relative_festival_rules(self):
+    relative_rules = [RelativeFestivalRule(rule=rule, name_to_rule=self.name_to_rule) for rule in self.name_to_rule.values() if rule.timing is not None and rule.timing.offset is not None]
+    id_to_relative_rule = {relative_rule.id: relative_rule for relative_rule in relative_rules}
+    # Depth first - anchors before the festivals anchored to them, else in the order of rules.
+    ordered_rules = []
+    visit_states = {}
+    cycles = []
+
+    def _visit(relative_rule, path):
+      state = visit_states.get(relative_rule.id, None)
+      if state == "done":
+        return
+      if state == "visiting":
+        cycles.append(path[path.index(relative_rule.id):] + [relative_rule.id])
+        return
+      visit_states[relative_rule.id] = "visiting"
+      for anchor_id in relative_rule.get_anchor_rule_ids(name_to_rule=self.name_to_rule):
+        if anchor_id in id_to_relative_rule and anchor_id != relative_rule.id:
+          _visit(relative_rule=id_to_relative_rule[anchor_id], path=path + [relative_rule.id])
+      visit_states[relative_rule.id] = "done"
+      ordered_rules.append(relative_rule)
+
+    for relative_rule in relative_rules:
+      _visit(relative_rule=relative_rule, path=[])
+    for cycle in cycles:
+      logging.error("Relative festivals anchored in a cycle: %s", " -> ".join(cycle))
+    return ordered_rules
+
+  def get_relative_festival_rules(self):
+    """Relative festival rules (those with an anchor festival and offset), ordered such that anchors which are themselves relative festivals come first. Computed once."""
+    if self.__dict__.get("_relative_festival_rules", None) is None:
+      self._relative_festival_rules = self._order_relative_festival_rules()
+    return self._relative_festival_rules
+
   def get_possibly_relevant_fests(self, month_type, month, anga_type_id, angas):
+    from jyotisha.panchaanga.temporal.zodiac.angas import Anga, Tithi
     def _get_month(anga):
       if isinstance(anga, Tithi):
         return anga.month.index
       else:
         return month
-      
+
+    lookup_index = self.get_lookup_index()
+    month_type_key = month_type.lower()
+    anga_type_key = anga_type_id.lower()
+    no_fests = ({}, {})
     fest_dict = {}
     for anga in angas:
-      from jyotisha.panchaanga.temporal.zodiac.angas import Tithi
       if month_type == RulesRepo.LUNAR_MONTH_DIR:
         _m = _get_month(anga)
         months_list = [_m, 0]
@@ -445,15 +570,12 @@ class RulesCollection(common.JsonObject):
           # Previous maasa is also not relevant!
           months_list.remove(month - 0.5)
 
+      anga_index = anga.index if isinstance(anga, Anga) else anga
       for m in months_list:
-        new_fests = self.get_month_anga_fests(month_type=month_type, month=m, anga_type_id=anga_type_id, anga=anga)
-        if month_type == RulesRepo.LUNAR_MONTH_DIR:
-          if m == 0:
-            _filter_by_adhikamaasa_relevance(month=month, fest_dict=new_fests)
-          else:
-            m = _get_month(anga=anga)
-            _filter_by_adhikamaasa_relevance(month=m, fest_dict=new_fests)
-        fest_dict.update(new_fests)
+        fest_dicts = lookup_index.get((month_type_key, anga_type_key, m, anga_index), no_fests)
+        # Relevance is decided by the month of the day for rules with month 0, and by the month of the anga otherwise.
+        relevance_month = month if m == 0 or month_type != RulesRepo.LUNAR_MONTH_DIR else _m
+        fest_dict.update(fest_dicts[int(int(relevance_month) != relevance_month)])
 
     def _check_month_tithi_match(month, angas):
       for anga in angas:
@@ -0,0 +1,92 @@
+"""Binary snapshots of parsed festival rules.
+
+Parsing the ~1,700 rule TOML files (see get_festival_rules_map) takes a second or more - on first use in every process. A snapshot holds the parsed rules of all the rule directories of a RulesCollection as a single pickle file, keyed by a hash of the contents of their TOML files, the julian handling and the code which parses and represents rules (see get_code_fingerprint) - so that any change to a rule, or to the parsing code, leads to a fresh snapshot being built on next use. (Snapshots are loaded without validation or __init__ calls, so stale ones could otherwise lack newly added attributes.)
+
+Snapshots are pickled with util.pickle_dumps, as JsonObject-s don't survive default pickling.
+"""
+
+import glob
+import hashlib
+import logging
+import os
+import pickle
+import sys
+from pathlib import Path
+
+from jyotisha import util
+
+# Bump whenever the pickled representation or the parsing changes in ways not reflected in the rule files or the code fingerprinted by get_code_fingerprint.
+SNAPSHOT_FORMAT_VERSION = 2
+
+SNAPSHOT_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "jyotisha", "festival_rules")
+
+
+def get_code_fingerprint():
+  """Fingerprint of the code which parses rules (including the schema, and julian date conversion) and of the JsonObject library."""
+  from jyotisha.panchaanga.temporal import time
+  from jyotisha.panchaanga.temporal.festival import rules
+  return util.get_code_fingerprint(modules=(rules, sys.modules[__name__], time, util), distribution_names=("sanskrit_data",))
+
+
+def get_content_hash(file_paths_list, julian_handling):
+  content_hash = hashlib.sha256()
+  content_hash.update(("%d %s %s" % (SNAPSHOT_FORMAT_VERSION, julian_handling, get_code_fingerprint())).encode("utf-8"))
+  for file_paths in file_paths_list:
+    content_hash.update(("%d" % len(file_paths)).encode("utf-8"))
+    for file_path in file_paths:
+      content_hash.update(str(file_path).encode("utf-8"))
+      with open(file_path, "rb") as fhandle:
+        content_hash.update(fhandle.read())
+  return content_hash.hexdigest()
+
+
+def get_snapshot_path_prefix(dir_paths, julian_handling, snapshot_dir=SNAPSHOT_DIR):
+  """Snapshots of given directories (and julian handling) share this prefix - which makes stale snapshots easy to clear."""
+  dirs_hash = hashlib.sha256(("%s %s" % ([os.path.abspath(dir_path) for dir_path in dir_paths], julian_handling)).encode("utf-8")).hexdigest()[:16]
+  return os.path.join(snapshot_dir, dirs_hash)
+
+
+def get_version_tag():
+  """Part of snapshot file names - identifying snapshots of the current format."""
+  return "v%d" % SNAPSHOT_FORMAT_VERSION
+
+
+def dump(festival_rules, filename):
+  """Write atomically - concurrent readers see either the old or the new file."""
+  data = util.pickle_dumps(festival_rules)
+  os.makedirs(os.path.dirname(filename), exist_ok=True)
+  temporary_path = filename + ".%d.tmp" % os.getpid()
+  with open(temporary_path, "wb") as fhandle:
+    fhandle.write(data)
+  os.replace(temporary_path, filename)
+
+
+def load(filename):
+  with open(filename, "rb") as fhandle:
+    return pickle.load(fhandle)
+
+
+def get_festival_rules_maps(dir_paths, julian_handling, parse_fn, snapshot_dir=SNAPSHOT_DIR):
+  """Parsed rules from the snapshot matching the current rule files under dir_paths - built with parse_fn (and saved) if absent.
+
+  :param parse_fn: Function returning the list of festival rules maps (id -> HinduCalendarEvent), one per directory, when the snapshot is unusable.
+  """
+  file_paths_list = [sorted(Path(dir_path).glob("**/*.toml")) for dir_path in dir_paths]
+  prefix = get_snapshot_path_prefix(dir_paths=dir_paths, julian_handling=julian_handling, snapshot_dir=snapshot_dir)
+  filename = "%s__%s__%s.pickle" % (prefix, get_version_tag(), get_content_hash(file_paths_list=file_paths_list, julian_handling=julian_handling))
+  if os.path.isfile(filename):
+    try:
+      return load(filename=filename)
+    except Exception:
+      logging.warning("Could not load festival rules snapshot %s - rebuilding.", filename, exc_info=True)
+  festival_rules_maps = parse_fn()
+  try:
+    # Stale snapshots of these directories - and those of other formats (including those of per directory snapshots, which lack a version tag).
+    stale_filenames = set(glob.glob(glob.escape(prefix) + "__*.pickle"))
+    stale_filenames.update(stale_filename for stale_filename in glob.glob(os.path.join(glob.escape(snapshot_dir), "*.pickle")) if "__%s__" % get_version_tag() not in os.path.basename(stale_filename))
+    for stale_filename in stale_filenames:
+      os.remove(stale_filename)
+    dump(festival_rules=festival_rules_maps, filename=filename)
+  except OSError:
+    logging.warning("Could not save festival rules snapshot %s.", filename, exc_info=True)
+  return festival_rules_maps
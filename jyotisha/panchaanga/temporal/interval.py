@@ -69,11 +69,17 @@ default_if_none(time.ist_timezone.julian_day_to_local_time_str(jd=self.jd_end),
     return "**%s**—%s-%s" % (name, default_if_none(tz.julian_day_to_local_time(julian_day=self.jd_start).get_hour_str(reference_date=reference_date), "?"),
                              default_if_none(tz.julian_day_to_local_time(julian_day=self.jd_end).get_hour_str(reference_date=reference_date), "?"))
 
-  def get_boundary_angas(self, anga_type, ayanaamsha_id):
+  def get_boundary_angas(self, anga_type, ayanaamsha_id, boundary_anga_cache=None):
+    """
+
+    :param boundary_anga_cache: Optional zodiac.BoundaryAngaCache to look angas up in.
+    """
     from jyotisha.panchaanga.temporal.zodiac import NakshatraDivision
     def f(x): 
       if x is None:
         return None
+      elif boundary_anga_cache is not None:
+        return boundary_anga_cache.get_anga(jd=x, anga_type=anga_type, ayanaamsha_id=ayanaamsha_id)
       else:
         return NakshatraDivision(x, ayanaamsha_id=ayanaamsha_id).get_anga(anga_type=anga_type)
 
@@ -118,6 +124,46 @@ class AngaSpan(Interval):
       anga_end_str = Hour(24 * (anga_end_jd - reference_jd)).to_md()
     return f"{anga}►{anga_end_str}"
 
+
+class MonthTaggedAngaSpan(object):
+  """Read-only view of an AngaSpan (shared with a daily panchaanga, not copied), whose anga may be tagged with a lunar month (as a Tithi).
+
+  Lighter than a JsonObject - many of these are made during festival assignment (see Panchaanga.get_interval_anga_spans).
+  """
+  __slots__ = ("_span", "_anga")
+
+  def __init__(self, span, month=None):
+    """
+
+    :param month: If not None, the lunar month to tag the (tithi) anga with.
+    """
+    self._span = span
+    if month is None:
+      self._anga = span.anga
+    else:
+      from jyotisha.panchaanga.temporal.zodiac.angas import Tithi
+      self._anga = Tithi.from_anga(anga=span.anga, month=month)
+
+  @property
+  def span(self):
+    return self._span
+
+  @property
+  def jd_start(self):
+    return self._span.jd_start
+
+  @property
+  def jd_end(self):
+    return self._span.jd_end
+
+  @property
+  def anga(self):
+    return self._anga
+
+  def __repr__(self):
+    return "%s: %s" % (str(self._anga), str(self._span))
+
+
 class FifteenFoldDivision(common.JsonObject):
   """
   "दे॒वस्य॑ सवि॒तुᳶ प्रा॒तᳶ प्र॑स॒वᳶ प्रा॒णः" इत्यादेर् ब्राह्मणस्य भाष्ये सायणो विभागम् इमम् इच्छति।(See comments under TbSayanaMuhuurta.)
@@ -1,14 +1,16 @@
 import datetime
 import datetime as dt_module
+import functools
 import logging
 import sys
 import traceback
-from math import modf
+from bisect import bisect_right
+from math import modf, floor, nextafter
 from numbers import Number
 
 import methodtools
+import numpy
 import pytz
-from astropy.time import Time
 
 from jyotisha.util import zero_if_none
 from sanskrit_data.schema import common
@@ -294,31 +296,143 @@ class Date(BasicDate):
     return Hour(hour=hour).to_string(format=format, rounding=rounding)
 
 
+# Conversions between julian days and the (proleptic) gregorian calendar are done by integer arithmetic (Fliegel & Van Flandern, as in ERFA's eraJd2cal / eraCal2jd) - same results as astropy.time.Time (except within a UTC leap second), at a fraction of the cost. Functions named in the plural work elementwise on numpy arrays; the rest are plain python, for speed with scalars.
+
+def jd_to_day_number_and_fraction(jd):
+  """
+
+  :return: (julian day number - the integer jd at the preceding noon, fraction of the day elapsed since midnight)
+  """
+  day_number = floor(jd + 0.5)
+  # Exact - 0.5 is a multiple of the float spacing of contemporary jds.
+  return (day_number, jd + 0.5 - day_number)
+
+
+def jds_to_day_numbers_and_fractions(jds):
+  day_numbers = numpy.floor(jds + 0.5)
+  return (day_numbers.astype(numpy.int64), jds + 0.5 - day_numbers)
+
+
+def day_number_to_ymd(day_number):
+  """Works on ints as well as integer arrays."""
+  l = day_number + 68569
+  n = (4 * l) // 146097
+  l = l - (146097 * n + 3) // 4
+  i = (4000 * (l + 1)) // 1461001
+  l = l - (1461 * i) // 4 + 31
+  k = (80 * l) // 2447
+  day = l - (2447 * k) // 80
+  l = k // 11
+  month = k + 2 - 12 * l
+  year = 100 * (n - 49) + i + l
+  return (year, month, day)
+
+
+def ymd_to_day_number(year, month, day):
+  """Works on ints as well as integer arrays."""
+  # Treat january and february as months 13 and 14 of the previous year.
+  a = (14 - month) // 12
+  y = year + 4800 - a
+  m = month + 12 * a - 3
+  return day + (153 * m + 2) // 5 + 365 * y + y // 4 - y // 100 + y // 400 - 32045
+
+
+def jd_to_ymdhms(jd, offset_seconds=0):
+  """
+
+  :param offset_seconds: Added to the time of the day (exactly - unlike adding to jd) - eg. a timezone offset.
+  :return: (year, month, day, hour, minute, second) - second being a float.
+  """
+  (day_number, fraction) = jd_to_day_number_and_fraction(jd)
+  seconds = fraction * 86400 + offset_seconds
+  days_carried = floor(seconds / 86400)
+  # Guard against rounding up to the next day.
+  seconds = min(seconds - days_carried * 86400, nextafter(86400, 0))
+  (year, month, day) = day_number_to_ymd(day_number + days_carried)
+  hour = int(seconds // 3600)
+  minute = int((seconds - hour * 3600) // 60)
+  return (year, month, day, hour, minute, seconds - hour * 3600 - minute * 60)
+
+
+def jds_to_ymdhms(jds, offset_seconds=0):
+  """Vectorized jd_to_ymdhms.
+
+  :param jds: numpy array of julian days (UTC).
+  :param offset_seconds: Number or array (of the same shape as jds).
+  :return: (year, month, day, hour, minute) integer arrays and a float array of seconds.
+  """
+  (day_numbers, fractions) = jds_to_day_numbers_and_fractions(numpy.asarray(jds, dtype=numpy.float64))
+  seconds = fractions * 86400 + offset_seconds
+  days_carried = numpy.floor(seconds / 86400)
+  seconds = numpy.minimum(seconds - days_carried * 86400, numpy.nextafter(86400, 0))
+  (year, month, day) = day_number_to_ymd(day_numbers + days_carried.astype(numpy.int64))
+  hour = (seconds // 3600).astype(numpy.int64)
+  minute = ((seconds - hour * 3600) // 60).astype(numpy.int64)
+  return (year, month, day, hour, minute, seconds - hour * 3600 - minute * 60)
+
+
+def ymdhms_to_jd(year, month, day, hour=0, minute=0, second=0):
+  return (ymd_to_day_number(year=year, month=month, day=day) - 0.5) + (hour * 3600 + minute * 60 + second) / 86400
+
+
+def ymdhms_to_jds(year, month, day, hour=0, minute=0, second=0):
+  """Vectorized ymdhms_to_jd."""
+  (year, month, day) = (numpy.asarray(year, dtype=numpy.int64), numpy.asarray(month, dtype=numpy.int64), numpy.asarray(day, dtype=numpy.int64))
+  return ymdhms_to_jd(year=year, month=month, day=day, hour=numpy.asarray(hour), minute=numpy.asarray(minute), second=numpy.asarray(second))
+
+
+def get_weekdays(jds):
+  """Vectorized get_weekday."""
+  (day_numbers, _) = jds_to_day_numbers_and_fractions(numpy.asarray(jds, dtype=numpy.float64))
+  return (day_numbers + 1) % 7
+
+
 def jd_to_utc_gregorian(jd):
-  tm = Time(jd, format='jd')
-  tm.format = "ymdhms"
-  return Date(year=int(tm.value["year"]), month=int(tm.value["month"]), day=int(tm.value["day"]),
-              hour=int(tm.value["hour"]), minute=int(tm.value["minute"]), second=tm.value["second"])
+  (year, month, day, hour, minute, second) = jd_to_ymdhms(jd)
+  return Date(year=year, month=month, day=day, hour=hour, minute=minute, second=second)
 
 
 def utc_gregorian_to_jd(date):
   if date.hour is None:
     date.set_time_to_day_start()
-  tm = Time(
-    {"year": date.year, "month": date.month, "day": date.day, "hour": zero_if_none(date.hour), "minute": zero_if_none(date.minute), "second": zero_if_none(date.second)},
-    format='ymdhms')
-  tm.format = "jd"
-  return tm.value
+  return ymdhms_to_jd(year=date.year, month=date.month, day=date.day, hour=zero_if_none(date.hour), minute=zero_if_none(date.minute), second=zero_if_none(date.second))
 
 
 def get_weekday(jd):
-  tm = Time(jd, format='jd')
-  tm.format = "datetime"
-  # Sunday should be 0.
-  return tm.value.isocalendar()[2] % 7
+  # Sunday should be 0. Day number 0 was a monday.
+  return (floor(jd + 0.5) + 1) % 7
+
+
+def jd_to_utc_datetime(jd):
+  """Naive UTC datetime, rounded to the microsecond."""
+  (day_number, fraction) = jd_to_day_number_and_fraction(jd)
+  (year, month, day) = day_number_to_ymd(day_number)
+  return datetime.datetime(year, month, day) + datetime.timedelta(microseconds=round(fraction * 86400e6))
+
+
+def utc_datetime_to_jd(utc_datetime):
+  return ymdhms_to_jd(year=utc_datetime.year, month=utc_datetime.month, day=utc_datetime.day, hour=utc_datetime.hour, minute=utc_datetime.minute, second=utc_datetime.second + utc_datetime.microsecond / 1e6)
+
+
+@functools.lru_cache(maxsize=None)
+def get_utc_offset_table(timezone_id):
+  """UTC offset transitions, from pytz's tables (which extend to 2037 - later times get the last offset, as in pytz).
+
+  :return: (sorted list of transition jds - the first being -inf, list of offsets in seconds effective from the corresponding transition). Also as numpy arrays.
+  """
+  tz = pytz.timezone(timezone_id)
+  if hasattr(tz, "_utc_transition_times"):
+    transition_jds = [-numpy.inf] + [utc_datetime_to_jd(utc_datetime=transition_time) for transition_time in tz._utc_transition_times[1:]]
+    offsets = [transition_info[0].total_seconds() for transition_info in tz._transition_info]
+  else:
+    # Fixed offset zones (including UTC).
+    transition_jds = [-numpy.inf]
+    offsets = [tz.utcoffset(datetime.datetime(2000, 1, 1)).total_seconds()]
+  return (transition_jds, offsets, numpy.array(transition_jds), numpy.array(offsets))
 
 
 class Timezone:
+  """Conversions go through a table of UTC offset transitions (see get_utc_offset_table), searched by bisection - equivalent to, but much faster than, converting via pytz for each instant. The methods named in the plural work on numpy arrays."""
   def __init__(self, timezone_id):
     self.timezone_id = timezone_id
 
@@ -327,44 +441,77 @@ class Timezone:
   def get_cached(cls, timezone_id):
     return Timezone(timezone_id=timezone_id)
 
+  def get_utc_offset_seconds(self, jd):
+    (transition_jds, offsets, _, _) = get_utc_offset_table(timezone_id=self.timezone_id)
+    return offsets[bisect_right(transition_jds, jd) - 1]
+
+  def get_utc_offsets_seconds(self, jds):
+    (_, _, transition_jds, offsets) = get_utc_offset_table(timezone_id=self.timezone_id)
+    return offsets[numpy.searchsorted(transition_jds, jds, side="right") - 1]
+
   def get_timezone_offset_hours_from_jd(self, jd: float):
     """Get timezone offset in hours east of UTC (negative west of UTC)
 
     Timezone offset is dependent both on place and time (yes- time, not just date) - due to Daylight savings time.
     compute offset from UTC in hours
     """
-    local_datetime = self.julian_day_to_local_datetime(jd=jd)
-    return (datetime.datetime.utcoffset(local_datetime).days * 86400 +
-            datetime.datetime.utcoffset(local_datetime).seconds) / 3600.0
+    return self.get_utc_offset_seconds(jd=jd) / 3600.0
 
   def julian_day_to_local_time(self, julian_day: float, round_seconds: bool = False) -> Date:
-    local_datetime = self.julian_day_to_local_datetime(jd=julian_day)
-    local_time = Date(
-    local_datetime.year, local_datetime.month, local_datetime.day, local_datetime.hour, local_datetime.minute,
-    local_datetime.second + local_datetime.microsecond / 1000000.0)
+    local_time = Date(*jd_to_ymdhms(jd=julian_day, offset_seconds=self.get_utc_offset_seconds(jd=julian_day)))
     if round_seconds:
       (y, m, dt, hours, minutes, seconds) = local_time.as_tuple()
       local_time = Date(y, m, dt, hours, minutes, int(round(seconds)))
     return local_time
 
+  def julian_day_to_local_day_number(self, jd):
+    """Julian day number (see jd_to_day_number_and_fraction) of the local date at jd - cheaper than julian_day_to_local_time, for use as an index."""
+    (day_number, fraction) = jd_to_day_number_and_fraction(jd)
+    return day_number + floor((fraction * 86400 + self.get_utc_offset_seconds(jd=jd)) / 86400)
+
+  def julian_days_to_local_fields(self, jds):
+    """Vectorized julian_day_to_local_time.
+
+    :return: (year, month, day, hour, minute) integer arrays and a float array of seconds.
+    """
+    jds = numpy.asarray(jds, dtype=numpy.float64)
+    return jds_to_ymdhms(jds=jds, offset_seconds=self.get_utc_offsets_seconds(jds=jds))
+
   def julian_day_to_local_datetime(self, jd):
-    tm = Time(jd, format='jd')
-    tm.format = "datetime"
-    return pytz.timezone(self.timezone_id).fromutc(tm.value)
+    return pytz.timezone(self.timezone_id).fromutc(jd_to_utc_datetime(jd=jd))
+
+  def _localize_with_pytz(self, year, month, day, hour, minute, second):
+    (microseconds, seconds) = modf(second)
+    local_datetime = pytz.timezone(self.timezone_id).localize(datetime.datetime(year, month, day, hour, minute, int(seconds), int(round(microseconds * 1e6))))
+    return utc_datetime_to_jd(utc_datetime=local_datetime.astimezone(pytz.utc))
 
   def local_time_to_julian_day(self, date):
-    microseconds, _ = modf(zero_if_none(date.second) * 1000000)
-    local_datetime = pytz.timezone(self.timezone_id).localize(
-      datetime.datetime(date.year, date.month, date.day, zero_if_none(date.hour), zero_if_none(date.minute), int(zero_if_none(date.second)), int(microseconds)))
-    tm = Time(local_datetime, format="datetime")
-    tm.format = "jd"
-    return tm.value
+    """Local times close to an offset transition (which may be ambiguous or non-existent) are resolved by pytz, as before (ie. with standard time preferred)."""
+    (year, month, day, hour, minute, second) = (date.year, date.month, date.day, zero_if_none(date.hour), zero_if_none(date.minute), zero_if_none(date.second))
+    local_jd = ymdhms_to_jd(year=year, month=month, day=day, hour=hour, minute=minute, second=second)
+    (transition_jds, offsets, _, _) = get_utc_offset_table(timezone_id=self.timezone_id)
+    # No offset exceeds a day, so the offset is unambiguous if there is no transition within a day either way.
+    transition_index = bisect_right(transition_jds, local_jd - 1) - 1
+    if transition_index != bisect_right(transition_jds, local_jd + 1) - 1:
+      return self._localize_with_pytz(year, month, day, hour, minute, second)
+    return local_jd - offsets[transition_index] / 86400
+
+  def local_fields_to_julian_days(self, year, month, day, hour=0, minute=0, second=0):
+    """Vectorized local_time_to_julian_day.
+
+    :return: numpy array of julian days, of the broadcast shape of the arguments.
+    """
+    (year, month, day, hour, minute, second) = [numpy.atleast_1d(x) for x in numpy.broadcast_arrays(year, month, day, hour, minute, second)]
+    local_jds = ymdhms_to_jds(year=year, month=month, day=day, hour=hour, minute=minute, second=second)
+    (_, _, transition_jds, offsets) = get_utc_offset_table(timezone_id=self.timezone_id)
+    transition_indices = numpy.searchsorted(transition_jds, local_jds - 1, side="right") - 1
+    jds = local_jds - offsets[transition_indices] / 86400
+    for index in zip(*numpy.nonzero(transition_indices != numpy.searchsorted(transition_jds, local_jds + 1, side="right") - 1)):
+      jds[index] = self._localize_with_pytz(int(year[index]), int(month[index]), int(day[index]), int(hour[index]), int(minute[index]), float(second[index]))
+    return jds
 
   def julian_day_to_local_time_str(self, jd):
-    tm = Time(jd, format='jd')
-    tm.format = "datetime"
-    local_datetime = pytz.timezone(self.timezone_id).fromutc(tm.value)
-    return str(local_datetime)
+    return str(self.julian_day_to_local_datetime(jd=jd))
 
   def current_time_as_int(self):
     local_datetime = datetime.datetime.now(tz=pytz.timezone(self.timezone_id))    
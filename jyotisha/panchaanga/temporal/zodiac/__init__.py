@@ -1,5 +1,6 @@
 import logging
 import sys
+from bisect import bisect_left, bisect_right
 from math import floor
 from numbers import Number
 from typing import Optional
@@ -7,7 +8,7 @@ from typing import Optional
 import methodtools
 import numpy
 import swisseph as swe
-from jyotisha.panchaanga.temporal.body import Graha
+from jyotisha.panchaanga.temporal.body import Graha, Transit
 from jyotisha.panchaanga.temporal.interval import Interval, AngaSpan
 from jyotisha.panchaanga.temporal.zodiac.angas import AngaType, Anga
 from jyotisha.util import default_if_none
@@ -30,7 +31,7 @@ class Ayanamsha(common.JsonObject):
   rAShTriya panchAnga nakshatra ayanAmsha vs chitra at 180 :
   - Shaves off 3 seconds from typical panchaanga computation compared to precise chitrA tracking.
   - rAShTriya panchAnga nakshatra ayanAmsha tracks chitra fairly well. Still, it results in ~5 minutes differences in nakshatra spans.
-  - chitrA does not move a lot in typical year, and it is mostly wasteful to compute its position fresh for every instant.
+  - chitrA does not move a lot in typical year, and it is mostly wasteful to compute its position fresh for every instant. Hence get_offset interpolates an AyanamshaTable.
   """
   VERNAL_EQUINOX_AT_0 = "VERNAL_EQUINOX_AT_0"
   CHITRA_AT_180 = "CHITRA_AT_180"
@@ -47,6 +48,11 @@ class Ayanamsha(common.JsonObject):
     self.ayanaamsha_id = ayanaamsha_id
 
   def get_offset(self, jd):
+    if self.ayanaamsha_id in AyanamshaTable.TABULATED_AYANAAMSHAS:
+      return AyanamshaTable.get_cached(ayanaamsha_id=self.ayanaamsha_id).get_offset(jd=jd)
+    return self.get_exact_offset(jd=jd)
+
+  def get_exact_offset(self, jd):
     if self.ayanaamsha_id == Ayanamsha.VERNAL_EQUINOX_AT_0:
       return 0
     elif self.ayanaamsha_id == Ayanamsha.CHITRA_AT_180:
@@ -60,6 +66,97 @@ class Ayanamsha(common.JsonObject):
       return swe.get_ayanamsa_ut(jd)
     raise Exception("Bad ayanamsha_id")
 
+  def get_offsets(self, jds):
+    """Vectorized counterpart of get_offset.
+
+    :param jds: numpy array of julian days.
+    :return: numpy array of offsets, of the same shape as jds.
+    """
+    jds = numpy.asarray(jds, dtype=float)
+    if self.ayanaamsha_id in (Ayanamsha.VERNAL_EQUINOX_AT_0, Ayanamsha.ASHVINI_STARTING_0):
+      return numpy.zeros(jds.shape)
+    if self.ayanaamsha_id in AyanamshaTable.TABULATED_AYANAAMSHAS:
+      return AyanamshaTable.get_cached(ayanaamsha_id=self.ayanaamsha_id).get_offsets(jds=jds)
+    return numpy.array([self.get_offset(jd) for jd in jds.flat]).reshape(jds.shape)
+
+
+class AyanamshaTable(object):
+  """Ayanaamsha offsets tabulated at fixed steps (from J2000.0), and interpolated by 4 point lagrange polynomials.
+  
+  Blocks of the table are computed lazily, the first time they're needed. Each block is checked against the exact offset midway between nodes (where interpolation error peaks); blocks exceeding the tolerance fall back to exact computation. The table can be saved to and loaded from disk, to be shared across processes.
+  """
+  # Offsets which are expensive to compute exactly - the star position behind CHITRA_AT_180 costs ~100 microseconds per call. 
+  TABULATED_AYANAAMSHAS = ("CHITRA_AT_180",)
+  EPOCH_JD = 2451545.0
+  # Interpolation error (mostly due to nutation and aberration terms) is ~1e-9 degrees at this step, ~1e-8 at half a day.
+  STEP_DAYS = 0.25
+  STEPS_PER_BLOCK = 256
+  # In degrees
+  DEFAULT_TOLERANCE = 1e-8
+  
+  def __init__(self, ayanaamsha_id, tolerance=DEFAULT_TOLERANCE):
+    self.ayanaamsha_id = ayanaamsha_id
+    self.tolerance = tolerance
+    # block index -> numpy array of offsets at nodes -1 to STEPS_PER_BLOCK + 1 of the block, or None (if the block failed the check).
+    self.blocks = {}
+
+  @methodtools.lru_cache(maxsize=None)
+  @classmethod
+  def get_cached(cls, ayanaamsha_id):
+    return AyanamshaTable(ayanaamsha_id=ayanaamsha_id)
+
+  def _compute_block(self, block_index):
+    exact_function = Ayanamsha.singleton(ayanaamsha_id=self.ayanaamsha_id).get_exact_offset
+    jd_block_start = self.EPOCH_JD + block_index * self.STEPS_PER_BLOCK * self.STEP_DAYS
+    values = numpy.array([exact_function(jd_block_start + i * self.STEP_DAYS) for i in range(-1, self.STEPS_PER_BLOCK + 2)])
+    check_positions = numpy.arange(0.5, self.STEPS_PER_BLOCK, self.STEPS_PER_BLOCK / 16)
+    error = max(abs(self._interpolate(values=values, position=position) - exact_function(jd_block_start + position * self.STEP_DAYS)) for position in check_positions)
+    if error > self.tolerance:
+      logging.debug("Ayanaamsha table block %d for %s has error %g - will compute exactly.", block_index, self.ayanaamsha_id, error)
+      return None
+    return values
+
+  def _get_block(self, block_index):
+    if block_index not in self.blocks:
+      self.blocks[block_index] = self._compute_block(block_index=block_index)
+    return self.blocks[block_index]
+
+  def _interpolate(self, values, position):
+    """
+
+    :param values: Offsets at nodes -1, 0, 1 ...
+    :param position: Position (in steps) relative to node 0, in [0, len(values) - 3).
+    """
+    node = int(position)
+    u = position - node
+    (y0, y1, y2, y3) = values[node: node + 4]
+    return (-u * (u - 1) * (u - 2) * y0 + 3 * (u + 1) * (u - 1) * (u - 2) * y1 - 3 * (u + 1) * u * (u - 2) * y2 + (u + 1) * u * (u - 1) * y3) / 6
+
+  def get_offset(self, jd):
+    position = (jd - self.EPOCH_JD) / self.STEP_DAYS
+    block_index = floor(position / self.STEPS_PER_BLOCK)
+    values = self._get_block(block_index=block_index)
+    if values is None:
+      return Ayanamsha.singleton(ayanaamsha_id=self.ayanaamsha_id).get_exact_offset(jd=jd)
+    return self._interpolate(values=values, position=position - block_index * self.STEPS_PER_BLOCK)
+
+  def get_offsets(self, jds):
+    return numpy.array([self.get_offset(jd) for jd in jds.flat]).reshape(jds.shape)
+
+  def dump_to_file(self, filename):
+    """Save all blocks computed so far (numpy npz format)."""
+    block_indices = sorted(block_index for block_index, values in self.blocks.items() if values is not None)
+    numpy.savez(filename, block_indices=numpy.array(block_indices, dtype=int), blocks=numpy.array([self.blocks[block_index] for block_index in block_indices]).reshape(len(block_indices), self.STEPS_PER_BLOCK + 3), step_days=self.STEP_DAYS, tolerance=self.tolerance)
+
+  def load_from_file(self, filename):
+    """Add blocks saved by dump_to_file (with the same step and a tolerance at least as strict)."""
+    with numpy.load(filename) as data:
+      if float(data["step_days"]) != self.STEP_DAYS or float(data["tolerance"]) > self.tolerance:
+        logging.warning("Ignoring incompatible ayanaamsha table %s", filename)
+        return
+      for block_index, values in zip(data["block_indices"], data["blocks"]):
+        self.blocks[int(block_index)] = values
+
 
 class NakshatraDivision(common.JsonObject):
   """Nakshatra division at a certain time, according to a certain ayanaamsha."""
@@ -133,6 +230,28 @@ class NakshatraDivision(common.JsonObject):
 
     return self.longitude_to_fractional_division(longitude=lcalc, anga_type=anga_type)
 
+  def get_anga_float_and_speed(self, anga_type):
+    """Like get_anga_float, but also returns the rate of change of the anga (angas per day), computed from the speeds of the grahas involved.
+
+      Returns:
+        (float anga, float speed)
+    """
+    if anga_type == AngaType.TITHI:
+      ayanaamsha_id = Ayanamsha.VERNAL_EQUINOX_AT_0
+    else:
+      ayanaamsha_id = self.ayanaamsha_id
+
+    lcalc = 0
+    speed = 0
+    for body_name, weight in anga_type.body_weights.items():
+      if weight == 0:
+        continue
+      (longitude, body_speed) = Graha.singleton(body_name=body_name).get_longitude_and_speed(self.jd, ayanaamsha_id=ayanaamsha_id)
+      lcalc += weight * longitude
+      speed += weight * body_speed
+
+    return (self.longitude_to_fractional_division(longitude=lcalc, anga_type=anga_type), speed / anga_type.arc_length)
+
   def get_anga(self, anga_type):
     """Returns the anga prevailing at a particular time. Computed based on lunar and solar longitudes, division of a circle into a certain number of degrees (arc_len).
 
@@ -206,6 +325,11 @@ def ecliptic_to_equatorial(longitude, latitude):
     longitude_to_right_ascension(coordinates[0]), coordinates[1])
 
 
+# For AngaSpanFinder._find_anga_start_by_newton
+NEWTON_MAX_ITERATIONS = 50
+NEWTON_TOLERANCE_DAYS = 1e-8
+
+
 class AngaSpanFinder(JsonObject):
   def __init__(self, ayanaamsha_id, anga_type):
     super(AngaSpanFinder, self).__init__()
@@ -235,7 +359,48 @@ class AngaSpanFinder(JsonObject):
     except ValueError:
       return None
 
-  def find_anga_start_between(self, jd1, jd2, target_anga):
+  def _is_monotonic(self):
+    """Do the angas of this type always progress forward? True for angas based only on the sun and the moon (which never appear retrograde), with a positive net weight on the faster body."""
+    body_weights = {body_name: weight for body_name, weight in self.anga_type.body_weights.items() if weight != 0}
+    if len(body_weights) == 0 or not set(body_weights.keys()).issubset({Graha.SUN, Graha.MOON}):
+      return False
+    return body_weights.get(Graha.MOON, body_weights.get(Graha.SUN)) > 0
+
+  def _find_anga_start_by_newton(self, jd1, jd2, target_anga):
+    """Newton iteration on the anga, using speeds from the ephemeris. Only valid for monotonic anga types.
+    
+    Typically needs 3-5 ephemeris evaluations per boundary, in contrast to stepping followed by brentq.
+    """
+    num_angas = self.anga_type.num_angas
+    target_anga_float = target_anga.index - 1
+    (anga_float, speed) = NakshatraDivision(jd1, ayanaamsha_id=self.ayanaamsha_id).get_anga_float_and_speed(anga_type=self.anga_type)
+    # Angas to go, in [0, num_angas). If jd1 is within target_anga, this is the next occurrence.
+    distance = (target_anga_float - anga_float) % num_angas
+    if distance == 0:
+      return jd1
+    jd = jd1
+    for _ in range(NEWTON_MAX_ITERATIONS):
+      # Limit the angas covered per step, so that an overshoot (due to acceleration) is never mistaken for a shortfall below.
+      jd_next = jd + min(distance, num_angas / 4) / speed
+      if jd_next > jd2:
+        if jd == jd2:
+          return None
+        jd_next = jd2
+      step = jd_next - jd
+      jd = jd_next
+      if abs(step) < NEWTON_TOLERANCE_DAYS:
+        return max(jd1, jd)
+      anga_float_previous = anga_float
+      (anga_float, speed) = NakshatraDivision(jd, ayanaamsha_id=self.ayanaamsha_id).get_anga_float_and_speed(anga_type=self.anga_type)
+      # Steps cover well under half a circle, so the progress is unambiguous even across the 0 point. distance becomes negative if we've overshot the target.
+      distance -= (anga_float - anga_float_previous + num_angas / 2) % num_angas - num_angas / 2
+      if jd == jd2 and distance > 0:
+        # The anga has not started by jd2.
+        return None
+    logging.warning("Newton iteration for %s start did not converge between %f and %f - falling back to stepping.", str(target_anga), jd1, jd2)
+    return self._find_anga_start_by_stepping(jd1=jd1, jd2=jd2, target_anga=target_anga)
+
+  def _find_anga_start_by_stepping(self, jd1, jd2, target_anga):
     jd_start = None
     num_angas = self.anga_type.num_angas
     min_step = 0.5 * self.anga_type.mean_period_days/num_angas  # Min Step for moving - half an anga span.
@@ -256,6 +421,31 @@ class AngaSpanFinder(JsonObject):
       jd_now = min(jd_now + min_step, jd2)
     return jd_start
 
+  def _get_stored_boundaries(self, jd1):
+    """Boundaries from the active anga boundary store, if their coverage includes jd1 (they may still fall short of jd2) - else None."""
+    from jyotisha.panchaanga.temporal.zodiac import boundary_store
+    store = boundary_store.get_active_store()
+    if store is None:
+      return None
+    anga_boundaries = store.get_boundaries(ayanaamsha_id=self.ayanaamsha_id, anga_type=self.anga_type)
+    if anga_boundaries is None or not anga_boundaries.covers(jd1=jd1, jd2=jd1):
+      return None
+    return anga_boundaries
+
+  def find_anga_start_between(self, jd1, jd2, target_anga):
+    anga_boundaries = self._get_stored_boundaries(jd1=jd1)
+    if anga_boundaries is not None:
+      (found, jd_start) = anga_boundaries.find_anga_start_between(jd1=jd1, jd2=jd2, target_anga=target_anga)
+      if found:
+        return jd_start
+    return self._compute_anga_start_between(jd1=jd1, jd2=jd2, target_anga=target_anga)
+
+  def _compute_anga_start_between(self, jd1, jd2, target_anga):
+    if self._is_monotonic():
+      return self._find_anga_start_by_newton(jd1=jd1, jd2=jd2, target_anga=target_anga)
+    else:
+      return self._find_anga_start_by_stepping(jd1=jd1, jd2=jd2, target_anga=target_anga)
+
   @timebudget
   def find(self, jd1: float, jd2: float, target_anga_id: int) -> Optional[AngaSpan]:
     """Computes anga spans for sunrise_day_angas such as tithi, nakshatra, yoga
@@ -308,12 +498,19 @@ class AngaSpanFinder(JsonObject):
 
   @timebudget
   def get_all_angas_in_period(self, jd1, jd2):
+    anga_boundaries = self._get_stored_boundaries(jd1=jd1)
+    if anga_boundaries is not None and anga_boundaries.covers(jd1=jd1, jd2=jd2):
+      return anga_boundaries.get_all_angas_in_period(jd1=jd1, jd2=jd2)
+    return self._compute_all_angas_in_period(jd1=jd1, jd2=jd2)
+
+  def _compute_all_angas_in_period(self, jd1, jd2):
+    """get_all_angas_in_period, ignoring any anga boundary store."""
     spans = []
     jd_start = None
     anga_now = self._get_anga(jd=jd1)
     while default_if_none(jd_start, jd1) <= jd2:
       next_anga = anga_now + 1
-      jd_end = self.find_anga_start_between(target_anga=next_anga, jd1=default_if_none(jd_start, jd1), jd2=jd2)
+      jd_end = self._compute_anga_start_between(target_anga=next_anga, jd1=default_if_none(jd_start, jd1), jd2=jd2)
       spans.append(AngaSpan(jd_start=jd_start, jd_end=jd_end, anga=anga_now))
       if jd_end is None:
         break
@@ -323,10 +520,179 @@ class AngaSpanFinder(JsonObject):
     return spans
 
 
+class AngaTimeline(JsonObject):
+  """All spans of a given anga type over a (long) period, computed once. 
+  
+  Spans for sub-periods (eg. sunrise to sunrise) are then had by bisection - no further root finding, and the interior spans are shared rather than copied. 
+  """
+  def __init__(self, ayanaamsha_id, anga_type, jd_start, jd_end):
+    super(AngaTimeline, self).__init__()
+    self.ayanaamsha_id = ayanaamsha_id
+    self.anga_type = anga_type
+    self.jd_start = jd_start
+    self.jd_end = jd_end
+    self.spans = AngaSpanFinder.get_cached(ayanaamsha_id=ayanaamsha_id, anga_type=anga_type).get_all_angas_in_period(jd1=jd_start, jd2=jd_end)
+    # Sorted, since spans are contiguous.
+    self.boundaries = [span.jd_start for span in self.spans[1:]]
+
+  def get_spans_in_period(self, jd1, jd2):
+    """Equivalent to AngaSpanFinder.get_all_angas_in_period(jd1, jd2).
+    
+    The first and last spans are fresh objects (with open ends, as there); the rest are shared with this timeline and so must not be modified. 
+    """
+    if jd1 < self.jd_start or jd2 > self.jd_end:
+      return AngaSpanFinder.get_cached(ayanaamsha_id=self.ayanaamsha_id, anga_type=self.anga_type).get_all_angas_in_period(jd1=jd1, jd2=jd2)
+    first_index = bisect_right(self.boundaries, jd1)
+    last_index = bisect_right(self.boundaries, jd2)
+    if first_index == last_index:
+      return [AngaSpan(jd_start=None, jd_end=None, anga=self.spans[first_index].anga)]
+    first_span = self.spans[first_index]
+    last_span = self.spans[last_index]
+    return [AngaSpan(jd_start=None, jd_end=first_span.jd_end, anga=first_span.anga)] + self.spans[first_index + 1: last_index] + [AngaSpan(jd_start=last_span.jd_start, jd_end=None, anga=last_span.anga)]
+
+  def get_anga_at(self, jd, margin_days=0):
+    """The anga prevailing at jd, or None if jd is outside this timeline or within margin_days of a span boundary."""
+    if jd < self.jd_start or jd > self.jd_end:
+      return None
+    index = bisect_right(self.boundaries, jd)
+    if index > 0 and jd - self.boundaries[index - 1] < margin_days:
+      return None
+    if index < len(self.boundaries) and self.boundaries[index] - jd < margin_days:
+      return None
+    return self.spans[index].anga
+
+
+class GrahaTransitIndex(JsonObject):
+  """Transits of a graha across the divisions of its longitude given by a GRAHA_RASHI anga type, over a period which is extended as needed.
+
+  Transits are bracketed by stepping no further than the graha could move towards the nearest division boundary (see Graha.MAX_SPEED_DEGREES_PER_DAY) - so retrograde re-entries are caught, while slow grahas are sampled every few weeks - and then located by brentq. One index serves both daily graha raashi spans (get_spans_in_period, as in AngaTimeline) and transit festivals (get_transits).
+  """
+  MIN_STEP_DAYS = 0.25
+  SPEED_MARGIN = 1.25
+
+  def __init__(self, graha_id, ayanaamsha_id, anga_type, jd_start, jd_end):
+    super(GrahaTransitIndex, self).__init__()
+    self.graha_id = graha_id
+    self.ayanaamsha_id = ayanaamsha_id
+    self.anga_type = anga_type
+    self.jd_start = jd_start
+    self.jd_end = jd_start
+    self.anga_index_at_start = self._get_division(jd=jd_start) + 1
+    self.transits = []
+    # Sorted transit jds, for bisection.
+    self.jds = []
+    self._ensure_coverage(jd1=jd_start, jd2=jd_end)
+
+  def _get_longitude(self, jd):
+    return Graha.singleton(self.graha_id).get_longitude(jd=jd, ayanaamsha_id=self.ayanaamsha_id)
+
+  def _get_division(self, jd):
+    return int(self._get_longitude(jd=jd) // (360 / self.anga_type.num_angas)) % self.anga_type.num_angas
+
+  def _find_transits(self, jd1, jd2):
+    num_angas = self.anga_type.num_angas
+    arc_length = 360 / num_angas
+    max_speed = Graha.MAX_SPEED_DEGREES_PER_DAY[self.graha_id] * GrahaTransitIndex.SPEED_MARGIN
+    transits = []
+    jd = jd1
+    longitude = self._get_longitude(jd=jd)
+    while jd < jd2:
+      offset = longitude % arc_length
+      jd_next = min(jd + max(min(offset, arc_length - offset) / max_speed, GrahaTransitIndex.MIN_STEP_DAYS), jd2)
+      longitude_next = self._get_longitude(jd=jd_next)
+      (division, division_next) = (int(longitude // arc_length) % num_angas, int(longitude_next // arc_length) % num_angas)
+      if division != division_next:
+        if (division_next - division) % num_angas == 1:
+          boundary = division_next * arc_length
+        else:
+          # retrograde transit
+          boundary = division * arc_length
+        try:
+          jd_transit = brentq(lambda x: (self._get_longitude(jd=x) - boundary + 180) % 360 - 180, jd, jd_next)
+          transits.append(Transit(body=self.graha_id, jd=jd_transit, anga_type=self.anga_type.name, value_1=division + 1, value_2=division_next + 1))
+        except ValueError:
+          logging.error("Unable to compute transit of %s between %f and %f - possibly could not bracket correctly!", self.graha_id, jd, jd_next)
+      (jd, longitude) = (jd_next, longitude_next)
+    return transits
+
+  def _ensure_coverage(self, jd1, jd2):
+    if jd1 < self.jd_start:
+      self.transits = self._find_transits(jd1=jd1, jd2=self.jd_start) + self.transits
+      self.jd_start = jd1
+      self.anga_index_at_start = self._get_division(jd=jd1) + 1
+    if jd2 > self.jd_end:
+      self.transits = self.transits + self._find_transits(jd1=self.jd_end, jd2=jd2)
+      self.jd_end = jd2
+    if len(self.jds) != len(self.transits):
+      self.jds = [transit.jd for transit in self.transits]
+
+  def get_transits(self, jd1, jd2):
+    """Transits within [jd1, jd2], as with Graha.get_transits."""
+    self._ensure_coverage(jd1=jd1, jd2=jd2)
+    return self.transits[bisect_left(self.jds, jd1): bisect_right(self.jds, jd2)]
+
+  def get_spans_in_period(self, jd1, jd2):
+    """Equivalent to AngaSpanFinder.get_all_angas_in_period(jd1, jd2) - but including retrograde transits.
+    
+    The spans are fresh objects, with open ends as there.
+    """
+    self._ensure_coverage(jd1=jd1, jd2=jd2)
+    first_index = bisect_right(self.jds, jd1)
+    last_index = bisect_right(self.jds, jd2)
+    if first_index > 0:
+      anga_index = self.transits[first_index - 1].value_2
+    elif len(self.transits) > 0:
+      anga_index = self.transits[0].value_1
+    else:
+      anga_index = self.anga_index_at_start
+    spans = []
+    jd_start = None
+    for transit in self.transits[first_index: last_index]:
+      spans.append(AngaSpan(jd_start=jd_start, jd_end=transit.jd, anga=Anga.get_cached(index=anga_index, anga_type_id=self.anga_type.name)))
+      (jd_start, anga_index) = (transit.jd, transit.value_2)
+    spans.append(AngaSpan(jd_start=jd_start, jd_end=None, anga=Anga.get_cached(index=anga_index, anga_type_id=self.anga_type.name)))
+    return spans
+
+
 # Essential for depickling to work.
 common.update_json_class_index(sys.modules[__name__])
 
 
+# Span boundaries are only accurate to NEWTON_TOLERANCE_DAYS (and longitudes to the ephemeris.ChebyshevEphemeris tolerance, if enabled) - angas closer than this to a boundary are computed afresh by BoundaryAngaCache.
+SPAN_LOOKUP_MARGIN_DAYS = 1e-5
+
+
+class BoundaryAngaCache(object):
+  """Angas at given instants (typically interval boundaries), looked up in the anga timelines of a panchaanga (see daily.get_anga_timelines) rather than computed with the ephemeris where possible. Results are memoized by (jd, anga type, ayanaamsha).
+  """
+
+  def __init__(self, anga_timelines=None):
+    self.anga_timelines = default_if_none(anga_timelines, {})
+    self.angas = {}
+
+  def _get_timeline(self, anga_type, ayanaamsha_id):
+    timeline = self.anga_timelines.get(anga_type.name, None)
+    if not isinstance(timeline, AngaTimeline):
+      return None
+    # Angas such as tithi-s (with the sun and the moon weighed oppositely) are independent of the ayanaamsha.
+    if timeline.ayanaamsha_id != ayanaamsha_id and sum(anga_type.body_weights.values()) != 0:
+      return None
+    return timeline
+
+  def get_anga(self, jd, anga_type, ayanaamsha_id):
+    """Same as NakshatraDivision(jd, ayanaamsha_id=ayanaamsha_id).get_anga(anga_type=anga_type)."""
+    key = (jd, anga_type.name, ayanaamsha_id)
+    anga = self.angas.get(key, None)
+    if anga is None:
+      timeline = self._get_timeline(anga_type=anga_type, ayanaamsha_id=ayanaamsha_id)
+      if timeline is not None:
+        anga = timeline.get_anga_at(jd=jd, margin_days=SPAN_LOOKUP_MARGIN_DAYS)
+      if anga is None:
+        anga = NakshatraDivision(jd, ayanaamsha_id=ayanaamsha_id).get_anga(anga_type=anga_type)
+      self.angas[key] = anga
+    return anga
+
+
 def get_tropical_month(jd):
   nd = NakshatraDivision(jd=jd, ayanaamsha_id=Ayanamsha.ASHVINI_STARTING_0)
   return nd.get_anga(anga_type=AngaType.TROPICAL_MONTH)
@@ -0,0 +1,156 @@
+"""Persistent store of anga boundaries, shared across processes.
+
+Boundaries of angas such as tithi, nakshatra, yoga and karana depend only on time (and the ayanaamsha). A store directory holds one file per (ayanaamsha_id, anga_type) - a float64 numpy array which is memory-mapped on use, so that the operating system shares a single copy across processes. Layout: [coverage start jd, coverage end jd, index of the anga starting at the first boundary, boundary jds (sorted)...].
+
+Only anga types which always progress forward (see AngaSpanFinder._is_monotonic) are stored - the anga starting at each boundary is then implied by its position.
+
+Usage: build once with build_anga_boundary_store(), then call enable_anga_boundary_store() in each process. AngaSpanFinder then consults the store, and computes only outside its coverage.
+"""
+
+import logging
+import os
+
+import numpy
+
+from jyotisha.panchaanga.temporal.zodiac.angas import Anga
+
+# 1800-01-01 to 2200-01-01 (UT).
+DEFAULT_JD_START = 2378496.5
+DEFAULT_JD_END = 2524593.5
+
+# Boundaries are computed in chunks of these many days while building.
+BUILD_CHUNK_DAYS = 3650
+
+HEADER_LENGTH = 3
+
+
+class AngaBoundaries(object):
+  """Memory-mapped boundaries of one anga type, with lookups mirroring AngaSpanFinder's methods."""
+
+  def __init__(self, anga_type, array):
+    self.anga_type = anga_type
+    self.jd_start = float(array[0])
+    self.jd_end = float(array[1])
+    self.first_anga_index = int(array[2])
+    self.boundaries = array[HEADER_LENGTH:]
+
+  def covers(self, jd1, jd2):
+    return self.jd_start <= jd1 and jd2 <= self.jd_end
+
+  def _get_anga(self, boundary_index):
+    """The anga starting at the given boundary (which may be out of bounds - eg. -1 for the anga preceding the first boundary)."""
+    return Anga.get_cached(index=(self.first_anga_index - 1 + boundary_index) % self.anga_type.num_angas + 1, anga_type_id=self.anga_type.name)
+
+  def get_anga(self, jd):
+    return self._get_anga(boundary_index=int(numpy.searchsorted(self.boundaries, jd, side="right")) - 1)
+
+  def find_anga_start_between(self, jd1, jd2, target_anga):
+    """Same as AngaSpanFinder.find_anga_start_between, for jd1 within the coverage.
+
+    :return: (found, jd) - found is False if the answer lies beyond the coverage.
+    """
+    boundary_index = int(numpy.searchsorted(self.boundaries, jd1, side="left"))
+    boundary_index += (target_anga.index - self._get_anga(boundary_index=boundary_index).index) % self.anga_type.num_angas
+    if boundary_index >= len(self.boundaries):
+      if jd2 <= self.jd_end:
+        return (True, None)
+      return (False, None)
+    jd = float(self.boundaries[boundary_index])
+    return (True, jd if jd <= jd2 else None)
+
+  def get_all_angas_in_period(self, jd1, jd2):
+    """Same as AngaSpanFinder.get_all_angas_in_period, for a covered period."""
+    from jyotisha.panchaanga.temporal.interval import AngaSpan
+    first_index = int(numpy.searchsorted(self.boundaries, jd1, side="right"))
+    last_index = int(numpy.searchsorted(self.boundaries, jd2, side="right"))
+    jds = [None] + self.boundaries[first_index: last_index].tolist() + [None]
+    return [AngaSpan(jd_start=jds[i], jd_end=jds[i + 1], anga=self._get_anga(boundary_index=first_index - 1 + i)) for i in range(len(jds) - 1)]
+
+
+class AngaBoundaryStore(object):
+  def __init__(self, store_dir):
+    self.store_dir = store_dir
+    # path -> AngaBoundaries or None (if absent)
+    self.boundaries = {}
+
+  def get_path(self, ayanaamsha_id, anga_type):
+    if anga_type.name == "TITHI":
+      # Tithis are computed independent of the ayanaamsha (see NakshatraDivision.get_anga_float) - one file serves all.
+      ayanaamsha_id = "VERNAL_EQUINOX_AT_0"
+    return os.path.join(self.store_dir, "%s__%s.npy" % (ayanaamsha_id, anga_type.name))
+
+  def get_boundaries(self, ayanaamsha_id, anga_type):
+    path = self.get_path(ayanaamsha_id=ayanaamsha_id, anga_type=anga_type)
+    if path not in self.boundaries:
+      if os.path.isfile(path):
+        self.boundaries[path] = AngaBoundaries(anga_type=anga_type, array=numpy.load(path, mmap_mode="r"))
+      else:
+        self.boundaries[path] = None
+    return self.boundaries[path]
+
+  def build(self, ayanaamsha_id, anga_type, jd_start=DEFAULT_JD_START, jd_end=DEFAULT_JD_END):
+    """Compute boundaries over [jd_start, jd_end] and write them (atomically - readers see either the old or the new file).
+
+    Takes a few minutes per anga type for the default four centuries.
+    """
+    from jyotisha.panchaanga.temporal.zodiac import AngaSpanFinder
+    anga_span_finder = AngaSpanFinder(ayanaamsha_id=ayanaamsha_id, anga_type=anga_type)
+    if not anga_span_finder._is_monotonic():
+      raise ValueError("Only monotonic anga types can be stored: %s" % anga_type.name)
+    boundaries = []
+    first_anga_index = None
+    for chunk_start in numpy.arange(jd_start, jd_end, BUILD_CHUNK_DAYS):
+      chunk_end = min(chunk_start + BUILD_CHUNK_DAYS, jd_end)
+      # Computed afresh rather than via any active store.
+      spans = anga_span_finder._compute_all_angas_in_period(jd1=float(chunk_start), jd2=float(chunk_end))
+      for span in spans[1:]:
+        if len(boundaries) > 0 and span.jd_start <= boundaries[-1]:
+          # Boundary at the chunk edge, found twice.
+          continue
+        if first_anga_index is None:
+          first_anga_index = span.anga.index
+        boundaries.append(span.jd_start)
+    logging.info("Computed %d %s boundaries.", len(boundaries), anga_type.name)
+    os.makedirs(self.store_dir, exist_ok=True)
+    path = self.get_path(ayanaamsha_id=ayanaamsha_id, anga_type=anga_type)
+    temporary_path = path + ".%d.tmp.npy" % os.getpid()
+    numpy.save(temporary_path, numpy.array([jd_start, jd_end, first_anga_index] + boundaries, dtype=numpy.float64))
+    os.replace(temporary_path, path)
+    self.boundaries.pop(path, None)
+
+
+_active_store = None
+
+
+def enable_anga_boundary_store(store_dir):
+  """Make AngaSpanFinder consult boundaries stored in store_dir.
+
+  :return: The active store.
+  """
+  global _active_store
+  _active_store = AngaBoundaryStore(store_dir=os.path.expanduser(store_dir))
+  return _active_store
+
+
+def disable_anga_boundary_store():
+  global _active_store
+  _active_store = None
+
+
+def get_active_store():
+  return _active_store
+
+
+def build_anga_boundary_store(store_dir, ayanaamsha_ids, anga_types=None, jd_start=DEFAULT_JD_START, jd_end=DEFAULT_JD_END):
+  """
+
+  :param ayanaamsha_ids: Ayanaamshas of interest, eg. [Ayanamsha.CHITRA_AT_180].
+  :param anga_types: Defaults to tithi, nakshatra, yoga and karana.
+  """
+  from jyotisha.panchaanga.temporal.zodiac.angas import AngaType
+  anga_types = anga_types if anga_types is not None else [AngaType.TITHI, AngaType.NAKSHATRA, AngaType.YOGA, AngaType.KARANA]
+  store = AngaBoundaryStore(store_dir=os.path.expanduser(store_dir))
+  for ayanaamsha_id in ayanaamsha_ids:
+    for anga_type in anga_types:
+      store.build(ayanaamsha_id=ayanaamsha_id, anga_type=anga_type, jd_start=jd_start, jd_end=jd_end)
+  return store
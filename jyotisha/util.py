@@ -1,5 +1,68 @@
+import functools
+import hashlib
+import io
+import pickle
+from importlib import metadata
+from pathlib import Path
+
+
 def zero_if_none(x):
   return default_if_none(x=x, default=0)
 
 def default_if_none(x, default):
   return default if x is None else x
+
+
+def get_code_fingerprint(modules, distribution_names=()):
+  """Hash of the source of the given modules (all python files within, for packages) and of the versions of the given installed distributions.
+  
+  Useful in keys of persisted results of computations, so that code changes invalidate them. 
+
+  :param modules: Tuple of modules.
+  :param distribution_names: Tuple of names of distributions, eg. ("sanskrit_data",).
+  """
+  return _get_code_fingerprint(modules=tuple(modules), distribution_names=tuple(distribution_names))
+
+
+@functools.lru_cache(maxsize=None)
+def _get_code_fingerprint(modules, distribution_names):
+  fingerprint = hashlib.sha256()
+  for module in modules:
+    if hasattr(module, "__path__"):
+      file_paths = sorted(str(file_path) for module_path in module.__path__ for file_path in Path(module_path).glob("**/*.py"))
+    else:
+      file_paths = [module.__file__]
+    for file_path in file_paths:
+      with open(file_path, "rb") as fhandle:
+        fingerprint.update(fhandle.read())
+  for distribution_name in distribution_names:
+    try:
+      version = metadata.version(distribution_name)
+    except metadata.PackageNotFoundError:
+      version = None
+    fingerprint.update(("%s %s" % (distribution_name, version)).encode("utf-8"))
+  return fingerprint.hexdigest()
+
+
+def _make_json_object(cls, state):
+  obj = cls.__new__(cls)
+  obj.__dict__.update(state)
+  return obj
+
+
+class _JsonObjectPickler(pickle.Pickler):
+  def reducer_override(self, obj):
+    from sanskrit_data.schema import common
+    if isinstance(obj, common.JsonObject):
+      return (_make_json_object, (obj.__class__, obj.__dict__))
+    return NotImplemented
+
+
+def pickle_dumps(obj):
+  """Pickle any structure of JsonObject-s (and other picklable objects) - to be loaded with pickle.loads.
+  
+  JsonObject defines __getattr__ in a way which breaks the default pickle protocol (attribute lookups for __setstate__ and such yield None). Hence the custom reduction here - which also skips the (slow) validating construction via JsonObject.make_from_dict.
+  """
+  buffer = io.BytesIO()
+  _JsonObjectPickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(obj)
+  return buffer.getvalue()